@@ -0,0 +1,220 @@
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+
+import pandas as pd
+
+# Módulos do projeto (mesmo esquema de sys.path usado nos notebooks)
+PATH_RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for _pasta in ('utils', 'analytics', 'plots'):
+    if os.path.join(PATH_RAIZ, 'src', _pasta) not in sys.path:
+        sys.path.insert(0, os.path.join(PATH_RAIZ, 'src', _pasta))
+
+#Configurações Globais do Módulo
+
+PATH_BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+PATH_DADOS_BENCH = os.path.join(PATH_BENCHMARKS, 'dados')
+PATH_RESULTADOS = os.path.join(PATH_BENCHMARKS, 'resultados', 'resultados.jsonl')
+
+TAMANHOS_PADRAO = [10_000, 100_000, 1_000_000]
+MESES_OUTLIERS = [3, 11, 12]
+
+
+#Casos Medidos
+# Cada caso tem 'agregar' (só o cálculo, a partir das linhas de venda) e,
+# opcionalmente, 'renderizar' (o gráfico, com o cubo já em cache).
+# 'dados' indica a entrada: 'bruto' (vendas e produtos separados), 'vendas'
+# (sem catálogo) ou 'agg' (vendas já unidas aos produtos).
+
+def _caso_merge(modo):
+    from merge_datasets import merge_datasets
+    return lambda vendas, produtos: merge_datasets(vendas, produtos, 'SKU', modo=modo)
+
+def _metrica(modulo, funcao, *args, **kwargs):
+    # Funções da camada src/analytics (só o cálculo, sem matplotlib)
+    def agregar(df):
+        import importlib
+        return getattr(importlib.import_module(modulo), funcao)(df, *args, **kwargs)
+    return agregar
+
+def _renderizar(modulo, funcao, *args, **kwargs):
+    def renderizar(df):
+        import importlib
+        getattr(importlib.import_module(modulo), funcao)(df, *args, **kwargs)
+    return renderizar
+
+def casos():
+    return {
+        'merge_datasets': {'dados': 'bruto', 'agregar': _caso_merge('merge')},
+        'merge_datasets_indice': {'dados': 'bruto', 'agregar': _caso_merge('indice')},
+        'cubo_vendas': {'dados': 'agg', 'agregar': lambda df: __import__('cubo_vendas').construir_cubo(df)},
+        'cubo_vendas_particionado': {
+            'dados': 'agg', 'agregar': lambda df: __import__('cubo_particionado').construir_cubo_particionado(df)},
+        'faturamento_total_filial': {
+            'dados': 'vendas', 'agregar': _metrica('metricas_vendas', 'faturamento_total_filial'),
+            'renderizar': _renderizar('plot_faturamento_filial', 'plot_faturamento_total_filial')},
+        'faturamento_mensal_filial': {
+            'dados': 'vendas', 'agregar': _metrica('metricas_vendas', 'faturamento_mensal_filial'),
+            'renderizar': _renderizar('plot_faturamento_filial', 'plot_faturamento_mensal_filial')},
+        'faturamento_e_ticket_medio_mensal': {
+            'dados': 'vendas', 'agregar': _metrica('metricas_vendas', 'ticket_medio_mensal_filial'),
+            'renderizar': _renderizar('plot_faturamento_filial', 'plot_faturamento_e_ticket_medio_mensal')},
+        'clientes_unicos_mensal_filial': {
+            'dados': 'vendas', 'agregar': _metrica('metricas_vendas', 'clientes_unicos_mensal_filial', 'exato'),
+            'renderizar': _renderizar('plot_faturamento_filial', 'plot_clientes_unicos_mensal_filial')},
+        'clientes_unicos_mensal_filial_hll': {
+            'dados': 'vendas', 'agregar': _metrica('metricas_vendas', 'clientes_unicos_mensal_filial', 'aproximado')},
+        'top_categorias_mensal': {
+            'dados': 'agg', 'agregar': _metrica('metricas_produtos', 'top_categorias_mensal', 3),
+            'renderizar': _renderizar('plots_produtos', 'top_categorias_mensal', 3)},
+        'top_categorias_sazonais': {
+            'dados': 'agg', 'agregar': _metrica('metricas_produtos', 'top_categorias_sazonais', 3, MESES_OUTLIERS),
+            'renderizar': _renderizar('plots_produtos', 'top_categorias_sazonais', 3, MESES_OUTLIERS)},
+        'top_produtos_sazonais_percentual': {
+            'dados': 'agg',
+            'agregar': _metrica('metricas_produtos', 'top_produtos_sazonais', 5, MESES_OUTLIERS, 'Doceria'),
+            'renderizar': _renderizar('plots_produtos', 'top_produtos_sazonais_percentual', 5, MESES_OUTLIERS, 'Doceria')},
+        'meses_pico_filial_sku': {
+            'dados': 'agg', 'agregar': _metrica('deteccao_sazonal', 'meses_pico', ['FILIAL', 'SKU'])},
+        'previsao_demanda': {
+            'dados': 'agg', 'agregar': _metrica('previsao_demanda', 'prever_demanda', 4,
+                                                ('sazonal_ingenuo', 'suavizacao_exponencial'))},
+        'atributos_clientes_skus': {
+            'dados': 'vendas', 'agregar': _metrica('repositorio_atributos', 'construir_atributos')},
+        'regras_associacao_subcategoria': {
+            'dados': 'agg', 'agregar': _metrica('associacao_produtos', 'regras_associacao', 'SUBCATEGORIA')},
+        'regras_associacao_sku_filial': {
+            'dados': 'agg',
+            'agregar': _metrica('associacao_produtos', 'regras_associacao', 'SKU', 0.001, particao='FILIAL', processos=2)},
+    }
+
+
+#Execução
+
+def _pico_rss_mb():
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa em KB; macOS em bytes
+    return pico / 1024 ** 2 if sys.platform == 'darwin' else pico / 1024
+
+def preparar_dados(tamanho):
+    """Gera (uma única vez) e grava em Parquet os dados sintéticos do tamanho pedido."""
+    from dados_sinteticos import gerar_produtos, gerar_vendas
+
+    os.makedirs(PATH_DADOS_BENCH, exist_ok=True)
+    caminho_vendas = os.path.join(PATH_DADOS_BENCH, f'vendas_{tamanho}.parquet')
+    caminho_produtos = os.path.join(PATH_DADOS_BENCH, 'produtos.parquet')
+    if not os.path.exists(caminho_produtos):
+        gerar_produtos().to_parquet(caminho_produtos)
+    if not os.path.exists(caminho_vendas):
+        produtos = pd.read_parquet(caminho_produtos)
+        gerar_vendas(tamanho, produtos).to_parquet(caminho_vendas)
+    return caminho_vendas, caminho_produtos
+
+def _medir_caso(nome, caminho_vendas, caminho_produtos, renderizar):
+    # Roda em um processo novo: o pico de RSS reflete apenas este caso.
+    # Os gráficos usam caminhos relativos à pasta notebooks/ (../graphics)
+    os.chdir(os.path.join(PATH_RAIZ, 'notebooks'))
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    plt.show = lambda *args, **kwargs: None
+
+    from merge_datasets import merge_datasets
+
+    caso = casos()[nome]
+
+    # 1. Preparo dos dados (leitura e, se preciso, junção com o catálogo)
+    inicio = time.perf_counter()
+    vendas = pd.read_parquet(caminho_vendas)
+    produtos = pd.read_parquet(caminho_produtos)
+    dados = vendas
+    if caso['dados'] == 'agg':
+        dados = merge_datasets(vendas, produtos, 'SKU', modo='indice')
+    tempo_preparo = time.perf_counter() - inicio
+    rss_preparo = _pico_rss_mb()
+
+    # 2. Agregação
+    inicio = time.perf_counter()
+    if caso['dados'] == 'bruto':
+        caso['agregar'](vendas, produtos)
+    else:
+        caso['agregar'](dados)
+    tempo_agregacao = time.perf_counter() - inicio
+    rss_agregacao = _pico_rss_mb()
+
+    # 3. Renderização (o cubo já está em cache, então mede só o gráfico)
+    tempo_render = None
+    if renderizar and 'renderizar' in caso:
+        inicio = time.perf_counter()
+        caso['renderizar'](dados)
+        plt.close('all')
+        tempo_render = time.perf_counter() - inicio
+
+    return {
+        'linhas': len(vendas),
+        'tempo_preparo_s': tempo_preparo,
+        'tempo_agregacao_s': tempo_agregacao,
+        'tempo_render_s': tempo_render,
+        'linhas_por_s': len(vendas) / tempo_agregacao if tempo_agregacao else None,
+        'pico_rss_mb': rss_agregacao,
+        'pico_rss_agregacao_mb': max(rss_agregacao - rss_preparo, 0.0),
+    }
+
+def _versao():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=PATH_RAIZ,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def executar(tamanhos=TAMANHOS_PADRAO, nomes_casos=None, saida=PATH_RESULTADOS, renderizar=True):
+    """
+    Mede cada caso em cada tamanho e acrescenta um registro JSON por linha
+    em 'saida' (versão do código, ambiente, tempos, RSS e linhas/s).
+    """
+    nomes_casos = nomes_casos or list(casos())
+    contexto = {
+        'versao': _versao(),
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'maquina': platform.node(),
+    }
+
+    os.makedirs(os.path.dirname(saida), exist_ok=True)
+    registros = []
+    for tamanho in tamanhos:
+        caminho_vendas, caminho_produtos = preparar_dados(tamanho)
+        for nome in nomes_casos:
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as executor:
+                medida = executor.submit(_medir_caso, nome, caminho_vendas, caminho_produtos, renderizar).result()
+
+            registro = {**contexto, 'caso': nome, 'tamanho': tamanho, **medida}
+            registros.append(registro)
+            with open(saida, 'a') as f:
+                f.write(json.dumps(registro) + '\n')
+            print(f"{tamanho:>11,} {nome:<36} agregação {medida['tempo_agregacao_s']:8.3f}s  "
+                  f"pico {medida['pico_rss_mb']:8.1f} MB")
+    return registros
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark das agregações e gráficos do EDA.')
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=TAMANHOS_PADRAO,
+                        help='números de linhas de vendas (ex.: 10000 1000000 50000000)')
+    parser.add_argument('--casos', nargs='+', default=None, help='subconjunto dos casos')
+    parser.add_argument('--saida', default=PATH_RESULTADOS, help='arquivo JSON Lines de resultados')
+    parser.add_argument('--sem-render', action='store_true', help='mede apenas as agregações')
+    args = parser.parse_args()
+
+    executar(args.tamanhos, args.casos, args.saida, renderizar=not args.sem_render)
@@ -0,0 +1,83 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+#Configurações Globais do Módulo
+
+PATH_RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PASTAS_SRC = [os.path.join(PATH_RAIZ, 'src', p) for p in ('plots', 'analytics', 'utils')]
+
+# Módulos medidos e orçamento de importação (ms), descontado o pandas/numpy,
+# que a camada de métricas precisa de qualquer forma
+MODULOS = [
+    'metricas_vendas',
+    'metricas_produtos',
+    'associacao_produtos',
+    'deteccao_sazonal',
+    'previsao_demanda',
+    'repositorio_atributos',
+    'plot_faturamento_filial',
+    'plots_faturamento',
+    'plot_sazonalidade',
+    'plots_produtos',
+    'plots_catalogo_produtos',
+    'renderizacao',
+]
+ORCAMENTO_MS = 50.0
+
+# Bibliotecas que não podem ser carregadas só pela importação
+BIBLIOTECAS_PESADAS = ['matplotlib', 'seaborn']
+
+# Código executado em um interpretador novo para cada módulo
+_MEDICAO = '''
+import json, sys, time
+sys.path[:0] = {pastas!r}
+import numpy, pandas
+inicio = time.perf_counter()
+import {modulo}
+tempo_ms = (time.perf_counter() - inicio) * 1000
+print(json.dumps({{'tempo_ms': tempo_ms, 'carregadas': [b for b in {pesadas!r} if b in sys.modules]}}))
+'''
+
+
+#Medição
+
+def medir_importacao(modulo, repeticoes=5):
+    """
+    Importa 'modulo' em interpretadores novos (com pandas e numpy já
+    carregados) e retorna o menor tempo em ms e as bibliotecas gráficas que
+    a importação carregou.
+    """
+    codigo = _MEDICAO.format(pastas=PASTAS_SRC, modulo=modulo, pesadas=BIBLIOTECAS_PESADAS)
+    medidas = []
+    for _ in range(repeticoes):
+        saida = subprocess.run([sys.executable, '-c', codigo], capture_output=True, text=True, check=True)
+        medidas.append(json.loads(saida.stdout.strip().splitlines()[-1]))
+    return min(m['tempo_ms'] for m in medidas), medidas[-1]['carregadas']
+
+def verificar_orcamento(modulos=MODULOS, orcamento_ms=ORCAMENTO_MS, repeticoes=5):
+    """Mede cada módulo e retorna a lista de violações (vazia se tudo dentro do orçamento)."""
+    violacoes = []
+    for modulo in modulos:
+        tempo_ms, carregadas = medir_importacao(modulo, repeticoes)
+        situacao = 'ok'
+        if tempo_ms > orcamento_ms:
+            situacao = f'acima do orçamento ({orcamento_ms:.0f} ms)'
+        if carregadas:
+            situacao = f"carrega {', '.join(carregadas)} na importação"
+        if situacao != 'ok':
+            violacoes.append((modulo, situacao))
+        print(f'{modulo:<28} {tempo_ms:8.1f} ms  {situacao}')
+    return violacoes
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Orçamento de tempo de importação dos módulos de plots e métricas.')
+    parser.add_argument('--modulos', nargs='+', default=MODULOS)
+    parser.add_argument('--orcamento-ms', type=float, default=ORCAMENTO_MS)
+    parser.add_argument('--repeticoes', type=int, default=5)
+    args = parser.parse_args()
+
+    sys.exit(1 if verificar_orcamento(args.modulos, args.orcamento_ms, args.repeticoes) else 0)
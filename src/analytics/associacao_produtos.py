@@ -0,0 +1,329 @@
+import itertools
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import cestas as cs
+from cache_agregacoes import memorizar
+
+#Configurações Globais do Módulo
+
+# Níveis de item aceitos (colunas das vendas unidas ao catálogo)
+NIVEIS = ('SKU', 'NOME_PRODUTO', 'SUBCATEGORIA', 'CATEGORIA')
+
+# Partições mineradas em separado (e em paralelo): None = todas as cestas
+PARTICOES = (None, 'FILIAL', 'MES_NUM')
+
+# Parâmetros padrão: fração mínima de cestas com o itemset, maior itemset
+# procurado e limites das regras
+SUPORTE_MINIMO = 0.01
+TAMANHO_MAXIMO = 3
+CONFIANCA_MINIMA = 0.2
+LIFT_MINIMO = 1.0
+
+# Combinações geradas por lote na contagem de cada nível (limita a memória)
+COMBINACOES_POR_LOTE = 4_000_000
+
+# Itens por cesta na busca de itemsets com 2 ou mais itens: as combinações de
+# uma cesta crescem como C(largura, k), então cestas mais largas (ex.: compras
+# de atacado no nível SKU) entram só com os seus itens de maior suporte
+ITENS_MAXIMOS_CESTA = 64
+
+
+#Matriz Cesta x Item
+
+class MatrizCestas:
+    """
+    Matriz esparsa binária cesta x item em formato CSR: os itens distintos
+    da cesta i são indices[indptr[i]:indptr[i + 1]] (códigos em ordem
+    crescente) e 'itens' traz o rótulo de cada código (SKU, subcategoria...).
+    """
+
+    def __init__(self, indptr, indices, itens):
+        self.indptr = indptr
+        self.indices = indices
+        self.itens = itens
+
+    @property
+    def n_cestas(self):
+        return len(self.indptr) - 1
+
+    @property
+    def n_itens(self):
+        return len(self.itens)
+
+    def suporte_itens(self):
+        """Número de cestas com cada item."""
+        return np.bincount(self.indices, minlength=self.n_itens)
+
+    def submatriz(self, cestas):
+        """Linhas (cestas) selecionadas, com os mesmos códigos de item."""
+        inicio = self.indptr[cestas]
+        tamanhos = self.indptr[cestas + 1] - inicio
+        indptr = np.r_[0, np.cumsum(tamanhos)].astype(np.int64)
+        posicoes = np.repeat(inicio - indptr[:-1], tamanhos) + np.arange(indptr[-1])
+        return MatrizCestas(indptr, self.indices[posicoes], self.itens)
+
+    def esparsa(self):
+        """A mesma matriz como scipy.sparse.csr_matrix (booleana)."""
+        try:
+            from scipy import sparse
+        except ImportError as erro:
+            raise ImportError('A conversão precisa do pacote scipy (pip install scipy).') from erro
+        dados = np.ones(len(self.indices), dtype=bool)
+        return sparse.csr_matrix((dados, self.indices, self.indptr), shape=(self.n_cestas, self.n_itens))
+
+
+def matriz_cestas(df_vendas_produtos, nivel='SUBCATEGORIA', excluir=()):
+    """
+    Matriz cesta x item das vendas unidas ao catálogo (saída do
+    merge_datasets): as cestas são as de cestas.obter_cestas (CLI_CPF,
+    filial e dia) e os itens, os valores distintos de 'nivel' em cada cesta.
+    Valores em 'excluir' e itens nulos (SKU fora do catálogo) ficam de fora.
+    """
+    if nivel not in NIVEIS:
+        raise ValueError(f"nivel deve ser um de {NIVEIS}, não '{nivel}'.")
+
+    cestas = cs.obter_cestas(df_vendas_produtos)
+    serie = df_vendas_produtos[nivel]
+    if excluir:
+        serie = serie.where(~serie.isin(list(excluir)))
+    codigos, itens = pd.factorize(serie, sort=True)
+
+    # Pares (cesta, item) distintos, ordenados por cesta e item
+    validas = (cestas.ids >= 0) & (codigos >= 0)
+    n_itens = max(len(itens), 1)
+    pares = np.unique(cestas.ids[validas].astype(np.int64) * n_itens + codigos[validas])
+    cesta, indices = np.divmod(pares, n_itens)
+
+    indptr = np.r_[0, np.cumsum(np.bincount(cesta, minlength=cestas.n_cestas))].astype(np.int64)
+    return MatrizCestas(indptr, indices.astype(np.int32), pd.Index(itens, name=nivel))
+
+
+#Itemsets Frequentes
+# Busca em níveis (Apriori) com contagem vetorizada: em cada nível, as
+# cestas mantêm só os itens dos itemsets frequentes do nível anterior, as
+# combinações de k itens de cada cesta viram chaves int64 (base = número
+# de itens frequentes) e uma única contagem (np.unique) dá o suporte.
+
+def _contidas(chaves, chaves_ordenadas):
+    # Pertinência por busca binária (chaves_ordenadas em ordem crescente)
+    posicoes = np.minimum(np.searchsorted(chaves_ordenadas, chaves), len(chaves_ordenadas) - 1)
+    return chaves_ordenadas[posicoes] == chaves
+
+def _limitar_cestas(cesta, itens, suporte, itens_maximos):
+    # Cestas com mais de 'itens_maximos' itens ficam com os de maior suporte
+    # (empates pelo código); a ordem por cesta e item se mantém
+    tamanhos = np.bincount(cesta)
+    if len(tamanhos) == 0 or tamanhos.max() <= itens_maximos:
+        return cesta, itens
+    ordem = np.lexsort((itens, -suporte[itens], cesta))
+    posicao = np.arange(len(ordem)) - (np.cumsum(tamanhos) - tamanhos)[cesta[ordem]]
+    manter = np.sort(ordem[posicao < itens_maximos])
+    return cesta[manter], itens[manter]
+
+def _contar_nivel(itens, inicio, tamanhos, k, base, chaves_anteriores):
+    # Suporte de cada k-itemset presente nas cestas (chaves e contagens)
+    potencias = base ** np.arange(k - 1, -1, -1, dtype=np.int64)
+    partes_chaves, partes_contagens = [], []
+
+    for tamanho in np.unique(tamanhos[tamanhos >= k]):
+        n_combinacoes = math.comb(int(tamanho), k)
+        combinacoes = np.fromiter(itertools.chain.from_iterable(itertools.combinations(range(tamanho), k)),
+                                  dtype=np.int64, count=n_combinacoes * k).reshape(n_combinacoes, k)
+        inicios = inicio[tamanhos == tamanho]
+        por_lote = max(COMBINACOES_POR_LOTE // len(combinacoes), 1)
+
+        for lote in range(0, len(inicios), por_lote):
+            linhas = itens[inicios[lote:lote + por_lote, None] + np.arange(tamanho)]
+            itemsets = linhas[:, combinacoes].reshape(-1, k)
+
+            # Apriori: todos os subconjuntos de k - 1 itens precisam ser frequentes
+            if k > 2:
+                for j in range(k):
+                    subconjunto = np.delete(itemsets, j, axis=1)
+                    itemsets = itemsets[_contidas(subconjunto @ potencias[1:], chaves_anteriores)]
+
+            chaves, contagens = np.unique(itemsets @ potencias, return_counts=True)
+            partes_chaves.append(chaves)
+            partes_contagens.append(contagens)
+
+    if not partes_chaves:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    chaves, inversos = np.unique(np.concatenate(partes_chaves), return_inverse=True)
+    return chaves, np.bincount(inversos, weights=np.concatenate(partes_contagens)).astype(np.int64)
+
+def minerar_itemsets(indptr, indices, cestas_minimas, tamanho_maximo=TAMANHO_MAXIMO,
+                     itens_maximos=ITENS_MAXIMOS_CESTA):
+    """
+    Itemsets presentes em pelo menos 'cestas_minimas' cestas da matriz CSR
+    (indptr, indices), com até 'tamanho_maximo' itens. Retorna uma lista
+    com um par (itemsets, contagens) por tamanho: 'itemsets' é uma matriz
+    (n x k) de códigos de item em ordem crescente. A partir de 2 itens, cada
+    cesta entra com no máximo 'itens_maximos' itens frequentes (os de maior
+    suporte); em cestas mais largas que isso, a contagem dos itemsets com
+    os itens descartados é um limite inferior.
+    """
+    niveis = []
+    contagens = np.bincount(indices) if len(indices) else np.zeros(0, dtype=np.int64)
+    frequentes = np.flatnonzero(contagens >= cestas_minimas)
+    if len(frequentes) == 0:
+        return niveis
+    niveis.append((frequentes[:, None], contagens[frequentes]))
+
+    # 1. Itens frequentes renumerados 0..base-1 (a ordem se mantém)
+    base = len(frequentes)
+    novo_codigo = np.full(len(contagens), -1, dtype=np.int64)
+    novo_codigo[frequentes] = np.arange(base)
+    itens = novo_codigo[indices]
+    cesta = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+    cesta, itens = cesta[itens >= 0], itens[itens >= 0]
+    cesta, itens = _limitar_cestas(cesta, itens, contagens[frequentes], itens_maximos)
+    chaves = np.arange(base, dtype=np.int64)
+
+    # 2. Um nível por tamanho de itemset
+    for k in range(2, tamanho_maximo + 1):
+        if k * math.log2(base) >= 63:
+            raise ValueError(f'{base} itens frequentes não cabem em chaves de {k} itens; '
+                             'aumente o suporte_minimo ou reduza o tamanho_maximo.')
+        tamanhos = np.bincount(cesta, minlength=len(indptr) - 1)
+        inicio = np.cumsum(tamanhos) - tamanhos
+        chaves, contagens = _contar_nivel(itens, inicio, tamanhos, k, base, chaves)
+
+        manter = contagens >= cestas_minimas
+        chaves, contagens = chaves[manter], contagens[manter]
+        if len(chaves) == 0:
+            break
+        itemsets = np.stack([(chaves // base ** (k - 1 - j)) % base for j in range(k)], axis=1)
+        niveis.append((frequentes[itemsets], contagens))
+
+        # As cestas do próximo nível mantêm só os itens de algum k-itemset frequente
+        presentes = np.isin(itens, np.unique(itemsets))
+        cesta, itens = cesta[presentes], itens[presentes]
+    return niveis
+
+def _minerar_particao(indptr, indices, suporte_minimo, tamanho_maximo):
+    # Executado em cada processo: suporte relativo às cestas da partição
+    n_cestas = len(indptr) - 1
+    cestas_minimas = max(math.ceil(suporte_minimo * n_cestas), 1)
+    return n_cestas, minerar_itemsets(indptr, indices, cestas_minimas, tamanho_maximo)
+
+def _particoes_cestas(df_vendas_produtos, n_cestas, particao, ano):
+    # Rótulo e cestas de cada partição, pela primeira linha de cada cesta
+    if particao not in PARTICOES:
+        raise ValueError(f'particao deve ser uma de {PARTICOES}, não {particao!r}.')
+
+    cestas = cs.obter_cestas(df_vendas_produtos)
+    primeiras = cestas.ordem[cestas.offsets[:-1]]
+    datas = pd.to_datetime(df_vendas_produtos['DATA_ATEND'].iloc[primeiras]).reset_index(drop=True)
+    selecionadas = np.ones(n_cestas, dtype=bool) if ano is None else (datas.dt.year == ano).to_numpy()
+
+    if particao is None:
+        return [(None, np.flatnonzero(selecionadas))]
+    if particao == 'MES_NUM':
+        valores = datas.dt.month
+    else:
+        valores = df_vendas_produtos[particao].iloc[primeiras].reset_index(drop=True)
+    codigos, rotulos = pd.factorize(valores, sort=True)
+    return [(rotulo, np.flatnonzero(selecionadas & (codigos == i))) for i, rotulo in enumerate(rotulos)]
+
+@memorizar
+def itemsets_frequentes(df_vendas_produtos, nivel='SUBCATEGORIA', suporte_minimo=SUPORTE_MINIMO,
+                        tamanho_maximo=TAMANHO_MAXIMO, particao=None, ano=None, excluir=(), processos=1):
+    """
+    Itemsets frequentes de 'nivel' (SKU, NOME_PRODUTO, SUBCATEGORIA ou
+    CATEGORIA) nas cestas de compra: ITENS (tupla de rótulos), TAMANHO,
+    CESTAS e SUPORTE (fração das cestas). Com 'particao' ('FILIAL' ou
+    'MES_NUM'), cada partição é minerada em separado, com o suporte relativo
+    às suas cestas, e 'processos' > 1 distribui as partições em um pool de
+    processos. 'ano' separa um ano do histórico.
+    """
+    matriz = matriz_cestas(df_vendas_produtos, nivel, excluir)
+    particoes = _particoes_cestas(df_vendas_produtos, matriz.n_cestas, particao, ano)
+    submatrizes = [matriz.submatriz(cestas) for _, cestas in particoes]
+    argumentos = ([m.indptr for m in submatrizes], [m.indices for m in submatrizes],
+                  [suporte_minimo] * len(submatrizes), [tamanho_maximo] * len(submatrizes))
+
+    if processos > 1 and len(submatrizes) > 1:
+        with ProcessPoolExecutor(max_workers=min(processos, len(submatrizes))) as executor:
+            resultados = list(executor.map(_minerar_particao, *argumentos))
+    else:
+        resultados = list(map(_minerar_particao, *argumentos))
+
+    rotulos_itens = matriz.itens.to_numpy()
+    partes = []
+    for (rotulo, _), (n_cestas, niveis) in zip(particoes, resultados):
+        for itemsets, contagens in niveis:
+            df_nivel = pd.DataFrame({
+                'ITENS': [tuple(t) for t in rotulos_itens[itemsets].tolist()],
+                'TAMANHO': itemsets.shape[1],
+                'CESTAS': contagens,
+                'SUPORTE': contagens / n_cestas,
+            })
+            if particao is not None:
+                df_nivel.insert(0, particao, rotulo)
+            partes.append(df_nivel)
+
+    colunas = ([particao] if particao else []) + ['ITENS', 'TAMANHO', 'CESTAS', 'SUPORTE']
+    if not partes:
+        return pd.DataFrame(columns=colunas)
+    ordem = ([particao] if particao else []) + ['TAMANHO', 'CESTAS']
+    return pd.concat(partes, ignore_index=True).sort_values(
+        ordem, ascending=[True] * (len(ordem) - 1) + [False], kind='stable', ignore_index=True
+    )
+
+
+#Regras de Associação
+
+def _divisoes(itens):
+    # (antecedente, consequente) de cada divisão do itemset em duas partes
+    return [
+        (antecedente, tuple(i for i in itens if i not in antecedente))
+        for r in range(1, len(itens))
+        for antecedente in itertools.combinations(itens, r)
+    ]
+
+@memorizar
+def regras_associacao(df_vendas_produtos, nivel='SUBCATEGORIA', suporte_minimo=SUPORTE_MINIMO,
+                      confianca_minima=CONFIANCA_MINIMA, lift_minimo=LIFT_MINIMO, tamanho_maximo=TAMANHO_MAXIMO,
+                      particao=None, ano=None, excluir=(), processos=1):
+    """
+    Regras "quem compra ANTECEDENTE também compra CONSEQUENTE" a partir dos
+    itemsets frequentes: CESTAS e SUPORTE do itemset completo, CONFIANCA
+    (suporte / suporte do antecedente) e LIFT (confiança / suporte do
+    consequente), filtradas por 'confianca_minima' e 'lift_minimo' e em
+    ordem decrescente de LIFT (por partição, quando houver).
+    """
+    df_itemsets = itemsets_frequentes(df_vendas_produtos, nivel, suporte_minimo, tamanho_maximo,
+                                      particao, ano, excluir, processos)
+    chaves = [particao] if particao else []
+    colunas = chaves + ['ANTECEDENTE', 'CONSEQUENTE', 'CESTAS', 'SUPORTE', 'CONFIANCA', 'LIFT']
+
+    df_regras = df_itemsets.loc[df_itemsets['TAMANHO'] >= 2]
+    if df_regras.empty:
+        return pd.DataFrame(columns=colunas)
+
+    # 1. Uma linha por divisão (antecedente, consequente) de cada itemset
+    df_regras = df_regras.assign(DIVISAO=df_regras['ITENS'].map(_divisoes)).explode('DIVISAO')
+    df_regras['ANTECEDENTE'] = df_regras['DIVISAO'].str[0]
+    df_regras['CONSEQUENTE'] = df_regras['DIVISAO'].str[1]
+
+    # 2. Suportes do antecedente e do consequente (também frequentes, pelo Apriori)
+    suportes = df_itemsets[chaves + ['ITENS', 'SUPORTE']]
+    for lado in ('ANTECEDENTE', 'CONSEQUENTE'):
+        df_regras = df_regras.merge(
+            suportes.rename(columns={'ITENS': lado, 'SUPORTE': f'SUPORTE_{lado}'}), on=chaves + [lado], how='left'
+        )
+    df_regras['CONFIANCA'] = df_regras['SUPORTE'] / df_regras['SUPORTE_ANTECEDENTE']
+    df_regras['LIFT'] = df_regras['CONFIANCA'] / df_regras['SUPORTE_CONSEQUENTE']
+
+    df_regras = df_regras.loc[(df_regras['CONFIANCA'] >= confianca_minima) & (df_regras['LIFT'] >= lift_minimo)]
+    return df_regras[colunas].sort_values(
+        chaves + ['LIFT'], ascending=[True] * len(chaves) + [False], kind='stable', ignore_index=True
+    )
+
+def regras_com_item(df_regras, item, lado='ANTECEDENTE'):
+    """Regras com 'item' (ex.: 'Bacalhau') no ANTECEDENTE ou no CONSEQUENTE."""
+    return df_regras.loc[df_regras[lado].map(lambda itens: item in itens)]
@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+
+import cubo_vendas as cv
+from cache_agregacoes import memorizar
+
+#Configurações Globais do Módulo
+
+# Escore z robusto a partir do qual um mês é pico sazonal
+LIMIAR_Z = 2.0
+
+# Constante do escore z robusto (Iglewicz e Hoaglin): 0.6745 = quantil 75%
+# da normal, que torna a MAD comparável ao desvio padrão
+CONSTANTE_MAD = 0.6745
+
+# Dias médios de cada mês: os totais mensais viram médias diárias antes da
+# detecção (fevereiro não parece vale só por ter menos dias)
+DIAS_POR_MES = np.array([31, 28.25, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+
+MESES = list(range(1, 13))
+
+
+#Escore Z Robusto
+
+def escore_z_robusto(matriz):
+    """
+    Escore z robusto de cada valor em relação à sua linha (uma série por
+    linha): 0.6745 * (x - mediana) / MAD. Quando a MAD é zero (mais da
+    metade dos meses iguais), usa o desvio absoluto médio * 1.2533; séries
+    constantes ficam com escore 0. Vetorizado sobre todas as linhas.
+    """
+    matriz = np.asarray(matriz, dtype=np.float64)
+    mediana = np.median(matriz, axis=1, keepdims=True)
+    desvios = np.abs(matriz - mediana)
+    mad = np.median(desvios, axis=1, keepdims=True)
+
+    escala = mad / CONSTANTE_MAD
+    escala_media = desvios.mean(axis=1, keepdims=True) * 1.2533
+    escala = np.where(mad > 0, escala, escala_media)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(escala > 0, (matriz - mediana) / escala, 0.0)
+
+
+#Detecção de Meses de Pico
+
+def _matriz_mensal(df_agregado, dimensoes, medida):
+    # Uma linha por série (combinação das dimensões) e uma coluna por mês;
+    # meses sem venda entram como zero
+    if dimensoes:
+        matriz = df_agregado.pivot_table(index=dimensoes, columns='MES_NUM', values=medida,
+                                         aggfunc='sum', observed=True)
+    else:
+        matriz = df_agregado.groupby('MES_NUM')[medida].sum().to_frame().T
+    return matriz.reindex(columns=MESES).fillna(0)
+
+@memorizar
+def meses_pico(df, dimensoes=(), medida='QTD_VENDA', filtros=None, ano=None, limiar=LIMIAR_Z):
+    """
+    Escore z robusto de cada mês em cada série mensal (ex.: dimensoes=
+    ['FILIAL', 'CATEGORIA'] detecta os picos de todas as categorias de
+    cada loja de uma vez): as dimensões pedidas, MES_NUM, a medida somada,
+    MEDIA_DIA (medida / dias do mês), ESCORE_Z e PICO (escore >= limiar).
+    Parte das somas do cubo; 'filtros' e 'ano' seguem CuboVendas.agregar.
+    """
+    dimensoes = list(dimensoes)
+    cubo = cv.obter_cubo(df)
+    df_agregado = cubo.agregar(['MES_NUM'] + dimensoes, filtros=cubo.filtros_ano(ano, filtros), medidas=[medida])
+    colunas = dimensoes + ['MES_NUM', medida, 'MEDIA_DIA', 'ESCORE_Z', 'PICO']
+    if df_agregado.empty:
+        return pd.DataFrame(columns=colunas)
+
+    matriz = _matriz_mensal(df_agregado, dimensoes, medida)
+    media_dia = matriz.to_numpy(dtype=np.float64) / DIAS_POR_MES
+    escores = escore_z_robusto(media_dia)
+
+    # Volta ao formato longo: uma linha por série e mês
+    n_series = len(matriz)
+    df_pico = pd.DataFrame({
+        'MES_NUM': np.tile(MESES, n_series),
+        medida: matriz.to_numpy().ravel(),
+        'MEDIA_DIA': media_dia.ravel(),
+        'ESCORE_Z': escores.ravel(),
+    })
+    df_pico['PICO'] = df_pico['ESCORE_Z'] >= limiar
+    if dimensoes:
+        chaves = matriz.index.to_frame(index=False).loc[np.repeat(np.arange(n_series), len(MESES))]
+        df_pico = pd.concat([chaves.reset_index(drop=True), df_pico], axis=1)
+    return df_pico[colunas]
+
+def meses_outliers(df, filtros=None, medida='QTD_VENDA', ano=None, limiar=LIMIAR_Z):
+    """
+    Meses de pico (lista de MES_NUM em ordem) da série total das vendas, ou
+    da série restrita por 'filtros' (ex.: {'SUBCATEGORIA': ['Bacalhau']}).
+    Se nenhum mês passa do limiar, devolve o mês de maior escore, para que
+    os gráficos sazonais sempre tenham ao menos um mês.
+    """
+    df_pico = meses_pico(df, medida=medida, filtros=filtros, ano=ano, limiar=limiar)
+    if df_pico.empty:
+        return []
+    meses = df_pico.loc[df_pico['PICO'], 'MES_NUM'].tolist()
+    return meses or [int(df_pico.loc[df_pico['ESCORE_Z'].idxmax(), 'MES_NUM'])]
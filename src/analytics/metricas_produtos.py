@@ -0,0 +1,165 @@
+import cubo_vendas as cv
+import deteccao_sazonal as dz
+import motor_consultas as mc
+from catalogo_produtos import obter_catalogo
+from cache_agregacoes import memorizar
+
+#Funções Auxiliares
+
+def ranking_top_n(df_agregado, n_top=None, grupo='MES_NUM', valor='QTD_VENDA',
+                  coluna_total='TOTAL_MES', manter_empates=False):
+    """
+    Calcula o PERCENTUAL de cada linha no total do seu grupo (ex.: mês) e
+    mantém as n_top linhas de maior percentual por grupo, em uma única
+    ordenação vetorizada (substitui o groupby(...).apply(nlargest)).
+
+    'grupo' aceita uma coluna ou uma lista de colunas. Com manter_empates=True,
+    linhas empatadas com a n-ésima também são mantidas (nlargest keep='all');
+    caso contrário, vale a primeira ocorrência (keep='first'). Com n_top=None,
+    devolve todas as linhas com o percentual calculado.
+    """
+    grupo = [grupo] if isinstance(grupo, str) else list(grupo)
+    df = df_agregado.copy()
+
+    # 1. Participação de cada linha no total do grupo
+    df[coluna_total] = df.groupby(grupo, observed=True)[valor].transform('sum')
+    df['PERCENTUAL'] = (df[valor] / df[coluna_total]) * 100
+    if n_top is None:
+        return df
+
+    # 2. Ordena por grupo e percentual decrescente (ordenação estável) e
+    #    numera as linhas dentro de cada grupo
+    df = df.sort_values(grupo + ['PERCENTUAL'], ascending=[True] * len(grupo) + [False], kind='stable')
+    if manter_empates:
+        posicao = df.groupby(grupo, observed=True)['PERCENTUAL'].rank(method='min', ascending=False)
+        return df.loc[posicao <= n_top]
+    posicao = df.groupby(grupo, observed=True).cumcount()
+    return df.loc[posicao < n_top]
+
+def _top_participacao(df, dimensoes, medida, n_top):
+    # Participação (%) de cada grupo no total da medida, em ordem decrescente
+    df_agregado = cv.obter_cubo(df).agregar(dimensoes, medidas=[medida])
+    df_agregado['PERCENTUAL'] = (df_agregado[medida] / df_agregado[medida].sum()) * 100
+    return df_agregado.sort_values('PERCENTUAL', ascending=False).head(n_top)
+
+
+#Rankings Anuais
+# Funções puras: recebem as vendas unidas ao catálogo (DataFrame ou
+# CuboVendas) e devolvem o DataFrame agregado pronto para o gráfico.
+
+@memorizar
+def top_categorias_volume(df, n_top=10):
+    """Categorias com maior participação (%) no volume total (QTD_VENDA)."""
+    return _top_participacao(df, ['CATEGORIA'], 'QTD_VENDA', n_top)
+
+@memorizar
+def top_subcategorias_volume(df, n_top=10):
+    """Subcategorias com maior participação (%) no volume total (QTD_VENDA)."""
+    return _top_participacao(df, ['SUBCATEGORIA'], 'QTD_VENDA', n_top)
+
+@memorizar
+@mc.consulta_externa('top_categorias_faturamento')
+def top_categorias_faturamento(df, n_top=10):
+    """Categorias de maior faturamento (CATEGORIA, Faturamento_Total)."""
+    df_faturamento_categoria = cv.obter_cubo(df).agregar(
+        ['CATEGORIA'], medidas=['FATUR_VENDA']
+    ).rename(columns={'FATUR_VENDA': 'Faturamento_Total'})
+    return df_faturamento_categoria.sort_values(by='Faturamento_Total', ascending=False).head(n_top)
+
+@memorizar
+@mc.consulta_externa('top_produtos_faturamento')
+def top_produtos_faturamento(df, n_top=20):
+    """Produtos de maior faturamento (NOME_PRODUTO, CATEGORIA, Faturamento_Total)."""
+    df_faturamento_produto = cv.obter_cubo(df).agregar(
+        ['NOME_PRODUTO', 'CATEGORIA'], medidas=['FATUR_VENDA']
+    ).rename(columns={'FATUR_VENDA': 'Faturamento_Total'})
+    return df_faturamento_produto.sort_values(by='Faturamento_Total', ascending=False).head(n_top)
+
+@memorizar
+def top_produtos_volume(df, n_top=20):
+    """Produtos de maior volume (NOME_PRODUTO, CATEGORIA, Volume_Total)."""
+    df_volume_produto = cv.obter_cubo(df).agregar(
+        ['NOME_PRODUTO', 'CATEGORIA'], medidas=['QTD_VENDA']
+    ).rename(columns={'QTD_VENDA': 'Volume_Total'})
+    return df_volume_produto.sort_values(by='Volume_Total', ascending=False).head(n_top)
+
+
+#Rankings Mensais e Sazonais
+
+@memorizar
+def volume_mensal(df, dimensao, meses=None, filtros=None, ano=None):
+    """
+    Volume (QTD_VENDA) por mês e 'dimensao' (ex.: CATEGORIA). 'meses'
+    restringe os meses considerados e 'filtros' aplica filtros adicionais do
+    cubo (ex.: {'CATEGORIA': ['Doceria']}). 'ano' separa um ano do histórico.
+    """
+    cubo = cv.obter_cubo(df)
+    filtros = dict(filtros or {})
+    if meses is not None:
+        filtros['MES_NUM'] = meses
+    return cubo.agregar(['MES_NUM', dimensao], filtros=cubo.filtros_ano(ano, filtros), medidas=['QTD_VENDA'])
+
+def top_n_mensal(df, dimensao, n_top, meses=None, filtros=None, coluna_total='TOTAL_MES', ano=None):
+    """
+    Top n_top valores de 'dimensao' por participação (%) no volume de cada
+    mês. A agregação fica no cache; mudar só o n_top refaz apenas o ranking.
+    """
+    return ranking_top_n(volume_mensal(df, dimensao, meses, filtros, ano), n_top, coluna_total=coluna_total)
+
+def top_categorias_mensal(df, n_top):
+    return top_n_mensal(df, 'CATEGORIA', n_top)
+
+# Nas funções sazonais, outliers=None usa os meses de pico detectados nos
+# dados (deteccao_sazonal.meses_outliers) no lugar de uma lista fixa
+
+def top_categorias_sazonais(df, n_top, outliers=None):
+    outliers = dz.meses_outliers(df) if outliers is None else outliers
+    return top_n_mensal(df, 'CATEGORIA', n_top, meses=outliers)
+
+def top_subcategorias_sazonais(df, n_top, outliers=None):
+    outliers = dz.meses_outliers(df) if outliers is None else outliers
+    return top_n_mensal(df, 'SUBCATEGORIA', n_top, meses=outliers)
+
+def top_produtos_sazonais(df, n_top, outliers, categoria):
+    """
+    Top n_top produtos por participação no volume da 'categoria' em cada mês
+    sazonal (outliers=None: meses de pico da própria categoria).
+    """
+    filtros = {'CATEGORIA': [categoria]}
+    outliers = dz.meses_outliers(df, filtros) if outliers is None else outliers
+    return top_n_mensal(df, 'NOME_PRODUTO', n_top, meses=outliers, filtros=filtros, coluna_total='TOTAL_MES_CAT')
+
+def participacao_categoria_mensal(df, categoria, meses):
+    """Participação (%) da 'categoria' no volume total de cada um dos 'meses'."""
+    df_agregado = top_n_mensal(df, 'CATEGORIA', None, meses=meses)
+    return df_agregado.loc[df_agregado['CATEGORIA'] == categoria]
+
+@memorizar
+def participacao_subcategoria_filial(df, subcategoria, meses, ano=None):
+    """Participação (%) de cada filial no volume da 'subcategoria' em cada um dos 'meses'."""
+    cubo = cv.obter_cubo(df)
+    df_agregado = cubo.agregar(
+        ['MES_NUM', 'FILIAL'],
+        filtros=cubo.filtros_ano(ano, {'MES_NUM': meses, 'SUBCATEGORIA': [subcategoria]}),
+        medidas=['QTD_VENDA']
+    )
+    return ranking_top_n(df_agregado, coluna_total='TOTAL_MES_SUBCAT')
+
+
+#Catálogo de Produtos
+
+@memorizar
+def distribuicao_catalogo(df_produtos, coluna, excluir=('',), n_top=10):
+    """
+    Participação (%) dos n_top valores mais frequentes de 'coluna' (ex.:
+    CATEGORIA) no catálogo, ignorando os valores em 'excluir'. As categorias
+    já vêm sem espaços do catálogo normalizado (sem strip a cada chamada).
+    """
+    valores = obter_catalogo(df_produtos).produtos[coluna]
+    valores = valores[~valores.isin(list(excluir))].cat.remove_unused_categories()
+    top = valores.value_counts(normalize=True).head(n_top)
+
+    df_top = top.reset_index()
+    df_top.columns = [coluna, 'PERCENTUAL']
+    df_top['PERCENTUAL'] = df_top['PERCENTUAL'] * 100
+    return df_top
@@ -0,0 +1,216 @@
+import pandas as pd
+
+import calendario as cal
+import cestas as cs
+import cubo_vendas as cv
+import motor_consultas as mc
+import periodos as pr
+from cache_agregacoes import memorizar
+
+#Configurações Globais do Módulo
+
+# Ordem dos dias da semana (nomes do pandas, dt.day_name())
+ORDEM_DIAS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
+#Métricas de Faturamento
+# Funções puras: recebem as vendas (DataFrame ou CuboVendas) e devolvem o
+# DataFrame agregado, sem gráficos nem efeitos colaterais no DataFrame de entrada.
+
+@memorizar
+def faturamento_total_filial(df_vendas):
+    """Faturamento total por filial (FILIAL, FATUR_VENDA)."""
+    return cv.obter_cubo(df_vendas).agregar(['FILIAL'], medidas=['FATUR_VENDA'])
+
+@memorizar
+def faturamento_mensal(df_vendas, ano=None):
+    """Faturamento por mês do ano (MES_NUM, FATUR_VENDA), em ordem de mês."""
+    cubo = cv.obter_cubo(df_vendas)
+    df_agregado = cubo.agregar(['MES_NUM'], filtros=cubo.filtros_ano(ano), medidas=['FATUR_VENDA'])
+    return df_agregado.sort_values('MES_NUM', ignore_index=True)
+
+@memorizar
+@mc.consulta_externa('faturamento_mensal_filial')
+def faturamento_mensal_filial(df_vendas, ano=None):
+    """Faturamento por mês do ano e filial (MES_NUM, FILIAL, FATUR_VENDA)."""
+    cubo = cv.obter_cubo(df_vendas)
+    return cubo.agregar(['MES_NUM', 'FILIAL'], filtros=cubo.filtros_ano(ano), medidas=['FATUR_VENDA'])
+
+@memorizar
+def faturamento_sazonal_categorias(df_vendas_produtos, ano=None):
+    """
+    Faturamento por categoria, mês e filial (CATEGORIA, MES_NUM, FILIAL,
+    FATUR_VENDA) de todas as categorias em uma única agregação. As
+    categorias saem sem espaços ('Natal ' e 'Natal' viram uma só).
+    """
+    cubo = cv.obter_cubo(df_vendas_produtos)
+    df_agregado = cubo.agregar(['CATEGORIA', 'MES_NUM', 'FILIAL'], filtros=cubo.filtros_ano(ano), medidas=['FATUR_VENDA'])
+
+    # O strip é feito no agregado (categorias x meses x filiais), não nas linhas de venda
+    categorias = df_agregado['CATEGORIA'].astype(str).str.strip()
+    return df_agregado.assign(CATEGORIA=categorias).groupby(
+        ['CATEGORIA', 'MES_NUM', 'FILIAL'], observed=True
+    )['FATUR_VENDA'].sum().reset_index()
+
+@memorizar
+def faturamento_sazonal_filial(df_vendas_produtos, categorias, ano=None):
+    """
+    Faturamento por mês e filial das 'categorias' pedidas. As categorias são
+    comparadas sem espaços (ex.: 'Natal ' é tratado como 'Natal').
+    """
+    # Recorte do agregado de todas as categorias (calculado uma vez por DataFrame)
+    df_categorias = faturamento_sazonal_categorias(df_vendas_produtos, ano)
+    df_alvo = df_categorias.loc[df_categorias['CATEGORIA'].isin(categorias)]
+    return df_alvo.groupby(['MES_NUM', 'FILIAL'], observed=True)['FATUR_VENDA'].sum().reset_index()
+
+def _ordenar_dias(df_faturamento_medio):
+    # Dias na ordem de segunda a domingo (coluna DIA_ORDEM) e, em cada dia, por filial
+    ordem = pd.Categorical(df_faturamento_medio['DIA_SEMANA'], categories=ORDEM_DIAS, ordered=True)
+    return df_faturamento_medio.assign(DIA_ORDEM=ordem).sort_values(['DIA_ORDEM', 'FILIAL'], ignore_index=True)
+
+@memorizar
+def faturamento_diario(df_vendas):
+    """
+    Faturamento por dia e filial (COD_DIA, FILIAL, FATUR_VENDA) com as
+    colunas do calendário (dia da semana, semana ISO, feriados e datas do
+    varejo). O agrupamento usa o código inteiro do dia; o calendário é
+    montado só para os dias distintos.
+    """
+    codigos = pd.Series(pr.codigos_periodo(df_vendas['DATA_ATEND'], 'dia'), index=df_vendas.index, name='COD_DIA')
+    df_dia = df_vendas.groupby([codigos, df_vendas['FILIAL']], observed=True)['FATUR_VENDA'].sum().reset_index()
+    df_dia = df_dia.loc[df_dia['COD_DIA'] != pr.CODIGO_NULO]
+    return df_dia.merge(cal.construir_calendario(df_dia['COD_DIA']), on='COD_DIA', how='left')
+
+@memorizar
+@mc.consulta_externa('faturamento_medio_dia_semana', pos_processar=_ordenar_dias)
+def faturamento_medio_dia_semana(df_vendas):
+    """
+    Faturamento médio por dia da semana e filial: soma do faturamento dividida
+    pelo número de dias distintos com venda. Não altera 'df_vendas'.
+    """
+    # Calculado sobre o faturamento diário (um registro por dia e filial)
+    df_faturamento_medio = faturamento_diario(df_vendas).groupby(['DIA_SEMANA', 'FILIAL'], observed=True).agg(
+        Soma_Faturamento=('FATUR_VENDA', 'sum'),
+        Num_Dias_Unicos=('COD_DIA', 'nunique') # CONTAGEM DE DIAS ÚNICOS
+    ).reset_index()
+
+    df_faturamento_medio['Faturamento_Medio'] = df_faturamento_medio['Soma_Faturamento'] / df_faturamento_medio['Num_Dias_Unicos']
+    return _ordenar_dias(df_faturamento_medio)
+
+@memorizar
+def faturamento_medio_datas_especiais(df_vendas):
+    """
+    Faturamento médio por dia em cada feriado ou data comemorativa do varejo
+    (NOME_DATA; 'Dia comum' para os demais dias) e filial, em ordem
+    decrescente de faturamento médio.
+    """
+    df_datas = faturamento_diario(df_vendas).groupby(['NOME_DATA', 'FILIAL'], observed=True).agg(
+        FERIADO=('FERIADO', 'first'),
+        DATA_VAREJO=('DATA_VAREJO', 'first'),
+        Soma_Faturamento=('FATUR_VENDA', 'sum'),
+        Num_Dias_Unicos=('COD_DIA', 'nunique')
+    ).reset_index()
+
+    df_datas['Faturamento_Medio'] = df_datas['Soma_Faturamento'] / df_datas['Num_Dias_Unicos']
+    return df_datas.sort_values('Faturamento_Medio', ascending=False, ignore_index=True)
+
+
+
+#Métricas por Período
+# Períodos de calendário reais (ex.: mar/2023 e mar/2024 separados), com
+# códigos inteiros de período (ver periodos.py)
+
+@memorizar
+def faturamento_por_periodo(df_vendas, granularidade='mes', dimensoes=()):
+    """
+    Faturamento por período ('dia', 'semana', 'mes', 'trimestre' ou 'ano') e
+    pelas 'dimensoes' (ex.: ('FILIAL',)), com PERIODO, INICIO_PERIODO e
+    ROTULO_PERIODO, em ordem cronológica.
+    """
+    df_agregado = pr.agregar_por_periodo(df_vendas, granularidade, dimensoes, medidas=['FATUR_VENDA'])
+    return pr.rotular_periodos(df_agregado.sort_values(['PERIODO'] + list(dimensoes), ignore_index=True), granularidade)
+
+@memorizar
+def faturamento_ano_a_ano(df_vendas, granularidade='mes', dimensoes=()):
+    """
+    Faturamento de cada período ao lado do mesmo período do ano anterior
+    (FATUR_VENDA_ANO_ANTERIOR) e a variação percentual (VARIACAO_ANO_A_ANO).
+    """
+    df_agregado = faturamento_por_periodo(df_vendas, granularidade, dimensoes)
+    return pr.comparar_ano_a_ano(df_agregado, granularidade, 'FATUR_VENDA', dimensoes)
+
+#Métricas de Clientes
+
+@memorizar
+def clientes_unicos_mensal_filial(df_vendas, modo_clientes='exato', ano=None):
+    """
+    Clientes únicos (CLI_CPF distintos) por mês do ano e filial. Com
+    modo_clientes='aproximado', a contagem usa HyperLogLog.
+    """
+    cubo = cv.obter_cubo(df_vendas, modo_clientes=modo_clientes)
+    return cubo.clientes_unicos(['MES_NUM', 'FILIAL'], filtros=cubo.filtros_ano(ano))
+
+@memorizar
+def ticket_medio_mensal_filial(df_vendas, modo_clientes='exato', ano=None):
+    """
+    Faturamento, clientes únicos e ticket médio (faturamento / clientes) por
+    mês e filial: MES_NUM, FILIAL, FATUR_TOTAL, CLIENTES_UNICOS, TICKET_MEDIO.
+    """
+    # Faturamento e clientes saem do mesmo cubo (um único cubo por modo)
+    cubo = cv.obter_cubo(df_vendas, modo_clientes=modo_clientes)
+    df_mes_filial = faturamento_mensal_filial(cubo, ano)
+    df_clientes = cubo.clientes_unicos(['MES_NUM', 'FILIAL'], filtros=cubo.filtros_ano(ano))
+
+    df_agregado_tm = df_mes_filial.merge(df_clientes, on=['MES_NUM', 'FILIAL'], how='left').rename(
+        columns={'FATUR_VENDA': 'FATUR_TOTAL', 'CLI_CPF': 'CLIENTES_UNICOS'}
+    )
+    df_agregado_tm['CLIENTES_UNICOS'] = df_agregado_tm['CLIENTES_UNICOS'].fillna(0)
+    df_agregado_tm['TICKET_MEDIO'] = df_agregado_tm['FATUR_TOTAL'] / df_agregado_tm['CLIENTES_UNICOS']
+
+    return df_agregado_tm.sort_values(by='MES_NUM')
+
+
+#Métricas por Atendimento
+# Cestas = vendas do mesmo CLI_CPF, na mesma filial e no mesmo dia (ver
+# cestas.py); vendas sem CPF não formam cesta
+
+def _resumo_cestas(df_vendas, ano=None):
+    df_cestas = cs.obter_cestas(df_vendas).resumo(df_vendas)
+    datas = pd.to_datetime(df_cestas['DATA_ATEND'])
+    df_cestas = df_cestas.assign(MES_NUM=datas.dt.month)
+    return df_cestas if ano is None else df_cestas.loc[datas.dt.year == ano]
+
+@memorizar
+def ticket_medio_atendimento_mensal_filial(df_vendas, ano=None):
+    """
+    Ticket médio por atendimento por mês e filial: MES_NUM, FILIAL,
+    FATUR_TOTAL (todas as vendas), FATUR_CESTAS (vendas com CPF),
+    ATENDIMENTOS, TICKET_MEDIO (FATUR_CESTAS / ATENDIMENTOS) e
+    ITENS_POR_CESTA.
+    """
+    df_agregado_tm = _resumo_cestas(df_vendas, ano).groupby(['MES_NUM', 'FILIAL'], observed=True).agg(
+        FATUR_CESTAS=('VALOR', 'sum'),
+        ATENDIMENTOS=('ID_CESTA', 'size'),
+        ITENS=('ITENS', 'sum')
+    ).reset_index()
+    df_agregado_tm['TICKET_MEDIO'] = df_agregado_tm['FATUR_CESTAS'] / df_agregado_tm['ATENDIMENTOS']
+    df_agregado_tm['ITENS_POR_CESTA'] = df_agregado_tm.pop('ITENS') / df_agregado_tm['ATENDIMENTOS']
+
+    df_total = faturamento_mensal_filial(df_vendas, ano).rename(columns={'FATUR_VENDA': 'FATUR_TOTAL'})
+    df_agregado_tm = df_total.merge(df_agregado_tm, on=['MES_NUM', 'FILIAL'], how='left')
+    return df_agregado_tm.sort_values(by='MES_NUM', ignore_index=True)
+
+@memorizar
+def distribuicao_tamanho_cesta(df_vendas, medida='N_LINHAS'):
+    """
+    Distribuição do tamanho das cestas por filial: TAMANHO ('N_LINHAS' =
+    linhas distintas da cesta; 'ITENS' = soma de QTD_VENDA), FILIAL,
+    CESTAS e PERCENTUAL das cestas da filial.
+    """
+    df_cestas = _resumo_cestas(df_vendas)
+    df_distribuicao = df_cestas.groupby([df_cestas[medida].rename('TAMANHO'), 'FILIAL'], observed=True).size()
+    df_distribuicao = df_distribuicao.rename('CESTAS').reset_index()
+    df_distribuicao['PERCENTUAL'] = (
+        df_distribuicao['CESTAS'] / df_distribuicao.groupby('FILIAL', observed=True)['CESTAS'].transform('sum') * 100
+    )
+    return df_distribuicao.sort_values(['FILIAL', 'TAMANHO'], ignore_index=True)
@@ -0,0 +1,240 @@
+import functools
+import glob
+import hashlib
+import inspect
+import os
+
+import pandas as pd
+
+from calendario import DIAS_SEMANA
+
+#Configurações Globais do Módulo
+
+# Backends de execução: 'pandas' carrega os arquivos em memória e usa as
+# funções de métricas; 'duckdb' executa a mesma agregação em SQL direto
+# sobre os arquivos (CSV ou Parquet), em várias threads e com spill em disco
+BACKENDS = ('pandas', 'duckdb')
+
+# Configuração do DuckDB: memória máxima antes do spill, pasta do spill e
+# threads (None = todos os núcleos)
+MEMORIA_DUCKDB = '4GB'
+PASTA_SPILL_DUCKDB = os.path.join(os.pardir, 'data', 'cache', 'duckdb')
+THREADS_DUCKDB = None
+
+
+#Fonte de Dados em Arquivo
+
+class FonteArquivos:
+    """
+    Vendas e catálogo em arquivo (vendas.csv/produto.csv ou Parquet; uma
+    pasta ou um glob lê todas as partições), no lugar de um DataFrame. As
+    funções de métricas marcadas com @consulta_externa aceitam a fonte e a
+    executam no 'backend' escolhido; os plots dessas métricas também.
+    """
+
+    def __init__(self, vendas, produtos=None, backend='duckdb'):
+        if backend not in BACKENDS:
+            raise ValueError(f"backend deve ser um de {BACKENDS}, não '{backend}'.")
+        self.vendas = vendas
+        self.produtos = produtos
+        self.backend = backend
+
+    def _arquivos(self):
+        caminhos = [c for c in (self.vendas, self.produtos) if c is not None]
+        arquivos = []
+        for caminho in caminhos:
+            if os.path.isdir(caminho):
+                caminho = os.path.join(caminho, '*.parquet')
+            arquivos += sorted(glob.glob(caminho))
+        return arquivos
+
+    def assinatura(self):
+        """Identifica o conteúdo (caminhos, tamanhos e mtimes) para o cache de agregações."""
+        h = hashlib.blake2b(digest_size=16)
+        h.update(repr((self.vendas, self.produtos, self.backend)).encode())
+        for arquivo in self._arquivos():
+            stat = os.stat(arquivo)
+            h.update(repr((arquivo, stat.st_size, stat.st_mtime_ns)).encode())
+        return h.hexdigest()
+
+    def carregar(self):
+        """Backend pandas: vendas em memória, unidas ao catálogo quando houver."""
+        import carregar_dados
+        from catalogo_produtos import normalizar_produtos
+        from merge_datasets import merge_datasets
+
+        if _eh_parquet(self.vendas):
+            vendas = pd.read_parquet(self.vendas)
+        else:
+            vendas = carregar_dados.carregar_vendas(self.vendas)
+        if self.produtos is None:
+            return vendas
+
+        if _eh_parquet(self.produtos):
+            produtos = normalizar_produtos(pd.read_parquet(self.produtos))
+        else:
+            produtos = carregar_dados.carregar_produtos(self.produtos)
+        return merge_datasets(vendas, produtos, 'SKU', modo='indice')
+
+def _eh_parquet(caminho):
+    return os.path.isdir(caminho) or caminho.endswith('.parquet')
+
+
+#Consultas SQL (DuckDB)
+# Mesmas regras das funções de métricas: grupos com chave nula ficam de
+# fora (como no groupby do pandas) e o catálogo recebe o tratamento de
+# catalogo_produtos.normalizar_produtos.
+
+def _leitura(caminho):
+    caminho_sql = caminho.replace("'", "''")
+    if os.path.isdir(caminho):
+        return f"read_parquet('{os.path.join(caminho_sql, '*.parquet')}', union_by_name = true)"
+    if _eh_parquet(caminho):
+        return f"read_parquet('{caminho_sql}', union_by_name = true)"
+    return f"read_csv('{caminho_sql}', header = true, auto_detect = true)"
+
+_VISAO_VENDAS = '''
+CREATE OR REPLACE TEMP VIEW vendas_base AS
+SELECT
+    CAST(SKU AS BIGINT) AS SKU,
+    CAST(FILIAL AS VARCHAR) AS FILIAL,
+    CAST(DATA_ATEND AS TIMESTAMP) AS DATA_ATEND,
+    CAST(QTD_VENDA AS DOUBLE) AS QTD_VENDA,
+    CAST(FATUR_VENDA AS DOUBLE) AS FATUR_VENDA
+FROM {fonte}
+'''
+
+_VISAO_PRODUTOS = '''
+CREATE OR REPLACE TEMP VIEW produtos AS
+SELECT
+    CAST(TRIM(CAST(SKU AS VARCHAR)) AS BIGINT) AS SKU,
+    TRIM(NOME_PRODUTO) AS NOME_PRODUTO,
+    COALESCE(TRIM(CATEGORIA), 'Sem categoria') AS CATEGORIA,
+    COALESCE(TRIM(SUBCATEGORIA), 'Sem subcategoria') AS SUBCATEGORIA
+FROM {fonte}
+WHERE SKU IS NOT NULL AND NOME_PRODUTO IS NOT NULL
+'''
+
+_VISAO_VENDAS_PRODUTOS = '''
+CREATE OR REPLACE TEMP VIEW vendas AS
+SELECT v.*, p.NOME_PRODUTO, p.CATEGORIA, p.SUBCATEGORIA
+FROM vendas_base AS v LEFT JOIN produtos AS p USING (SKU)
+'''
+
+CONSULTAS = {
+    'faturamento_mensal_filial': '''
+        SELECT CAST(month(DATA_ATEND) AS INTEGER) AS MES_NUM, FILIAL, SUM(FATUR_VENDA) AS FATUR_VENDA
+        FROM vendas
+        WHERE DATA_ATEND IS NOT NULL AND FILIAL IS NOT NULL {filtro_ano}
+        GROUP BY ALL
+        ORDER BY MES_NUM, FILIAL
+    ''',
+    'faturamento_medio_dia_semana': '''
+        SELECT
+            dayname(DATA_ATEND) AS DIA_SEMANA,
+            FILIAL,
+            SUM(FATUR_VENDA) AS Soma_Faturamento,
+            COUNT(DISTINCT DATA_ATEND) AS Num_Dias_Unicos,
+            SUM(FATUR_VENDA) / COUNT(DISTINCT DATA_ATEND) AS Faturamento_Medio
+        FROM vendas
+        WHERE DATA_ATEND IS NOT NULL AND FILIAL IS NOT NULL
+        GROUP BY ALL
+    ''',
+    'top_produtos_faturamento': '''
+        SELECT NOME_PRODUTO, CATEGORIA, SUM(FATUR_VENDA) AS Faturamento_Total
+        FROM vendas
+        WHERE NOME_PRODUTO IS NOT NULL AND CATEGORIA IS NOT NULL
+        GROUP BY ALL
+        ORDER BY Faturamento_Total DESC
+        LIMIT {n_top}
+    ''',
+    'top_categorias_faturamento': '''
+        SELECT CATEGORIA, SUM(FATUR_VENDA) AS Faturamento_Total
+        FROM vendas
+        WHERE CATEGORIA IS NOT NULL
+        GROUP BY ALL
+        ORDER BY Faturamento_Total DESC
+        LIMIT {n_top}
+    ''',
+}
+
+def _conectar():
+    try:
+        import duckdb
+    except ImportError as erro:
+        raise ImportError("O backend 'duckdb' precisa do pacote duckdb (pip install duckdb).") from erro
+
+    os.makedirs(PASTA_SPILL_DUCKDB, exist_ok=True)
+    conexao = duckdb.connect()
+    conexao.execute(f"SET memory_limit = '{MEMORIA_DUCKDB}'")
+    conexao.execute(f"SET temp_directory = '{PASTA_SPILL_DUCKDB.replace(chr(39), chr(39) * 2)}'")
+    conexao.execute('SET preserve_insertion_order = false')
+    if THREADS_DUCKDB:
+        conexao.execute(f'SET threads = {int(THREADS_DUCKDB)}')
+    return conexao
+
+def consultar_duckdb(nome, fonte, ano=None, n_top=None):
+    """
+    Executa a consulta 'nome' (ver CONSULTAS) no DuckDB, direto sobre os
+    arquivos da fonte, e retorna o DataFrame no formato da função de
+    métricas de mesmo nome.
+    """
+    conexao = _conectar()
+    try:
+        conexao.execute(_VISAO_VENDAS.format(fonte=_leitura(fonte.vendas)))
+        if fonte.produtos is not None:
+            conexao.execute(_VISAO_PRODUTOS.format(fonte=_leitura(fonte.produtos)))
+            conexao.execute(_VISAO_VENDAS_PRODUTOS)
+        else:
+            conexao.execute('CREATE OR REPLACE TEMP VIEW vendas AS SELECT * FROM vendas_base')
+
+        filtro_ano = '' if ano is None else f'AND year(DATA_ATEND) = {int(ano)}'
+        sql = CONSULTAS[nome].format(filtro_ano=filtro_ano, n_top=int(n_top or 0))
+        df = conexao.execute(sql).df()
+        categorias = None
+        if 'CATEGORIA' in df.columns and fonte.produtos is not None:
+            categorias = conexao.execute('SELECT DISTINCT CATEGORIA FROM produtos ORDER BY 1').df()
+            categorias = categorias['CATEGORIA'].tolist()
+    finally:
+        conexao.close()
+
+    # Mesmos tipos do pandas: somas em float32 e textos repetidos como
+    # categóricas (DIA_SEMANA ordenada como no calendário; CATEGORIA com
+    # todas as categorias do catálogo, como depois do merge)
+    for col in ('FATUR_VENDA', 'Soma_Faturamento', 'Faturamento_Total'):
+        if col in df.columns:
+            df[col] = df[col].astype('float32')
+    if 'DIA_SEMANA' in df.columns:
+        df['DIA_SEMANA'] = pd.Categorical(df['DIA_SEMANA'], categories=DIAS_SEMANA, ordered=True)
+    if 'FILIAL' in df.columns:
+        df['FILIAL'] = df['FILIAL'].astype('category')
+    if 'CATEGORIA' in df.columns:
+        df['CATEGORIA'] = pd.Categorical(df['CATEGORIA'], categories=categorias)
+    return df
+
+
+#Decorador
+
+def consulta_externa(nome, pos_processar=None):
+    """
+    Permite que a função de métricas receba uma FonteArquivos no lugar do
+    DataFrame: no backend 'duckdb' a agregação vira a consulta SQL 'nome'
+    (seguida de 'pos_processar', quando a função faz algo além do SQL); no
+    backend 'pandas' a fonte é carregada e a função roda normalmente.
+    """
+    def decorador(funcao):
+        assinatura = inspect.signature(funcao)
+
+        @functools.wraps(funcao)
+        def executar(dados, *args, **kwargs):
+            if not isinstance(dados, FonteArquivos):
+                return funcao(dados, *args, **kwargs)
+            if dados.backend == 'pandas':
+                return funcao(dados.carregar(), *args, **kwargs)
+
+            argumentos = assinatura.bind(dados, *args, **kwargs)
+            argumentos.apply_defaults()
+            df = consultar_duckdb(nome, dados, **dict(list(argumentos.arguments.items())[1:]))
+            return pos_processar(df) if pos_processar else df
+        return executar
+    return decorador
@@ -0,0 +1,307 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import calendario as cal
+import periodos as pr
+from catalogo_produtos import obter_catalogo
+
+#Configurações Globais do Módulo
+
+# Modelos disponíveis: sazonal ingênuo (mesmo período do ciclo anterior),
+# suavização exponencial simples (alfa escolhido por série) e gradient
+# boosting (um modelo por lote de séries, com defasagens e calendário)
+MODELOS = ('sazonal_ingenuo', 'suavizacao_exponencial', 'gradient_boosting')
+
+# Comprimento do ciclo sazonal de cada granularidade (em períodos)
+SAZONALIDADE = {'dia': 7, 'semana': 52, 'mes': 12, 'trimestre': 4, 'ano': 1}
+
+# Alfas testados na suavização exponencial (o de menor erro em um passo
+# é escolhido em cada série)
+ALFAS = np.linspace(0.05, 0.95, 19)
+
+# Defasagens (períodos anteriores) usadas como atributos do gradient boosting
+JANELA_GB = 8
+
+# Séries por lote: cada lote é ajustado em um processo (e o gradient
+# boosting ajusta um modelo por lote)
+SERIES_POR_LOTE = 2000
+
+
+#Séries de Demanda
+
+class SeriesDemanda:
+    """
+    Demanda (QTD_VENDA) de cada série (ex.: SKU x FILIAL) por período, em
+    uma matriz densa (séries x períodos consecutivos, zero onde não houve
+    venda). 'chaves' identifica as séries (uma linha por série) e
+    'codigos' são os códigos de período das colunas (ver periodos.py).
+    """
+
+    def __init__(self, valores, chaves, codigos, granularidade):
+        self.valores = valores
+        self.chaves = chaves
+        self.codigos = codigos
+        self.granularidade = granularidade
+
+    @property
+    def n_series(self):
+        return self.valores.shape[0]
+
+    @property
+    def n_periodos(self):
+        return self.valores.shape[1]
+
+
+def series_demanda(df_vendas_produtos, granularidade='semana', chaves=('SKU', 'FILIAL'), produtos=None):
+    """
+    Monta as séries de demanda a partir das vendas (unidas ou não ao
+    catálogo). Com 'produtos' (o produto.csv carregado), as séries cobrem
+    todo o catálogo: SKUs sem venda entram com demanda zero em cada valor
+    das demais chaves (ex.: em cada filial).
+    """
+    chaves = list(chaves)
+    df_agregado = pr.agregar_por_periodo(df_vendas_produtos, granularidade, chaves, medidas=['QTD_VENDA'])
+    if df_agregado.empty:
+        raise ValueError('Não há vendas com data para montar as séries de demanda.')
+
+    grupos = df_agregado.groupby(chaves, observed=True, sort=True)
+    df_chaves = grupos.size().index.to_frame(index=False)
+    linhas = grupos.ngroup().to_numpy()
+
+    # 1. Matriz densa: uma coluna por período entre a primeira e a última venda
+    inicio, fim = df_agregado['PERIODO'].min(), df_agregado['PERIODO'].max()
+    valores = np.zeros((len(df_chaves), fim - inicio + 1), dtype=np.float64)
+    valores[linhas, df_agregado['PERIODO'].to_numpy() - inicio] = df_agregado['QTD_VENDA'].to_numpy()
+
+    # 2. Catálogo completo: SKUs sem venda viram séries zeradas
+    if produtos is not None and 'SKU' in chaves:
+        outras = [c for c in chaves if c != 'SKU']
+        grade = pd.DataFrame({'SKU': obter_catalogo(produtos).skus})
+        for col in outras:
+            grade = grade.merge(pd.DataFrame({col: df_chaves[col].unique()}), how='cross')
+        grade = grade[chaves].merge(df_chaves.assign(_LINHA=np.arange(len(df_chaves))), on=chaves, how='outer')
+        grade = grade.sort_values(chaves, ignore_index=True)
+
+        completo = np.zeros((len(grade), valores.shape[1]), dtype=np.float64)
+        existentes = grade['_LINHA'].notna().to_numpy()
+        completo[existentes] = valores[grade.loc[existentes, '_LINHA'].to_numpy(dtype=np.int64)]
+        df_chaves, valores = grade.drop(columns='_LINHA'), completo
+
+    return SeriesDemanda(valores, df_chaves, np.arange(inicio, fim + 1, dtype=np.int64), granularidade)
+
+def atributos_calendario(codigos, granularidade):
+    """
+    Atributos de calendário de cada período (também dos futuros): MES e
+    POSICAO no ano do início do período, e número de FERIADOS e de
+    DATAS_VAREJO (calendario.py) dentro dele. Matriz (períodos x 4).
+    """
+    indice = pr.periodos(codigos, granularidade)
+    _, posicoes = pr.ano_e_posicao(codigos, granularidade)
+
+    dias = pr.codigos_periodo([indice.start_time[0], indice.end_time[-1]], 'dia')
+    df_calendario = cal.construir_calendario(np.arange(dias[0], dias[1] + 1))
+    periodo_do_dia = pr.codigos_periodo(df_calendario['DATA'], granularidade) - codigos[0]
+    contagens = [
+        np.bincount(periodo_do_dia, weights=df_calendario[coluna].to_numpy(dtype=np.float64), minlength=len(codigos))
+        for coluna in ('FERIADO', 'DATA_VAREJO')
+    ]
+    return np.column_stack([np.asarray(indice.start_time.month, dtype=np.float64), posicoes] + contagens)
+
+
+#Modelos
+# Cada modelo recebe o histórico (séries x períodos) e devolve as previsões
+# (séries x horizonte) de todas as séries de uma vez.
+
+def _sazonal_ingenuo(historico, horizonte, sazonalidade):
+    # Valor do mesmo período no ciclo anterior; sem um ciclo completo, o último valor
+    n_periodos = historico.shape[1]
+    if n_periodos < sazonalidade:
+        return np.repeat(historico[:, -1:], horizonte, axis=1)
+    return historico[:, n_periodos - sazonalidade + np.arange(horizonte) % sazonalidade]
+
+def _suavizacao_exponencial(historico, horizonte):
+    # Nível de todas as séries para todos os alfas, atualizado período a
+    # período; fica o alfa de menor erro quadrático em um passo de cada série
+    nivel = np.broadcast_to(historico[:, 0], (len(ALFAS), len(historico))).copy()
+    erro_quadratico = np.zeros_like(nivel)
+    alfas = ALFAS[:, None]
+    for t in range(1, historico.shape[1]):
+        erro = historico[:, t] - nivel
+        erro_quadratico += erro ** 2
+        nivel += alfas * erro
+
+    melhor = erro_quadratico.argmin(axis=0)
+    previsao = nivel[melhor, np.arange(len(historico))]
+    return np.repeat(previsao[:, None], horizonte, axis=1)
+
+def _regressor():
+    try:
+        from sklearn.ensemble import HistGradientBoostingRegressor
+    except ImportError as erro:
+        raise ImportError("O modelo 'gradient_boosting' precisa do pacote scikit-learn (pip install scikit-learn).") from erro
+    return HistGradientBoostingRegressor(loss='poisson', max_iter=200, learning_rate=0.1, random_state=0)
+
+def _atributos_gb(normalizado, instantes, calendario, sazonalidade, usar_sazonal=True):
+    # Atributos de cada (série, instante): JANELA_GB defasagens, sua média,
+    # a defasagem sazonal (NaN quando não existe; omitida com usar_sazonal=
+    # False) e o calendário do instante
+    n_series = len(normalizado)
+    defasagens = normalizado[:, instantes[:, None] - np.arange(1, JANELA_GB + 1)]
+    blocos = [defasagens, defasagens.mean(axis=2, keepdims=True)]
+    if usar_sazonal:
+        sazonal = np.full((n_series, len(instantes)), np.nan)
+        com_ciclo = instantes >= sazonalidade
+        sazonal[:, com_ciclo] = normalizado[:, instantes[com_ciclo] - sazonalidade]
+        blocos.append(sazonal[:, :, None])
+
+    atributos = np.concatenate(blocos + [
+        np.broadcast_to(calendario[instantes], (n_series, len(instantes), calendario.shape[1])),
+    ], axis=2)
+    return atributos.reshape(n_series * len(instantes), -1)
+
+def _gradient_boosting(historico, horizonte, sazonalidade, calendario):
+    # Modelo único para as séries do lote, sobre a demanda dividida pela
+    # média de cada série; a previsão é recursiva (cada passo vira defasagem)
+    n_series, n_periodos = historico.shape
+    if n_periodos - JANELA_GB < 2:
+        raise ValueError(f"O modelo 'gradient_boosting' precisa de mais de {JANELA_GB + 1} períodos de histórico.")
+
+    escala = historico.mean(axis=1, keepdims=True)
+    normalizado = np.zeros((n_series, n_periodos + horizonte))
+    normalizado[:, :n_periodos] = historico / np.where(escala > 0, escala, 1)
+
+    # Com menos de um ciclo antes do último instante de treino, a defasagem
+    # sazonal seria toda NaN (e o ajuste falha): fica de fora do modelo
+    instantes = np.arange(JANELA_GB, n_periodos)
+    usar_sazonal = n_periodos > sazonalidade
+    modelo = _regressor()
+    modelo.fit(_atributos_gb(normalizado, instantes, calendario, sazonalidade, usar_sazonal),
+               normalizado[:, instantes].ravel())
+
+    for passo in range(horizonte):
+        t = n_periodos + passo
+        previsto = modelo.predict(_atributos_gb(normalizado, np.array([t]), calendario, sazonalidade, usar_sazonal))
+        normalizado[:, t] = np.maximum(previsto, 0)
+    return normalizado[:, n_periodos:] * escala
+
+def _prever_lote(valores, calendario, origens, horizonte, sazonalidade, modelos):
+    # Executado em cada processo: previsões de cada modelo a partir de cada
+    # origem (previsão = a última origem; backtest = várias)
+    resultado = {}
+    for modelo in modelos:
+        previsoes = []
+        for origem in origens:
+            historico = valores[:, :origem]
+            if modelo == 'sazonal_ingenuo':
+                previsoes.append(_sazonal_ingenuo(historico, horizonte, sazonalidade))
+            elif modelo == 'suavizacao_exponencial':
+                previsoes.append(_suavizacao_exponencial(historico, horizonte))
+            else:
+                previsoes.append(_gradient_boosting(historico, horizonte, sazonalidade, calendario))
+        resultado[modelo] = np.stack(previsoes)
+    return resultado
+
+def _executar_lotes(series, origens, horizonte, modelos, processos, series_por_lote):
+    # Divide as séries em lotes e junta as previsões: {modelo: origens x séries x horizonte}
+    for modelo in modelos:
+        if modelo not in MODELOS:
+            raise ValueError(f"modelo deve ser um de {MODELOS}, não '{modelo}'.")
+
+    ultimo = max(origens) + horizonte
+    codigos = series.codigos[0] + np.arange(max(ultimo, series.n_periodos))
+    calendario = atributos_calendario(codigos, series.granularidade)
+    sazonalidade = SAZONALIDADE[series.granularidade]
+
+    lotes = [series.valores[i:i + series_por_lote] for i in range(0, series.n_series, series_por_lote)]
+    argumentos = (lotes, [calendario] * len(lotes), [origens] * len(lotes), [horizonte] * len(lotes),
+                  [sazonalidade] * len(lotes), [modelos] * len(lotes))
+
+    processos = processos or os.cpu_count() or 1
+    if processos > 1 and len(lotes) > 1:
+        with ProcessPoolExecutor(max_workers=min(processos, len(lotes))) as executor:
+            resultados = list(executor.map(_prever_lote, *argumentos))
+    else:
+        resultados = list(map(_prever_lote, *argumentos))
+    return {modelo: np.concatenate([r[modelo] for r in resultados], axis=1) for modelo in modelos}
+
+
+#Previsão e Backtest
+
+def prever_demanda(df_vendas_produtos, horizonte=4, modelos=MODELOS, granularidade='semana',
+                   chaves=('SKU', 'FILIAL'), produtos=None, processos=1, series_por_lote=SERIES_POR_LOTE):
+    """
+    Previsão de QTD_VENDA dos próximos 'horizonte' períodos para cada série
+    (chaves x período) e cada modelo: as chaves, MODELO, HORIZONTE (1..n),
+    PERIODO (código), INICIO_PERIODO e PREVISAO. As séries são ajustadas em
+    lotes de 'series_por_lote', distribuídos em 'processos' processos (None
+    = todos os núcleos). Com 'produtos', cobre todo o catálogo.
+    """
+    series = series_demanda(df_vendas_produtos, granularidade, chaves, produtos)
+    previsoes = _executar_lotes(series, [series.n_periodos], horizonte, list(modelos), processos, series_por_lote)
+
+    codigos = series.codigos[-1] + np.arange(1, horizonte + 1)
+    partes = []
+    for modelo, previsao in previsoes.items():
+        df_modelo = series.chaves.loc[np.repeat(np.arange(series.n_series), horizonte)].reset_index(drop=True)
+        df_modelo['MODELO'] = modelo
+        df_modelo['HORIZONTE'] = np.tile(np.arange(1, horizonte + 1), series.n_series)
+        df_modelo['PERIODO'] = np.tile(codigos, series.n_series)
+        df_modelo['PREVISAO'] = previsao[0].ravel().astype(np.float32)
+        partes.append(df_modelo)
+
+    df_previsao = pd.concat(partes, ignore_index=True)
+    df_previsao['MODELO'] = pd.Categorical(df_previsao['MODELO'], categories=list(modelos))
+    df_previsao.insert(len(df_previsao.columns) - 1, 'INICIO_PERIODO',
+                       pr.periodos(df_previsao['PERIODO'], granularidade).start_time)
+    return df_previsao
+
+def backtest_demanda(df_vendas_produtos, horizonte=4, janelas=4, modelos=MODELOS, granularidade='semana',
+                     chaves=('SKU', 'FILIAL'), processos=1, series_por_lote=SERIES_POR_LOTE):
+    """
+    Backtest com origem móvel: o histórico é cortado nas últimas 'janelas'
+    origens (espaçadas de 'horizonte' períodos), cada modelo prevê os
+    'horizonte' períodos seguintes e o erro é medido contra o realizado.
+    Uma linha por MODELO e ORIGEM (INICIO_ORIGEM = primeiro período
+    previsto) com MAE, WAPE e VIES e as somas usadas por resumo_backtest.
+    """
+    series = series_demanda(df_vendas_produtos, granularidade, chaves)
+    origens = [series.n_periodos - horizonte * (janelas - k) for k in range(janelas)]
+    if origens[0] < 1:
+        raise ValueError(f'Histórico de {series.n_periodos} períodos é curto para {janelas} janelas de {horizonte}.')
+
+    previsoes = _executar_lotes(series, origens, horizonte, list(modelos), processos, series_por_lote)
+    realizados = np.stack([series.valores[:, o:o + horizonte] for o in origens])
+
+    linhas = []
+    for modelo, previsao in previsoes.items():
+        erro = previsao - realizados
+        for i, origem in enumerate(origens):
+            linhas.append({
+                'MODELO': modelo,
+                'ORIGEM': series.codigos[origem],
+                'N': erro[i].size,
+                'SOMA_ABS_ERRO': np.abs(erro[i]).sum(),
+                'SOMA_ERRO': erro[i].sum(),
+                'SOMA_REAL': realizados[i].sum(),
+            })
+
+    df_backtest = pd.DataFrame(linhas)
+    df_backtest.insert(2, 'INICIO_ORIGEM', pr.periodos(df_backtest['ORIGEM'], granularidade).start_time)
+    return _metricas_erro(df_backtest)
+
+def _metricas_erro(df):
+    df = df.copy()
+    df['MAE'] = df['SOMA_ABS_ERRO'] / df['N']
+    df['WAPE'] = df['SOMA_ABS_ERRO'] / df['SOMA_REAL'] * 100
+    df['VIES'] = df['SOMA_ERRO'] / df['SOMA_REAL'] * 100
+    return df
+
+def resumo_backtest(df_backtest):
+    """Erro de cada modelo somado em todas as origens (MAE, WAPE e VIES em %), do melhor WAPE ao pior."""
+    df_resumo = df_backtest.groupby('MODELO', sort=False)[['N', 'SOMA_ABS_ERRO', 'SOMA_ERRO', 'SOMA_REAL']].sum()
+    df_resumo = _metricas_erro(df_resumo.reset_index())
+    df_resumo.insert(1, 'JANELAS', df_backtest.groupby('MODELO', sort=False).size().to_numpy())
+    return df_resumo.sort_values('WAPE', ignore_index=True)
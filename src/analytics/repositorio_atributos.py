@@ -0,0 +1,325 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+import cestas as cs
+import deteccao_sazonal as dz
+import lotes_parquet as lp
+import periodos as pr
+from catalogo_produtos import obter_catalogo
+
+#Configurações Globais do Módulo
+
+# Pasta do repositório de atributos (relativa à pasta notebooks/, como no
+# restante do projeto): bases mensais em base/ e atributos em atributos/
+PATH_ATRIBUTOS = os.path.join(os.pardir, 'data', 'atributos')
+
+# Tabelas de atributos materializadas
+TABELAS = ('clientes', 'skus')
+
+# Chaves das bases mensais: somas e datas por cliente (ou SKU e filial) e mês
+CHAVES_BASE = {
+    'clientes': ['CLI_CPF', 'ANO', 'MES_NUM'],
+    'skus': ['SKU', 'FILIAL', 'ANO', 'MES_NUM'],
+}
+
+# Como cada coluna da base mensal se combina entre lotes do mesmo mês (e
+# entre filiais): 'ou' é o OU bit a bit dos mapas de dias com venda
+COMBINACAO_BASE = {
+    'clientes': {'PRIMEIRA_COMPRA': 'min', 'ULTIMA_COMPRA': 'max', 'ATENDIMENTOS': 'sum',
+                 'ITENS': 'sum', 'VALOR': 'sum'},
+    'skus': {'PRIMEIRA_VENDA': 'min', 'ULTIMA_VENDA': 'max', 'QTD_VENDA': 'sum', 'FATUR_VENDA': 'sum',
+             'LINHAS': 'sum', 'MAPA_DIAS': 'ou'},
+}
+
+# Número de faixas dos escores R, F e M (quintis)
+FAIXAS_RFM = 5
+
+
+#Bases Mensais
+# Agregados aditivos por mês, pequenos perto das vendas: os atributos saem
+# deles, e um lote novo só altera os meses que contém.
+
+def _datas(codigos_dia):
+    return pd.to_datetime(codigos_dia.astype('datetime64[D]'))
+
+def _valores_cpf(serie):
+    # CLI_CPF no tipo original (no vendas.csv, hashes hexadecimais em texto);
+    # a categórica do frame compacto volta aos próprios CPFs, para que as
+    # partições de meses diferentes tenham o mesmo tipo
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.astype(serie.cat.categories.dtype)
+    return serie
+
+def base_clientes(df_vendas):
+    """
+    Base mensal de clientes: CLI_CPF, ANO, MES_NUM, PRIMEIRA_COMPRA,
+    ULTIMA_COMPRA, ATENDIMENTOS (cestas, ver cestas.py), ITENS e VALOR.
+    Vendas sem CPF ficam de fora.
+    """
+    df_cestas = cs.reconstruir_cestas(df_vendas).resumo(df_vendas)
+    dias = pr.codigos_periodo(df_cestas['DATA_ATEND'], 'dia')
+    datas = _datas(dias)
+    df_cestas = df_cestas.assign(
+        CLI_CPF=_valores_cpf(df_cestas['CLI_CPF']),
+        ANO=datas.year.to_numpy(), MES_NUM=datas.month.to_numpy(), DATA=datas,
+    )
+    return df_cestas.groupby(CHAVES_BASE['clientes']).agg(
+        PRIMEIRA_COMPRA=('DATA', 'min'),
+        ULTIMA_COMPRA=('DATA', 'max'),
+        ATENDIMENTOS=('ID_CESTA', 'size'),
+        ITENS=('ITENS', 'sum'),
+        VALOR=('VALOR', 'sum'),
+    ).reset_index()
+
+def base_skus(df_vendas):
+    """
+    Base mensal de SKUs por filial: SKU, FILIAL, ANO, MES_NUM,
+    PRIMEIRA_VENDA, ULTIMA_VENDA, QTD_VENDA, FATUR_VENDA, LINHAS e
+    MAPA_DIAS (uint32, bit d-1 ligado se houve venda no dia d do mês). Soma
+    primeiro por dia e depois por mês; o mapa permite contar os dias
+    distintos com venda de um SKU somando filiais e lotes sem repetir dias.
+    """
+    dias = pr.codigos_periodo(df_vendas['DATA_ATEND'], 'dia')
+    validas = dias != pr.CODIGO_NULO
+    df_dia = pd.DataFrame({
+        'SKU': df_vendas['SKU'].to_numpy()[validas],
+        'FILIAL': df_vendas['FILIAL'].astype(str).to_numpy()[validas],
+        'COD_DIA': dias[validas],
+        'QTD_VENDA': df_vendas['QTD_VENDA'].to_numpy(dtype=np.float64)[validas],
+        'FATUR_VENDA': df_vendas['FATUR_VENDA'].to_numpy(dtype=np.float64)[validas],
+    })
+    df_dia = df_dia.groupby(['SKU', 'FILIAL', 'COD_DIA']).agg(
+        QTD_VENDA=('QTD_VENDA', 'sum'), FATUR_VENDA=('FATUR_VENDA', 'sum'), LINHAS=('QTD_VENDA', 'size')
+    ).reset_index()
+
+    datas = _datas(df_dia['COD_DIA'].to_numpy())
+    df_dia = df_dia.assign(ANO=datas.year.to_numpy(), MES_NUM=datas.month.to_numpy(), DATA=datas,
+                           BIT_DIA=np.left_shift(1, datas.day.to_numpy() - 1).astype(np.uint32))
+    # Os dias de cada (SKU, filial, mês) são distintos: a soma dos bits é o OU
+    df_base = df_dia.groupby(CHAVES_BASE['skus']).agg(
+        PRIMEIRA_VENDA=('DATA', 'min'),
+        ULTIMA_VENDA=('DATA', 'max'),
+        QTD_VENDA=('QTD_VENDA', 'sum'),
+        FATUR_VENDA=('FATUR_VENDA', 'sum'),
+        LINHAS=('LINHAS', 'sum'),
+        MAPA_DIAS=('BIT_DIA', 'sum'),
+    ).reset_index()
+    return df_base.astype({'MAPA_DIAS': np.uint32})
+
+def _agregar_base(df_base, chaves, combinacao):
+    # groupby.agg com a combinação de cada coluna; 'ou' une os mapas de dias
+    ou = [col for col, funcao in combinacao.items() if funcao == 'ou']
+    grupos = df_base.groupby(chaves)
+    df = grupos.agg({col: funcao for col, funcao in combinacao.items() if col not in ou})
+    codigos = grupos.ngroup().to_numpy()
+    for col in ou:
+        mapa = np.zeros(len(df), dtype=np.uint32)
+        np.bitwise_or.at(mapa, codigos, df_base[col].to_numpy(dtype=np.uint32))
+        df[col] = mapa
+    return df.reset_index()[list(chaves) + list(combinacao)]
+
+def _combinar_base(tabela, df_base):
+    # Junta linhas da mesma chave (ex.: um mês que já estava no repositório)
+    return _agregar_base(df_base, CHAVES_BASE[tabela], COMBINACAO_BASE[tabela])
+
+def _contar_dias(mapas):
+    # Número de bits ligados de cada mapa de dias (uint32)
+    bits = np.unpackbits(np.ascontiguousarray(mapas, dtype=np.uint32).view(np.uint8))
+    return bits.reshape(-1, 32).sum(axis=1)
+
+
+#Atributos
+
+def _faixas(valores, inverter=False):
+    # Escore 1..FAIXAS_RFM pelos quantis do posto (empates desfeitos pela
+    # ordem, então as faixas têm sempre o mesmo tamanho)
+    posto = pd.Series(valores).rank(method='first', pct=True).to_numpy()
+    faixa = np.ceil(posto * FAIXAS_RFM).astype(np.int8)
+    return (FAIXAS_RFM + 1 - faixa) if inverter else faixa
+
+def atributos_clientes(df_base_clientes, data_referencia=None):
+    """
+    RFM por cliente: CLI_CPF, PRIMEIRA_COMPRA, ULTIMA_COMPRA, RECENCIA_DIAS
+    (até 'data_referencia'; padrão = último dia com venda), FREQUENCIA
+    (atendimentos), MONETARIO (valor total), TICKET_MEDIO, ITENS_POR_CESTA,
+    MESES_ATIVOS, ANTIGUIDADE_DIAS e os escores R, F e M (1 a 5, 5 = melhor)
+    com o SEGMENTO_RFM (ex.: '545').
+    """
+    df = df_base_clientes.groupby('CLI_CPF').agg(
+        PRIMEIRA_COMPRA=('PRIMEIRA_COMPRA', 'min'),
+        ULTIMA_COMPRA=('ULTIMA_COMPRA', 'max'),
+        FREQUENCIA=('ATENDIMENTOS', 'sum'),
+        MONETARIO=('VALOR', 'sum'),
+        ITENS=('ITENS', 'sum'),
+        MESES_ATIVOS=('MES_NUM', 'size'),
+    ).reset_index()
+
+    referencia = pd.Timestamp(data_referencia) if data_referencia is not None else df['ULTIMA_COMPRA'].max()
+    df['RECENCIA_DIAS'] = (referencia - df['ULTIMA_COMPRA']).dt.days
+    df['ANTIGUIDADE_DIAS'] = (referencia - df['PRIMEIRA_COMPRA']).dt.days
+    df['TICKET_MEDIO'] = df['MONETARIO'] / df['FREQUENCIA']
+    df['ITENS_POR_CESTA'] = df.pop('ITENS') / df['FREQUENCIA']
+
+    df['SCORE_R'] = _faixas(df['RECENCIA_DIAS'], inverter=True)
+    df['SCORE_F'] = _faixas(df['FREQUENCIA'])
+    df['SCORE_M'] = _faixas(df['MONETARIO'])
+    df['SEGMENTO_RFM'] = (df['SCORE_R'].astype(str) + df['SCORE_F'].astype(str) + df['SCORE_M'].astype(str))
+    return df
+
+def _meses_pico(df_base_skus):
+    # Meses de pico da loja (escore z robusto da média diária de cada mês)
+    volume = df_base_skus.groupby('MES_NUM')['QTD_VENDA'].sum().reindex(dz.MESES, fill_value=0)
+    escores = dz.escore_z_robusto([volume.to_numpy() / dz.DIAS_POR_MES])[0]
+    meses = np.flatnonzero(escores >= dz.LIMIAR_Z) + 1
+    return meses if len(meses) else np.array([escores.argmax() + 1])
+
+def atributos_skus(df_base_skus, df_produtos=None, por_filial=False, data_referencia=None):
+    """
+    Atributos por SKU (ou SKU e FILIAL, com por_filial=True):
+    - volume e preço: QTD_TOTAL, FATUR_TOTAL, PRECO_MEDIO, PRECO_MIN_MES,
+      PRECO_MAX_MES e VARIACAO_PRECO (%) entre os preços médios mensais;
+    - velocidade: VELOCIDADE_DIA (desde a primeira venda até a data de
+      referência), VELOCIDADE_DIA_VENDA (nos dias com venda),
+      DIAS_COM_VENDA, COBERTURA (%) e DIAS_SEM_VENDA;
+    - sazonalidade: MES_PICO e SHARE_MES_PICO (%) do SKU, e SHARE_MESES_PICO
+      (%) do volume nos meses de pico da loja (deteccao_sazonal).
+    Com 'df_produtos', acrescenta NOME_PRODUTO, CATEGORIA e SUBCATEGORIA.
+    """
+    chaves = ['SKU', 'FILIAL'] if por_filial else ['SKU']
+    # Sem por_filial, os mapas de dias das filiais são unidos: um dia com
+    # venda em duas lojas conta uma vez (a COBERTURA não passa de 100%)
+    df_mes = _agregar_base(df_base_skus, chaves + ['ANO', 'MES_NUM'], COMBINACAO_BASE['skus'])
+    df_mes['DIAS_COM_VENDA'] = _contar_dias(df_mes['MAPA_DIAS'])
+    df_mes['PRECO_MES'] = df_mes['FATUR_VENDA'] / df_mes['QTD_VENDA'].where(df_mes['QTD_VENDA'] > 0)
+
+    # 1. Volume, preço e datas
+    df = df_mes.groupby(chaves).agg(
+        PRIMEIRA_VENDA=('PRIMEIRA_VENDA', 'min'),
+        ULTIMA_VENDA=('ULTIMA_VENDA', 'max'),
+        QTD_TOTAL=('QTD_VENDA', 'sum'),
+        FATUR_TOTAL=('FATUR_VENDA', 'sum'),
+        DIAS_COM_VENDA=('DIAS_COM_VENDA', 'sum'),
+        PRECO_MIN_MES=('PRECO_MES', 'min'),
+        PRECO_MAX_MES=('PRECO_MES', 'max'),
+    ).reset_index()
+    df['PRECO_MEDIO'] = df['FATUR_TOTAL'] / df['QTD_TOTAL'].where(df['QTD_TOTAL'] > 0)
+    df['VARIACAO_PRECO'] = (df['PRECO_MAX_MES'] / df['PRECO_MIN_MES'] - 1) * 100
+
+    # 2. Velocidade de venda
+    referencia = pd.Timestamp(data_referencia) if data_referencia is not None else df['ULTIMA_VENDA'].max()
+    dias_ativos = (referencia - df['PRIMEIRA_VENDA']).dt.days + 1
+    df['VELOCIDADE_DIA'] = df['QTD_TOTAL'] / dias_ativos
+    df['VELOCIDADE_DIA_VENDA'] = df['QTD_TOTAL'] / df['DIAS_COM_VENDA']
+    df['COBERTURA'] = df['DIAS_COM_VENDA'] / dias_ativos * 100
+    df['DIAS_SEM_VENDA'] = (referencia - df['ULTIMA_VENDA']).dt.days
+
+    # 3. Sazonalidade: volume de cada mês do ano (todos os anos somados)
+    volume_mes = df_mes.pivot_table(index=chaves, columns='MES_NUM', values='QTD_VENDA', aggfunc='sum')
+    volume_mes = volume_mes.reindex(columns=dz.MESES).fillna(0)
+    total = volume_mes.sum(axis=1).where(lambda s: s > 0)
+    sazonal = pd.DataFrame({
+        'MES_PICO': np.asarray(volume_mes.columns)[volume_mes.to_numpy().argmax(axis=1)],
+        'SHARE_MES_PICO': volume_mes.max(axis=1) / total * 100,
+        'SHARE_MESES_PICO': volume_mes[list(_meses_pico(df_base_skus))].sum(axis=1) / total * 100,
+    }, index=volume_mes.index).reset_index()
+    df = df.merge(sazonal, on=chaves, how='left')
+
+    if df_produtos is not None:
+        produtos = obter_catalogo(df_produtos).produtos
+        colunas = [c for c in ('NOME_PRODUTO', 'CATEGORIA', 'SUBCATEGORIA') if c in produtos.columns]
+        df = df.merge(produtos[colunas], left_on='SKU', right_index=True, how='left')
+    return df
+
+def construir_atributos(df_vendas, df_produtos=None, data_referencia=None, por_filial=False):
+    """
+    Atributos de clientes e de SKUs direto das vendas, sem persistir:
+    {'clientes': ..., 'skus': ...}.
+    """
+    df_base_skus = base_skus(df_vendas)
+    referencia = _referencia(df_base_skus, data_referencia)
+    return {
+        'clientes': atributos_clientes(base_clientes(df_vendas), referencia),
+        'skus': atributos_skus(df_base_skus, df_produtos, por_filial, referencia),
+    }
+
+def _referencia(df_base_skus, data_referencia):
+    # Data de referência comum às duas tabelas (padrão: último dia com venda)
+    return pd.Timestamp(data_referencia) if data_referencia is not None else df_base_skus['ULTIMA_VENDA'].max()
+
+
+#Repositório em Parquet
+# base/<tabela>/AAAA-MM.parquet guarda as bases mensais; atributos/<tabela>.parquet
+# os atributos prontos, lidos pelos jobs e dashboards (só as colunas pedidas).
+# São arquivos lógicos: o manifesto aponta a geração de cada um (lotes_parquet).
+
+def _ler_base(pasta, manifesto, tabela, partes_novas=None):
+    # Base completa; 'partes_novas' ({arquivo: base do mês}) substitui as
+    # partições gravadas dos mesmos meses
+    partes_novas = partes_novas or {}
+    partes = [lp.ler_arquivo(pasta, manifesto, nome) for nome in lp.arquivos_pasta(manifesto, f'base/{tabela}')
+              if nome not in partes_novas]
+    partes += list(partes_novas.values())
+    if not partes:
+        return pd.DataFrame(columns=CHAVES_BASE[tabela] + list(COMBINACAO_BASE[tabela]))
+    return pd.concat(partes, ignore_index=True)
+
+def _meses_base(pasta, manifesto, tabela, df_novo):
+    # Bases dos meses presentes no lote, combinadas com o que já existia
+    partes = {}
+    for (ano, mes), parte in df_novo.groupby(['ANO', 'MES_NUM']):
+        nome = f'base/{tabela}/{int(ano):04d}-{int(mes):02d}.parquet'
+        anterior = lp.ler_arquivo(pasta, manifesto, nome)
+        if anterior is not None:
+            parte = _combinar_base(tabela, pd.concat([anterior, parte], ignore_index=True))
+        partes[nome] = parte
+    return partes
+
+def atualizar_atributos(df_novas, pasta=PATH_ATRIBUTOS, df_produtos=None, data_referencia=None, por_filial=False):
+    """
+    Incorpora um lote de vendas (ex.: o arquivo do dia) ao repositório: as
+    bases mensais dos meses do lote são combinadas com as existentes e os
+    atributos são recalculados a partir das bases (clientes x meses e SKUs
+    x filiais x meses, não as vendas) e regravados. Cada lote deve trazer
+    dias completos: um atendimento dividido entre dois lotes conta duas vezes.
+    Bases e atributos vão para uma geração nova, que só passa a valer
+    quando o manifesto é substituído (ver lotes_parquet.confirmar_lote): se
+    a gravação falha no meio, o repositório continua o anterior e o mesmo
+    lote pode ser reenviado.
+    Retorna os atributos atualizados.
+    """
+    manifesto = lp.ler_manifesto(pasta)
+    lote = lp.identificar_lote(df_novas)
+    if lote in manifesto['lotes']:
+        print(f"Aviso: o lote {lote} já foi incorporado ao repositório. Nada a fazer.")
+        return {tabela: ler_atributos(tabela, pasta) for tabela in TABELAS}
+
+    # 1. Bases mensais do lote, combinadas às partições existentes
+    partes = {
+        'clientes': _meses_base(pasta, manifesto, 'clientes', base_clientes(df_novas)),
+        'skus': _meses_base(pasta, manifesto, 'skus', base_skus(df_novas)),
+    }
+
+    # 2. Atributos recalculados a partir das bases completas
+    df_base_skus = _ler_base(pasta, manifesto, 'skus', partes['skus'])
+    referencia = _referencia(df_base_skus, data_referencia)
+    atributos = {
+        'clientes': atributos_clientes(_ler_base(pasta, manifesto, 'clientes', partes['clientes']), referencia),
+        'skus': atributos_skus(df_base_skus, df_produtos, por_filial, referencia),
+    }
+
+    # 3. Grava bases e atributos em uma geração nova e registra o lote (atômico)
+    tabelas = {nome: parte for partes_tabela in partes.values() for nome, parte in partes_tabela.items()}
+    tabelas.update({f'atributos/{tabela}.parquet': df for tabela, df in atributos.items()})
+    lp.confirmar_lote(pasta, manifesto, lote, tabelas)
+    return atributos
+
+def ler_atributos(tabela, pasta=PATH_ATRIBUTOS, colunas=None):
+    """
+    Lê os atributos materializados ('clientes' ou 'skus'); 'colunas' lê só
+    as colunas pedidas do Parquet. Retorna None se o repositório está vazio.
+    """
+    if tabela not in TABELAS:
+        raise ValueError(f"tabela deve ser uma de {TABELAS}, não '{tabela}'.")
+    return lp.ler_arquivo(pasta, lp.ler_manifesto(pasta), f'atributos/{tabela}.parquet', colunas)
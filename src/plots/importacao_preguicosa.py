@@ -0,0 +1,51 @@
+import importlib
+import os
+import types
+
+
+class ModuloPreguicoso(types.ModuleType):
+    """
+    Substituto de um módulo pesado (matplotlib, seaborn) que só o importa no
+    primeiro acesso a um atributo (ex.: plt.figure). Assim, importar os
+    módulos de plots não carrega as bibliotecas gráficas.
+
+    'ao_carregar' roda uma única vez, logo após a importação real: é onde
+    ficam as configurações globais (estilo do seaborn, pasta de gráficos)
+    que antes rodavam na importação do módulo.
+    """
+
+    def __init__(self, nome, ao_carregar=None):
+        super().__init__(nome)
+        self._modulo = None
+        self._ao_carregar = ao_carregar
+
+    def _carregar(self):
+        if self._modulo is None:
+            self._modulo = importlib.import_module(self.__name__)
+            ao_carregar, self._ao_carregar = self._ao_carregar, None
+            if ao_carregar is not None:
+                ao_carregar()
+        return self._modulo
+
+    def __getattr__(self, atributo):
+        # Só é chamado para atributos que o substituto não tem
+        return getattr(self._carregar(), atributo)
+
+    def __dir__(self):
+        return dir(self._carregar())
+
+
+def bibliotecas_graficas(globais, estilo='whitegrid'):
+    """
+    Retorna (plt, ticker, sns) preguiçosos para um módulo de plots. No
+    primeiro uso do pyplot, cria a pasta globais['PATH_GRAFICOS'] e aplica o
+    estilo do Seaborn. A pasta é lida nessa hora, então redirecionamentos
+    feitos depois da importação (ex.: render_lote) são respeitados.
+    """
+    sns = ModuloPreguicoso('seaborn')
+
+    def configurar():
+        os.makedirs(globais['PATH_GRAFICOS'], exist_ok=True)
+        sns.set_style(estilo)
+
+    return ModuloPreguicoso('matplotlib.pyplot', configurar), ModuloPreguicoso('matplotlib.ticker'), sns
@@ -1,18 +1,17 @@
-import matplotlib.pyplot as plt
-import matplotlib.ticker as ticker
-import seaborn as sns
-import pandas as pd
 import os
 
+import metricas_vendas as mv
+import renderizacao as rd
+from importacao_preguicosa import bibliotecas_graficas
+
 #Configurações Globais do Módulo
 
 # Define o caminho para a pasta de gráficos (../graphics)
 PATH_GRAFICOS = os.path.join(os.pardir, 'graphics')
-# Garante que a pasta de gráficos exista
-os.makedirs(PATH_GRAFICOS, exist_ok=True)
 
-# Define o estilo padrão do Seaborn
-sns.set_style("whitegrid")
+# Matplotlib e Seaborn só são carregados no primeiro gráfico; nessa hora a
+# pasta de gráficos é criada e o estilo "whitegrid" é aplicado
+plt, ticker, sns = bibliotecas_graficas(globals())
 
 # Mapeamento de meses (constante global)
 MES_MAP = {
@@ -26,9 +25,9 @@ MESES_ORDENADOS = list(MES_MAP.values())
 
 #Funções de Plotagem
 
-def plot_faturamento_total_filial(df_vendas):
-    # 1. Agrupamento dos Dados
-    df_faturamento_filial = df_vendas.groupby('FILIAL')['FATUR_VENDA'].sum().reset_index()
+def plot_faturamento_total_filial(df_vendas, caminho=None):
+    # 1. Agrupamento dos Dados (camada de métricas)
+    df_faturamento_filial = mv.faturamento_total_filial(df_vendas)
 
     # 2. Geração do Gráfico
     plt.figure(figsize=(9, 6))
@@ -58,20 +57,27 @@ def plot_faturamento_total_filial(df_vendas):
                    fontsize=10)
 
     # 4. Salvamento
-    save_path = os.path.join(PATH_GRAFICOS, 'faturamento_anual_por_filial.png')
+    save_path = caminho or os.path.join(PATH_GRAFICOS, 'faturamento_anual_por_filial.png')
     plt.tight_layout()
-    plt.savefig(save_path)
-    plt.show()
-    plt.close()
-
-def plot_faturamento_mensal_filial(df_vendas):
-    df = df_vendas.copy()
-    df['DATA_ATEND'] = pd.to_datetime(df['DATA_ATEND'])
-    df['MES_NUM'] = df['DATA_ATEND'].dt.month
-    df['MES_NOME'] = df['MES_NUM'].map(MES_MAP)
+    return rd.finalizar_figura(plt, save_path)
 
+def plot_faturamento_mensal_filial(df_vendas, caminho=None):
     # 2. Agrupamento dos Dados
-    df_mes_filial = df.groupby(['MES_NOME', 'FILIAL'])['FATUR_VENDA'].sum().reset_index()
+    df_mes_filial = mv.faturamento_mensal_filial(df_vendas)
+    df_mes_filial['MES_NOME'] = df_mes_filial['MES_NUM'].map(MES_MAP)
+    formatter = ticker.FuncFormatter(lambda x, p: f'{x/1000:.0f}K')
+
+    if rd.headless():
+        # Atualiza a figura-modelo (sem recriar barras nem chamar show)
+        filiais, valores = rd.matriz_grupos(df_mes_filial, 'MES_NUM', list(MES_MAP), 'FILIAL', 'FATUR_VENDA')
+        modelo = rd.modelo_barras_agrupadas(
+            'faturamento_mensal_filial', plt, sns, MESES_ORDENADOS, filiais,
+            xlabel='Mês', ylabel='Faturamento (R$)'
+        )
+        modelo.atualizar(valores, 'Faturamento Mensal por Filial (2024)', formatter)
+        caminho = caminho or os.path.join(PATH_GRAFICOS, 'faturamento_mensal_agrupado.png')
+        modelo.salvar(caminho)
+        return caminho
 
     # 3. Geração do Gráfico
     plt.figure(figsize=(14, 7))
@@ -88,34 +94,26 @@ def plot_faturamento_mensal_filial(df_vendas):
     ax.set_title('Faturamento Mensal por Filial (2024)', fontsize=16)
     ax.set_xlabel('Mês', fontsize=12)
     ax.set_ylabel('Faturamento (R$)', fontsize=12)
-    formatter = ticker.FuncFormatter(lambda x, p: f'{x/1000:.0f}K')
     ax.yaxis.set_major_formatter(formatter)
     ax.legend(title='Filial', loc='upper left')
 
     # 5. Salvamento
-    save_path = os.path.join(PATH_GRAFICOS, 'faturamento_mensal_agrupado.png')
+    save_path = caminho or os.path.join(PATH_GRAFICOS, 'faturamento_mensal_agrupado.png')
     plt.tight_layout()
-    plt.savefig(save_path)
-    plt.show()
-    plt.close()
-
-def plot_faturamento_e_ticket_medio_mensal(df_vendas):
-    df = df_vendas.copy()
-    df['DATA_ATEND'] = pd.to_datetime(df['DATA_ATEND'])
-    df['MES_NUM'] = df['DATA_ATEND'].dt.month
-    df['MES_NOME'] = df['MES_NUM'].map(MES_MAP)
-
-    # 2. Cálculo - Faturamento (Barras)
-    df_mes_filial = df.groupby(['MES_NOME', 'FILIAL'])['FATUR_VENDA'].sum().reset_index()
-
-    # 3. Cálculo - Ticket Médio (Linhas)
-    df_agregado_tm = df.groupby(['MES_NUM', 'MES_NOME', 'FILIAL']).agg(
-        FATUR_TOTAL=('FATUR_VENDA', 'sum'),
-        CLIENTES_UNICOS=('CLI_CPF', 'nunique')
-    ).reset_index()
-    df_agregado_tm['TICKET_MEDIO'] = df_agregado_tm['FATUR_TOTAL'] / df_agregado_tm['CLIENTES_UNICOS']
-    
-    df_agregado_tm = df_agregado_tm.sort_values(by='MES_NUM')
+    return rd.finalizar_figura(plt, save_path)
+
+def plot_faturamento_e_ticket_medio_mensal(df_vendas, modo_clientes='exato', ticket='cliente', caminho=None):
+    # modo_clientes='aproximado' conta os clientes com HyperLogLog (menos memória)
+    # ticket='atendimento' divide pelo número de cestas (CPF, filial e dia), não de clientes
+
+    # 2. e 3. Cálculo - Faturamento (Barras) e Ticket Médio (Linhas)
+    if ticket == 'atendimento':
+        df_agregado_tm = mv.ticket_medio_atendimento_mensal_filial(df_vendas)
+    else:
+        df_agregado_tm = mv.ticket_medio_mensal_filial(df_vendas, modo_clientes)
+    df_agregado_tm['MES_NOME'] = df_agregado_tm['MES_NUM'].map(MES_MAP)
+    df_mes_filial = df_agregado_tm.rename(columns={'FATUR_TOTAL': 'FATUR_VENDA'})
+
     df_tm_rua = df_agregado_tm[df_agregado_tm['FILIAL'] == 'RUA']
     df_tm_shopping = df_agregado_tm[df_agregado_tm['FILIAL'] == 'SHOPPING']
 
@@ -176,20 +174,29 @@ def plot_faturamento_e_ticket_medio_mensal(df_vendas):
               title='Legenda', loc='upper left', bbox_to_anchor=(1.05, 1), fontsize=10)
 
     fig.tight_layout(rect=[0, 0, 0.85, 1])
-    save_path = os.path.join(PATH_GRAFICOS, 'faturamento_e_ticket_medio_mensal.png')
-    plt.savefig(save_path)
-    plt.show()
-    plt.close(fig)
+    save_path = caminho or os.path.join(PATH_GRAFICOS, 'faturamento_e_ticket_medio_mensal.png')
+    return rd.finalizar_figura(plt, save_path)
 
 
-def plot_clientes_unicos_mensal_filial(df_vendas):
-    df = df_vendas.copy()
-    df['DATA_ATEND'] = pd.to_datetime(df['DATA_ATEND'])
-    df['MES_NUM'] = df['DATA_ATEND'].dt.month
-    df['MES_NOME'] = df['MES_NUM'].map(MES_MAP)
+def plot_clientes_unicos_mensal_filial(df_vendas, modo_clientes='exato', caminho=None):
+    # modo_clientes='aproximado' conta os clientes com HyperLogLog (menos memória)
 
     # 2. Agrupamento dos Dados
-    df_clientes_unicos = df.groupby(['MES_NOME', 'FILIAL'])['CLI_CPF'].nunique().reset_index()
+    df_clientes_unicos = mv.clientes_unicos_mensal_filial(df_vendas, modo_clientes)
+    df_clientes_unicos['MES_NOME'] = df_clientes_unicos['MES_NUM'].map(MES_MAP)
+    formatter_k_int = ticker.FuncFormatter(lambda x, p: f'{x/1000:.0f}K')
+
+    if rd.headless():
+        # Atualiza a figura-modelo (alturas e anotações das barras)
+        filiais, valores = rd.matriz_grupos(df_clientes_unicos, 'MES_NUM', list(MES_MAP), 'FILIAL', 'CLI_CPF')
+        modelo = rd.modelo_barras_agrupadas(
+            'clientes_unicos_mensal_filial', plt, sns, MESES_ORDENADOS, filiais,
+            xlabel='Mês', ylabel='Número de Clientes Únicos', anotar=True
+        )
+        modelo.atualizar(valores, 'Número de Clientes Únicos por Mês e Filial (2024)', formatter_k_int)
+        caminho = caminho or os.path.join(PATH_GRAFICOS, 'clientes_unicos_mensal_agrupado.png')
+        modelo.salvar(caminho)
+        return caminho
 
     # 3. Geração do Gráfico
     plt.figure(figsize=(14, 7))
@@ -207,7 +214,6 @@ def plot_clientes_unicos_mensal_filial(df_vendas):
     ax.set_xlabel('Mês', fontsize=12)
     ax.set_ylabel('Número de Clientes Únicos', fontsize=12)
 
-    formatter_k_int = ticker.FuncFormatter(lambda x, p: f'{x/1000:.0f}K')
     ax.yaxis.set_major_formatter(formatter_k_int)
 
     for p in ax.patches:
@@ -221,27 +227,13 @@ def plot_clientes_unicos_mensal_filial(df_vendas):
     ax.legend(title='Filial', loc='upper left')
 
     # 5. Salvamento
-    save_path = os.path.join(PATH_GRAFICOS, 'clientes_unicos_mensal_agrupado.png')
+    save_path = caminho or os.path.join(PATH_GRAFICOS, 'clientes_unicos_mensal_agrupado.png')
     plt.tight_layout()
-    plt.savefig(save_path)
-    plt.show()
-    plt.close()
-
-def vendas_dia_semana(df):
-    df['DIA_SEMANA'] = df['DATA_ATEND'].dt.day_name()
-
-    df_faturamento_medio = df.groupby(['DIA_SEMANA', 'FILIAL']).agg(
-        Soma_Faturamento=('FATUR_VENDA', 'sum'),
-        Num_Dias_Unicos=('DATA_ATEND', 'nunique') # CONTAGEM DE DIAS ÚNICOS
-    ).reset_index()
-    
-    df_faturamento_medio['Faturamento_Medio'] = df_faturamento_medio['Soma_Faturamento'] / df_faturamento_medio['Num_Dias_Unicos']
-
-    ordem_dias = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-    df_faturamento_medio['DIA_ORDEM'] = pd.Categorical(
-        df_faturamento_medio['DIA_SEMANA'], categories=ordem_dias, ordered=True
-    )
-    df_faturamento_medio = df_faturamento_medio.sort_values(['DIA_ORDEM', 'FILIAL'])
+    return rd.finalizar_figura(plt, save_path)
+
+def vendas_dia_semana(df, caminho=None):
+    # Faturamento médio por dia da semana (sem criar colunas em 'df')
+    df_faturamento_medio = mv.faturamento_medio_dia_semana(df)
     plt.figure(figsize=(12, 7))
     sns.set_style("whitegrid")
     bar_plot = sns.barplot(
@@ -258,8 +250,5 @@ def vendas_dia_semana(df):
     plt.xticks(rotation=30, ha='right', fontsize=10)
     plt.legend(title='Filial', loc='upper left')
 
-    PATH_GRAFICOS = os.path.join(os.pardir, 'graphics')
-    save_path = os.path.join(PATH_GRAFICOS, 'vendas_dia_semana.png')
-    plt.savefig(save_path)
-    plt.show()
-    plt.close()
\ No newline at end of file
+    save_path = caminho or os.path.join(PATH_GRAFICOS, 'vendas_dia_semana.png')
+    return rd.finalizar_figura(plt, save_path)
@@ -1,18 +1,19 @@
-import matplotlib.pyplot as plt
-import matplotlib.ticker as ticker
-import seaborn as sns
-import pandas as pd
 import os
+import re
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+
+import metricas_vendas as mv
+import renderizacao as rd
+from importacao_preguicosa import bibliotecas_graficas
 
 # --- Configurações Globais do Módulo ---
 
 # Define o caminho para a pasta de gráficos (../graphics)
 PATH_GRAFICOS = os.path.join(os.pardir, 'graphics')
-# Garante que a pasta de gráficos exista
-os.makedirs(PATH_GRAFICOS, exist_ok=True)
 
-# Define o estilo padrão do Seaborn
-sns.set_style("whitegrid")
+# Bibliotecas gráficas, pasta de gráficos e estilo: configurados no primeiro gráfico
+plt, ticker, sns = bibliotecas_graficas(globals())
 
 # Mapeamento de meses (constante global)
 MES_MAP = {
@@ -26,30 +27,41 @@ MESES_ORDENADOS = list(MES_MAP.values())
 
 # --- Função de Plotagem de Sazonalidade ---
 
-def plot_faturamento_sazonal_filial(df_vendas_produtos, categorias, nome_arquivo, titulo_grafico):
-    df = df_vendas_produtos.copy()
-    
-    # Garante que a coluna de mês exista (caso o DF seja 'vendas_produtos' puro)
-    if 'MES_NOME' not in df.columns:
-        if 'MES_NUM' not in df.columns:
-             # Converte DATA_ATEND (que já deve ser datetime do notebook)
-             df['DATA_ATEND'] = pd.to_datetime(df['DATA_ATEND'])
-             df['MES_NUM'] = df['DATA_ATEND'].dt.month
-        df['MES_NOME'] = df['MES_NUM'].map(MES_MAP)
+def _formatador_faturamento(max_faturamento):
+    # Formata o eixo Y para R$ K (Milhares) ou R$ (normal)
+    if max_faturamento >= 10000: # Se o pico for > 10K, usa 'K'
+        return ticker.FuncFormatter(lambda x, p: f'R$ {x/1000:.0f}K')
+    return ticker.FuncFormatter(lambda x, p: f'R$ {x:,.0f}')
+
+def _renderizar_modelo(df_sazonal, caminho, titulo_grafico):
+    # Modo headless: atualiza a figura-modelo (sem recriar barras nem chamar show)
+    filiais, valores = rd.matriz_grupos(df_sazonal, 'MES_NUM', list(MES_MAP), 'FILIAL', 'FATUR_VENDA')
+    modelo = rd.modelo_barras_agrupadas(
+        'faturamento_sazonal', plt, sns, MESES_ORDENADOS, filiais,
+        paleta='Set2', xlabel='Mês', ylabel='Faturamento (R$)'
+    )
+    modelo.atualizar(valores, titulo_grafico, _formatador_faturamento(df_sazonal['FATUR_VENDA'].max()))
+    modelo.salvar(caminho)
 
+def plot_faturamento_sazonal_filial(df_vendas_produtos, categorias, nome_arquivo, titulo_grafico, caminho=None):
     # 2. Filtragem e Agrupamento
-    
-    # Adicionamos .str.strip() para limpar espaços antes de filtrar
-    # Isso garante que 'Natal ' (com espaço) seja tratado como 'Natal'
-    df_filtrado = df[df['CATEGORIA'].str.strip().isin(categorias)]
-    
-    # Agrupa o faturamento por mês e filial
-    df_sazonal = df_filtrado.groupby(['MES_NOME', 'FILIAL'])['FATUR_VENDA'].sum().reset_index()
+
+    # Faturamento por mês e filial das categorias (comparadas sem espaços)
+    df_sazonal = mv.faturamento_sazonal_filial(df_vendas_produtos, categorias)
+    df_sazonal['MES_NOME'] = df_sazonal['MES_NUM'].map(MES_MAP)
 
     if df_sazonal.empty:
         print(f"Aviso: Nenhuma venda encontrada para as categorias: {categorias}. Gráfico não gerado.")
         return
 
+    # 'caminho' substitui PATH_GRAFICOS/nome_arquivo (ex.: render_lote.py)
+    return _desenhar_sazonal(df_sazonal, caminho or os.path.join(PATH_GRAFICOS, nome_arquivo), titulo_grafico)
+
+def _desenhar_sazonal(df_sazonal, caminho, titulo_grafico):
+    if rd.headless():
+        _renderizar_modelo(df_sazonal, caminho, titulo_grafico)
+        return caminho
+
     # 3. Geração do Gráfico
     plt.figure(figsize=(14, 7))
     ax = sns.barplot(
@@ -65,17 +77,83 @@ def plot_faturamento_sazonal_filial(df_vendas_produtos, categorias, nome_arquivo
     ax.set_title(titulo_grafico, fontsize=16)
     ax.set_xlabel('Mês', fontsize=12)
     ax.set_ylabel('Faturamento (R$)', fontsize=12)
-
-    # Formata o eixo Y para R$ K (Milhares) ou R$ (normal)
-    max_faturamento = df_sazonal['FATUR_VENDA'].max()
-    if max_faturamento >= 10000: # Se o pico for > 10K, usa 'K'
-        formatter = ticker.FuncFormatter(lambda x, p: f'R$ {x/1000:.0f}K')
-    else:
-        formatter = ticker.FuncFormatter(lambda x, p: f'R$ {x:,.0f}')
-    ax.yaxis.set_major_formatter(formatter)
+    ax.yaxis.set_major_formatter(_formatador_faturamento(df_sazonal['FATUR_VENDA'].max()))
 
     ax.legend(title='Filial', loc='upper left')
 
     # 5. Salvamento
-    save_path = os.path.join(PATH_GRAFICOS, nome_arquivo)
-    plt.tight_layout()
\ No newline at end of file
+    plt.tight_layout()
+    return rd.finalizar_figura(plt, caminho)
+
+
+# --- Sazonalidade de Todas as Categorias ---
+
+def _nome_arquivo_categoria(categoria):
+    # 'Bacalhau & Pescados' -> 'faturamento_sazonal_bacalhau_pescados.png'
+    ascii_ = unicodedata.normalize('NFKD', categoria).encode('ascii', 'ignore').decode()
+    return f"faturamento_sazonal_{re.sub(r'[^0-9a-z]+', '_', ascii_.lower()).strip('_')}.png"
+
+def _nomes_arquivo_categorias(categorias):
+    # Um arquivo por categoria: nomes que coincidem depois de tirar acentos e
+    # pontuação (ex.: 'Grãos' e 'Graos') recebem um sufixo (_2, _3, ...), em
+    # vez de um gráfico sobrescrever o outro
+    nomes, usados = {}, set()
+    for categoria in categorias:
+        base = _nome_arquivo_categoria(categoria)[:-len('.png')]
+        nome, sufixo = base, 2
+        while nome in usados:
+            nome, sufixo = f'{base}_{sufixo}', sufixo + 1
+        if nome != base:
+            print(f"Aviso: a categoria '{categoria}' tem o mesmo nome de arquivo de outra; usando '{nome}.png'.")
+        usados.add(nome)
+        nomes[categoria] = f'{nome}.png'
+    return nomes
+
+def _renderizar_categorias(tarefas, pasta_graficos):
+    # Executado em cada processo: modo headless e uma figura-modelo por processo
+    # (a pasta de gráficos criada no primeiro uso do pyplot é a do chamador)
+    global PATH_GRAFICOS
+    PATH_GRAFICOS = pasta_graficos
+    rd.configurar_renderizacao('headless')
+    return [_desenhar_sazonal(df_sazonal, caminho, titulo_grafico) for df_sazonal, caminho, titulo_grafico in tarefas]
+
+def plot_faturamento_sazonal_categorias(df_vendas_produtos, categorias=None, apenas_dados=False, processos=1,
+                                        titulo='Faturamento Mensal da Categoria {} por Filial'):
+    """
+    Gráfico sazonal (mês x filial) de cada categoria, todos a partir de uma
+    única agregação por (CATEGORIA, MES_NUM, FILIAL). 'categorias' = None
+    gera todas. Com apenas_dados=True, retorna {categoria: DataFrame} sem
+    desenhar; senão, {categoria: caminho do PNG}. Com processos > 1 os
+    gráficos são divididos entre processos (sempre em modo headless).
+    """
+    # 1. Uma agregação para todas as categorias, dividida por categoria
+    df_categorias = mv.faturamento_sazonal_categorias(df_vendas_produtos)
+    if categorias is not None:
+        df_categorias = df_categorias.loc[df_categorias['CATEGORIA'].isin(categorias)]
+    dados = {
+        categoria: df.drop(columns='CATEGORIA').reset_index(drop=True)
+        for categoria, df in df_categorias.groupby('CATEGORIA', observed=True)
+    }
+    if apenas_dados:
+        return dados
+
+    # 2. Um gráfico por categoria (nomes de arquivo distintos)
+    nomes = _nomes_arquivo_categorias(dados)
+    tarefas = [
+        (df.assign(MES_NOME=df['MES_NUM'].map(MES_MAP)),
+         os.path.join(PATH_GRAFICOS, nomes[categoria]), titulo.format(categoria))
+        for categoria, df in dados.items()
+    ]
+    if processos == 1 or len(tarefas) < 2:
+        caminhos = [_desenhar_sazonal(df_sazonal, caminho, titulo_grafico) for df_sazonal, caminho, titulo_grafico in tarefas]
+    else:
+        processos = min(processos or os.cpu_count() or 1, len(tarefas))
+        lotes = [tarefas[i::processos] for i in range(processos)]
+        with ProcessPoolExecutor(max_workers=processos) as executor:
+            resultados = list(executor.map(_renderizar_categorias, lotes, [PATH_GRAFICOS] * processos))
+        # Desfaz a divisão intercalada dos lotes para manter a ordem das categorias
+        caminhos = [None] * len(tarefas)
+        for i, lote in enumerate(resultados):
+            caminhos[i::processos] = lote
+
+    return dict(zip(dados, caminhos))
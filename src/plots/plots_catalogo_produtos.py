@@ -1,41 +1,25 @@
-import matplotlib.pyplot as plt
-import matplotlib.ticker as ticker
-import seaborn as sns
-import pandas as pd
 import os
 
+import metricas_produtos as mp
+import renderizacao as rd
+from importacao_preguicosa import bibliotecas_graficas
+
 #Configurações Globais do Módulo
 
 # Define o caminho para a pasta de gráficos (../graphics)
 PATH_GRAFICOS = os.path.join(os.pardir, 'graphics')
-# Garante que a pasta de gráficos exista
-os.makedirs(PATH_GRAFICOS, exist_ok=True)
 
-# Define o estilo padrão do Seaborn para todas as funções deste módulo
-sns.set_style("whitegrid")
+# Bibliotecas gráficas carregadas sob demanda (pasta e estilo no primeiro gráfico)
+plt, ticker, sns = bibliotecas_graficas(globals())
 
 
 #Funções de Plotagem
 
-def plot_top_10_categorias(df_produtos):
+def plot_top_10_categorias(df_produtos, caminho=None):
     categorias_para_excluir = ['Sem categoria', '']
 
-    # 2. Filtrar o DataFrame
-    produtos_clean_categoria = df_produtos[
-        ~df_produtos['CATEGORIA'].str.strip().isin(categorias_para_excluir)
-    ]
-
-    # 3. Selecionar o Top 10
-    top_10_cat = produtos_clean_categoria['CATEGORIA'].value_counts(normalize=True).head(10)
-
-    # 4. Converter a Series para um DataFrame
-    top_10_df = top_10_cat.reset_index()
-
-    # 5. Renomear as colunas
-    top_10_df.columns = ['CATEGORIA', 'PERCENTUAL']
-
-    # 6. Converter o percentual de (0.0 a 1.0) para (0 a 100) para exibição
-    top_10_df['PERCENTUAL'] = top_10_df['PERCENTUAL'] * 100
+    # 2. a 6. Top 10 categorias (em %) sem as excluídas (camada de métricas)
+    top_10_df = mp.distribuicao_catalogo(df_produtos, 'CATEGORIA', categorias_para_excluir, 10)
 
     # --- Geração do Gráfico ---
     plt.figure(figsize=(12, 8))
@@ -67,31 +51,15 @@ def plot_top_10_categorias(df_produtos):
     plt.tight_layout()
 
     # Salvar e exibir
-    save_path = os.path.join(PATH_GRAFICOS, 'top_10_categorias.png')
-    plt.savefig(save_path)
-    plt.show()
-    plt.close()
+    save_path = caminho or os.path.join(PATH_GRAFICOS, 'top_10_categorias.png')
+    return rd.finalizar_figura(plt, save_path)
 
-def plot_top_10_subcategorias(df_produtos):
+def plot_top_10_subcategorias(df_produtos, caminho=None):
     # 1. Criar uma lista de subcategorias a serem excluídas
     subcategorias_para_excluir = ['Sem subcategoria', '']
 
-    # 2. Filtrar o DataFrame
-    produtos_clean_subcategoria = df_produtos[
-        ~df_produtos['SUBCATEGORIA'].str.strip().isin(subcategorias_para_excluir)
-    ]
-
-    # 3. Selecionar o Top 10
-    top_10_cat = produtos_clean_subcategoria['SUBCATEGORIA'].value_counts(normalize=True).head(10)
-
-    # 4. Converter a Series para um DataFrame
-    top_10_df = top_10_cat.reset_index()
-
-    # 5. Renomear as colunas
-    top_10_df.columns = ['SUBCATEGORIA', 'PERCENTUAL']
-
-    # 6. Converter o percentual de (0.0 a 1.0) para (0 a 100) para exibição
-    top_10_df['PERCENTUAL'] = top_10_df['PERCENTUAL'] * 100
+    # 2. a 6. Top 10 subcategorias (em %) sem as excluídas (camada de métricas)
+    top_10_df = mp.distribuicao_catalogo(df_produtos, 'SUBCATEGORIA', subcategorias_para_excluir, 10)
 
     # --- Geração do Gráfico ---
     plt.figure(figsize=(12, 8))
@@ -123,7 +91,5 @@ def plot_top_10_subcategorias(df_produtos):
     plt.tight_layout()
 
     # Salvar e exibir
-    save_path = os.path.join(PATH_GRAFICOS, 'top_10_subcategorias.png')
-    plt.savefig(save_path)
-    plt.show()
-    plt.close()
\ No newline at end of file
+    save_path = caminho or os.path.join(PATH_GRAFICOS, 'top_10_subcategorias.png')
+    return rd.finalizar_figura(plt, save_path)
@@ -1,15 +1,16 @@
-import matplotlib.pyplot as plt
-import matplotlib.ticker as ticker
-import seaborn as sns
 import pandas as pd
 import os
 
+import metricas_vendas as mv
+import renderizacao as rd
+from importacao_preguicosa import bibliotecas_graficas
+
 PATH_GRAFICOS = os.path.join(os.pardir, 'graphics')
+plt, ticker, sns = bibliotecas_graficas(globals())
 
-def plot_faturamento_mensal_linha(df_vendas):
-    df = df_vendas.copy()
-    
-    df['MES_NUM'] = df['DATA_ATEND'].dt.month
+def plot_faturamento_mensal_linha(df_vendas, caminho=None):
+    # Faturamento por mês (camada de métricas)
+    df_agregado = mv.faturamento_mensal(df_vendas)
 
     # Mapeamento dos meses
     mes_map = {
@@ -18,13 +19,11 @@ def plot_faturamento_mensal_linha(df_vendas):
         9: 'Set', 10: 'Out', 11: 'Nov', 12: 'Dez'
     }
 
-    df['MES_NOME'] = df['MES_NUM'].map(mes_map)
+    df_agregado['MES_NOME'] = df_agregado['MES_NUM'].map(mes_map)
 
     # Lista ordenada dos nomes dos meses para usar no gráfico
     meses_ordenados = list(mes_map.values())
 
-    df_agregado = df.groupby('MES_NOME')['FATUR_VENDA'].sum().reset_index()
-    
     # Garante a ordem correta para plotagem
     df_agregado['MES_NOME'] = pd.Categorical(
         df_agregado['MES_NOME'], 
@@ -77,13 +76,11 @@ def plot_faturamento_mensal_linha(df_vendas):
         )
 
     plt.tight_layout()
-    plt.show()
-    plt.close()
+    return rd.finalizar_figura(plt, caminho)
 
-def faturamento_mensal(df_vendas):
-    df = df_vendas.copy()
-    
-    df['MES_NUM'] = df['DATA_ATEND'].dt.month
+def faturamento_mensal(df_vendas, caminho=None):
+    # Faturamento por mês (camada de métricas)
+    df_agregado = mv.faturamento_mensal(df_vendas)
 
     # Mapeamento dos meses
     mes_map = {
@@ -92,13 +89,11 @@ def faturamento_mensal(df_vendas):
         9: 'Set', 10: 'Out', 11: 'Nov', 12: 'Dez'
     }
 
-    df['MES_NOME'] = df['MES_NUM'].map(mes_map)
+    df_agregado['MES_NOME'] = df_agregado['MES_NUM'].map(mes_map)
 
     # Lista ordenada dos nomes dos meses para usar no gráfico
     meses_ordenados = list(mes_map.values())
 
-    df_agregado = df.groupby('MES_NOME')['FATUR_VENDA'].sum().reset_index()
-    
     # Garante a ordem correta para plotagem
     df_agregado['MES_NOME'] = pd.Categorical(
         df_agregado['MES_NOME'], 
@@ -128,5 +123,4 @@ def faturamento_mensal(df_vendas):
     ax.yaxis.set_major_formatter(formatter)
 
     plt.tight_layout()
-    plt.show()
-    plt.close()
\ No newline at end of file
+    return rd.finalizar_figura(plt, caminho)
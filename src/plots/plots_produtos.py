@@ -1,19 +1,15 @@
-import matplotlib.pyplot as plt
-import seaborn as sns
-import matplotlib.ticker as ticker
 import os
 
-PATH_GRAFICOS = os.path.join(os.pardir, 'graphics')
-
-def top_categorias_vendidas(df):
-    df_volume_categoria = df.groupby('CATEGORIA')['QTD_VENDA'].sum().reset_index()
+import deteccao_sazonal as dz
+import metricas_produtos as mp
+import renderizacao as rd
+from importacao_preguicosa import bibliotecas_graficas
 
-    total_volume = df_volume_categoria['QTD_VENDA'].sum()
-    df_volume_categoria['PERCENTUAL'] = (df_volume_categoria['QTD_VENDA'] / total_volume) * 100
+PATH_GRAFICOS = os.path.join(os.pardir, 'graphics')
+plt, ticker, sns = bibliotecas_graficas(globals())
 
-    df_top_10_volume = df_volume_categoria.sort_values(
-        'PERCENTUAL', ascending=False
-    ).head(10)
+def top_categorias_vendidas(df, caminho=None):
+    df_top_10_volume = mp.top_categorias_volume(df, 10)
 
     plt.figure(figsize=(14, 7))
     sns.set_style("whitegrid")
@@ -44,21 +40,11 @@ def top_categorias_vendidas(df):
     plt.xticks(rotation=45, ha='right')
     plt.tight_layout()
 
-    PATH_GRAFICOS = os.path.join(os.pardir, 'graphics')
-    save_path = os.path.join(PATH_GRAFICOS, 'top_10_categorias_volume_vendas.png')
-    plt.savefig(save_path)
-    plt.show()
-    plt.close()
+    save_path = caminho or os.path.join(PATH_GRAFICOS, 'top_10_categorias_volume_vendas.png')
+    return rd.finalizar_figura(plt, save_path)
 
-def top_subcategorias_vendidas(df):
-    df_volume_categoria = df.groupby('SUBCATEGORIA')['QTD_VENDA'].sum().reset_index()
-
-    total_volume = df_volume_categoria['QTD_VENDA'].sum()
-    df_volume_categoria['PERCENTUAL'] = (df_volume_categoria['QTD_VENDA'] / total_volume) * 100
-
-    df_top_10_volume = df_volume_categoria.sort_values(
-        'PERCENTUAL', ascending=False
-    ).head(10)
+def top_subcategorias_vendidas(df, caminho=None):
+    df_top_10_volume = mp.top_subcategorias_volume(df, 10)
 
     plt.figure(figsize=(14, 7))
     sns.set_style("whitegrid")
@@ -89,13 +75,11 @@ def top_subcategorias_vendidas(df):
     plt.xticks(rotation=45, ha='right')
     plt.tight_layout()
 
-    PATH_GRAFICOS = os.path.join(os.pardir, 'graphics')
-    save_path = os.path.join(PATH_GRAFICOS, 'top_subcategorias_vendidas.png')
-    plt.savefig(save_path)
-    plt.show()
-    plt.close()
+    save_path = caminho or os.path.join(PATH_GRAFICOS, 'top_subcategorias_vendidas.png')
+    return rd.finalizar_figura(plt, save_path)
 
-def top_categorias_sazonais(df, n_top, outliers):
+def top_categorias_sazonais(df, n_top, outliers=None, caminho=None):
+    outliers = dz.meses_outliers(df) if outliers is None else outliers
     mes_map = {
         1: 'Jan', 2: 'Fev', 3: 'Mar', 4: 'Abr',
         5: 'Mai', 6: 'Jun', 7: 'Jul', 8: 'Ago',
@@ -103,20 +87,7 @@ def top_categorias_sazonais(df, n_top, outliers):
     }
     meses_ordenados = [mes_map[m] for m in outliers]
 
-    df['MES_NUM'] = df['DATA_ATEND'].dt.month
-
-    df_outliers = df.loc[
-        df['MES_NUM'].isin(outliers)
-    ].copy()
-
-    df_agregado = df_outliers.groupby(['MES_NUM', 'CATEGORIA'])['QTD_VENDA'].sum().reset_index()
-    df_agregado['TOTAL_MES'] = df_agregado.groupby('MES_NUM')['QTD_VENDA'].transform('sum')
-    df_agregado['PERCENTUAL'] = (df_agregado['QTD_VENDA'] / df_agregado['TOTAL_MES']) * 100
-
-    def get_top_n(group):
-        return group.nlargest(n_top, 'PERCENTUAL')
-
-    df_top_n_mensal = df_agregado.groupby('MES_NUM', group_keys=False).apply(get_top_n)
+    df_top_n_mensal = mp.top_categorias_sazonais(df, n_top, outliers)
     
     df_top_n_mensal['MES_NOME'] = df_top_n_mensal['MES_NUM'].map(mes_map)
 
@@ -151,12 +122,11 @@ def top_categorias_sazonais(df, n_top, outliers):
     plt.tight_layout(rect=[0, 0, 0.85, 1])
     
     # 6. Salvamento
-    save_path = os.path.join(PATH_GRAFICOS, 'top_3_categorias_sazonais.png')
-    plt.savefig(save_path)
-    plt.show()
-    plt.close()
+    save_path = caminho or os.path.join(PATH_GRAFICOS, 'top_3_categorias_sazonais.png')
+    return rd.finalizar_figura(plt, save_path)
 
-def top_subcategorias_sazonais(df, n_top, outliers):
+def top_subcategorias_sazonais(df, n_top, outliers=None, caminho=None):
+    outliers = dz.meses_outliers(df) if outliers is None else outliers
     mes_map = {
         1: 'Jan', 2: 'Fev', 3: 'Mar', 4: 'Abr',
         5: 'Mai', 6: 'Jun', 7: 'Jul', 8: 'Ago',
@@ -164,20 +134,7 @@ def top_subcategorias_sazonais(df, n_top, outliers):
     }
     meses_ordenados = [mes_map[m] for m in outliers]
 
-    df['MES_NUM'] = df['DATA_ATEND'].dt.month
-
-    df_outliers = df.loc[
-        df['MES_NUM'].isin(outliers)
-    ].copy()
-
-    df_agregado = df_outliers.groupby(['MES_NUM', 'SUBCATEGORIA'])['QTD_VENDA'].sum().reset_index()
-    df_agregado['TOTAL_MES'] = df_agregado.groupby('MES_NUM')['QTD_VENDA'].transform('sum')
-    df_agregado['PERCENTUAL'] = (df_agregado['QTD_VENDA'] / df_agregado['TOTAL_MES']) * 100
-
-    def get_top_n(group):
-        return group.nlargest(n_top, 'PERCENTUAL')
-
-    df_top_n_mensal = df_agregado.groupby('MES_NUM', group_keys=False).apply(get_top_n)
+    df_top_n_mensal = mp.top_subcategorias_sazonais(df, n_top, outliers)
     
     df_top_n_mensal['MES_NOME'] = df_top_n_mensal['MES_NUM'].map(mes_map)
 
@@ -212,30 +169,18 @@ def top_subcategorias_sazonais(df, n_top, outliers):
     plt.tight_layout(rect=[0, 0, 0.85, 1])
     
     # 6. Salvamento
-    save_path = os.path.join(PATH_GRAFICOS, 'top_3_subcategorias_sazonais.png')
-    plt.savefig(save_path)
-    plt.show()
-    plt.close()
+    save_path = caminho or os.path.join(PATH_GRAFICOS, 'top_3_subcategorias_sazonais.png')
+    return rd.finalizar_figura(plt, save_path)
 
-def top_categoria_outlier_share(df, categoria, outliers):
+def top_categoria_outlier_share(df, categoria, outliers=None, caminho=None):
+    outliers = dz.meses_outliers(df) if outliers is None else outliers
     non_outlier_months = [m for m in range(1, 13) if m not in outliers]
     
     mes_map = {1: 'Jan', 2: 'Fev', 3: 'Mar', 4: 'Abr', 5: 'Mai', 6: 'Jun', 
                7: 'Jul', 8: 'Ago', 9: 'Set', 10: 'Out', 11: 'Nov', 12: 'Dez'}
     meses_ordenados = [mes_map[m] for m in non_outlier_months]
 
-    df['MES_NUM'] = df['DATA_ATEND'].dt.month
-
-    df_non_outliers = df.loc[
-        df['MES_NUM'].isin(non_outlier_months)
-    ].copy()
-
-    df_agregado = df_non_outliers.groupby(['MES_NUM', 'CATEGORIA'])['QTD_VENDA'].sum().reset_index()
-
-    df_agregado['TOTAL_MES'] = df_agregado.groupby('MES_NUM')['QTD_VENDA'].transform('sum')
-    df_agregado['PERCENTUAL'] = (df_agregado['QTD_VENDA'] / df_agregado['TOTAL_MES']) * 100
-
-    df_target = df_agregado.loc[df_agregado['CATEGORIA'] == categoria].copy()
+    df_target = mp.participacao_categoria_mensal(df, categoria, non_outlier_months)
     
     df_target['MES_NOME'] = df_target['MES_NUM'].map(mes_map)
 
@@ -272,12 +217,10 @@ def top_categoria_outlier_share(df, categoria, outliers):
     plt.tight_layout()
     
     # 6. Salvamento
-    save_path = os.path.join(PATH_GRAFICOS, f'participacao_mensal_{categoria.lower().replace(" ", "_")}_non_outlier.png')
-    plt.savefig(save_path)
-    plt.show()
-    plt.close()
+    save_path = caminho or os.path.join(PATH_GRAFICOS, f'participacao_mensal_{categoria.lower().replace(" ", "_")}_non_outlier.png')
+    return rd.finalizar_figura(plt, save_path)
 
-def top_categorias_mensal(df, n_top):
+def top_categorias_mensal(df, n_top, caminho=None):
     mes_map = {
         1: 'Jan', 2: 'Fev', 3: 'Mar', 4: 'Abr',
         5: 'Mai', 6: 'Jun', 7: 'Jul', 8: 'Ago',
@@ -285,16 +228,7 @@ def top_categorias_mensal(df, n_top):
     }
     meses_ordenados = list(mes_map.values())
 
-    df['MES_NUM'] = df['DATA_ATEND'].dt.month
-
-    df_agregado = df.groupby(['MES_NUM', 'CATEGORIA'])['QTD_VENDA'].sum().reset_index()
-    df_agregado['TOTAL_MES'] = df_agregado.groupby('MES_NUM')['QTD_VENDA'].transform('sum')
-    df_agregado['PERCENTUAL'] = (df_agregado['QTD_VENDA'] / df_agregado['TOTAL_MES']) * 100
-
-    def get_top_n(group):
-        return group.nlargest(n_top, 'PERCENTUAL')
-
-    df_top_n_mensal = df_agregado.groupby('MES_NUM', group_keys=False).apply(get_top_n)
+    df_top_n_mensal = mp.top_categorias_mensal(df, n_top)
     
     df_top_n_mensal['MES_NOME'] = df_top_n_mensal['MES_NUM'].map(mes_map)
 
@@ -329,45 +263,27 @@ def top_categorias_mensal(df, n_top):
     plt.tight_layout(rect=[0, 0, 0.85, 1])
     
     # 6. Salvamento
-    save_path = os.path.join(PATH_GRAFICOS, 'top_3_categorias_sazonais.png')
-    plt.savefig(save_path)
-    plt.show()
-    plt.close()
+    save_path = caminho or os.path.join(PATH_GRAFICOS, f'top_{n_top}_categorias_mensal.png')
+    return rd.finalizar_figura(plt, save_path)
 
-def top_produtos_sazonais_percentual(df, n_top, outliers, categoria):
+def top_produtos_sazonais_percentual(df, n_top, outliers, categoria, caminho=None):
+    # outliers=None: meses de pico detectados na própria categoria
+    if outliers is None:
+        outliers = dz.meses_outliers(df, {'CATEGORIA': [categoria]})
     mes_map = {
         1: 'Jan', 2: 'Fev', 3: 'Mar', 4: 'Abr', 5: 'Mai', 6: 'Jun', 
         7: 'Jul', 8: 'Ago', 9: 'Set', 10: 'Out', 11: 'Nov', 12: 'Dez'
     }
     meses_ordenados = [mes_map[m] for m in outliers]
 
-    # 1. Filtra os dados para os meses de pico E a categoria alvo
-    df_alvo = df.loc[
-        (df['MES_NUM'].isin(outliers)) & 
-        (df['CATEGORIA'] == categoria)
-    ].copy()
-    
-    if df_alvo.empty:
+    # 1. Filtra os meses de pico E a categoria alvo e calcula o Percentual de
+    # participação do SKU no volume TOTAL DA CATEGORIA NAQUELE MÊS, mantendo
+    # os Top N SKUs de CADA MÊS (camada de métricas)
+    df_top_n_mensal = mp.top_produtos_sazonais(df, n_top, outliers, categoria)
+
+    if df_top_n_mensal.empty:
         print(f"Aviso: O DataFrame alvo para a categoria '{categoria}' está vazio. Verifique o nome da categoria ou os filtros.")
         return
-
-    # 2. Agrupa por Mês e Nome do Produto, somando o volume
-    df_agg = df_alvo.groupby(['MES_NUM', 'NOME_PRODUTO'])['QTD_VENDA'].sum().reset_index()
-
-    # 3. Calcula o Percentual de participação do SKU no volume TOTAL DA CATEGORIA NAQUELE MÊS
-    
-    # Calcula o total de volume da CATEGORIA por mês (usando transform)
-    df_agg['TOTAL_MES_CAT'] = df_agg.groupby('MES_NUM')['QTD_VENDA'].transform('sum')
-    
-    # Calcula o Percentual
-    df_agg['PERCENTUAL'] = (df_agg['QTD_VENDA'] / df_agg['TOTAL_MES_CAT']) * 100
-
-    # 4. Encontra os Top N SKUs para CADA MÊS, baseado em PERCENTUAL
-    def get_top_n(group):
-        # Agora o nlargest usa a coluna PERCENTUAL para ranquear
-        return group.nlargest(n_top, 'PERCENTUAL')
-
-    df_top_n_mensal = df_agg.groupby('MES_NUM', group_keys=False).apply(get_top_n)
     
     # 5. Mapeia o MES_NUM para MES_NOME para os rótulos do gráfico
     df_top_n_mensal['MES_NOME'] = df_top_n_mensal['MES_NUM'].map(mes_map)
@@ -406,18 +322,16 @@ def top_produtos_sazonais_percentual(df, n_top, outliers, categoria):
     plt.tight_layout(rect=[0, 0, 0.8, 1])
     
     # 7. Salvamento
-    save_path = os.path.join(PATH_GRAFICOS, f'top_{n_top}_skus_sazonais_percentual.png')
-    plt.savefig(save_path)
-    plt.show()
-    plt.close()
+    save_path = caminho or os.path.join(PATH_GRAFICOS, f'top_{n_top}_skus_sazonais_percentual.png')
+    return rd.finalizar_figura(plt, save_path)
 
-def plot_top_subcategorias_sazonais(df, n_top):
+def plot_top_subcategorias_sazonais(df, n_top, meses_pico=None, caminho=None):
     """
     Plota a participação percentual (volume) das Top N subcategorias mais vendidas 
-    nos meses sazonais de pico (Março, Novembro, Dezembro).
+    nos meses sazonais de pico (por padrão, os detectados nos dados).
     """
     
-    meses_pico = [3, 11, 12] 
+    meses_pico = dz.meses_outliers(df) if meses_pico is None else meses_pico
     mes_map = {
         1: 'Jan', 2: 'Fev', 3: 'Mar', 4: 'Abr',
         5: 'Mai', 6: 'Jun', 7: 'Jul', 8: 'Ago',
@@ -427,28 +341,9 @@ def plot_top_subcategorias_sazonais(df, n_top):
     
     print(f"Iniciando plot: Top {n_top} Subcategorias por Percentual nos Meses Sazonais {meses_ordenados}...")
 
-    # 1. Filtra os dados apenas para os meses de pico
-    df_picos = df.loc[
-        df['MES_NUM'].isin(meses_pico)
-    ].copy()
-
-    # 2. Agrupa por Mês e SUBCATEGORIA, somando a QTD_VENDA (Volume)
-    df_agregado = df_picos.groupby(['MES_NUM', 'SUBCATEGORIA'])['QTD_VENDA'].sum().reset_index()
-
-    # 3. CÁLCULO DE PERCENTUAL: Calcula o Percentual de participação da Subcategoria no volume TOTAL DAQUELE MÊS
-    
-    # Calcula o total de volume por mês (usando transform)
-    df_agregado['TOTAL_MES'] = df_agregado.groupby('MES_NUM')['QTD_VENDA'].transform('sum')
-    
-    # Calcula o Percentual
-    df_agregado['PERCENTUAL'] = (df_agregado['QTD_VENDA'] / df_agregado['TOTAL_MES']) * 100
-
-    # 4. Encontra as Top N subcategorias para CADA MÊS, baseado em PERCENTUAL
-    def get_top_n(group):
-        # O nlargest agora usa a coluna PERCENTUAL para ranquear
-        return group.nlargest(n_top, 'PERCENTUAL')
-
-    df_top_n_mensal = df_agregado.groupby('MES_NUM', group_keys=False).apply(get_top_n)
+    # 1. Filtra os meses de pico, calcula o Percentual de participação da
+    # Subcategoria no volume TOTAL DAQUELE MÊS e mantém as Top N de CADA MÊS
+    df_top_n_mensal = mp.top_subcategorias_sazonais(df, n_top, meses_pico)
     
     # 5. Mapeia o MES_NUM para MES_NOME para os rótulos do gráfico
     df_top_n_mensal['MES_NOME'] = df_top_n_mensal['MES_NUM'].map(mes_map)
@@ -487,41 +382,31 @@ def plot_top_subcategorias_sazonais(df, n_top):
     plt.tight_layout(rect=[0, 0, 0.85, 1])
     
     # 7. Salvamento
-    save_path = os.path.join(os.pardir, 'graphics', 'top_3_subcategorias_sazonais_percentual.png')
-    plt.savefig(save_path)
-    plt.show()
-    plt.close()
+    save_path = caminho or os.path.join(PATH_GRAFICOS, 'top_3_subcategorias_sazonais_percentual.png')
+    return rd.finalizar_figura(plt, save_path)
 
-def subcategoria_by_filial_sazonal(df_vendas_completo, target_subcategory):
+def subcategoria_by_filial_sazonal(df_vendas_completo, target_subcategory, meses_pico=None, caminho=None):
     """
     Compara o percentual de participação no volume de vendas da subcategoria alvo 
-    entre as filiais RUA e SHOPPING nos meses de pico.
+    entre as filiais RUA e SHOPPING nos meses de pico (por padrão, os meses
+    de pico da própria subcategoria, detectados nos dados).
     """
     
-    meses_pico = [3, 11, 12] 
-    mes_map = {3: 'Mar', 11: 'Nov', 12: 'Dez'}
-    meses_ordenados = list(mes_map.values())
+    if meses_pico is None:
+        meses_pico = dz.meses_outliers(df_vendas_completo, {'SUBCATEGORIA': [target_subcategory]})
+    mes_map = {
+        1: 'Jan', 2: 'Fev', 3: 'Mar', 4: 'Abr', 5: 'Mai', 6: 'Jun',
+        7: 'Jul', 8: 'Ago', 9: 'Set', 10: 'Out', 11: 'Nov', 12: 'Dez'
+    }
+    meses_ordenados = [mes_map[m] for m in meses_pico]
 
-    # 1. Filtra os dados para os meses de pico E a subcategoria alvo
-    df_alvo = df_vendas_completo.loc[
-        (df_vendas_completo['MES_NUM'].isin(meses_pico)) & 
-        (df_vendas_completo['SUBCATEGORIA'] == target_subcategory)
-    ].copy()
+    # 1. Filtra os meses de pico E a subcategoria alvo e calcula a Participação
+    # da Filial no volume TOTAL DA SUBCATEGORIA NAQUELE MÊS
+    df_agregado = mp.participacao_subcategoria_filial(df_vendas_completo, target_subcategory, meses_pico)
 
-    if df_alvo.empty:
+    if df_agregado.empty:
         print(f"Aviso: Não há vendas da subcategoria '{target_subcategory}' nos meses de pico.")
         return
-
-    # 2. Agrupa por Mês e Filial, somando o volume
-    df_agregado = df_alvo.groupby(['MES_NUM', 'FILIAL'])['QTD_VENDA'].sum().reset_index()
-
-    # 3. CÁLCULO DE PERCENTUAL: Participação da Filial no volume TOTAL DA SUBCATEGORIA NAQUELE MÊS
-    
-    # Calcula o total de volume da subcategoria por mês (usando transform)
-    df_agregado['TOTAL_MES_SUBCAT'] = df_agregado.groupby('MES_NUM')['QTD_VENDA'].transform('sum')
-    
-    # Calcula o Percentual
-    df_agregado['PERCENTUAL'] = (df_agregado['QTD_VENDA'] / df_agregado['TOTAL_MES_SUBCAT']) * 100
     
     # 4. Mapeia o MES_NUM para MES_NOME
     df_agregado['MES_NOME'] = df_agregado['MES_NUM'].map(mes_map)
@@ -560,18 +445,12 @@ def subcategoria_by_filial_sazonal(df_vendas_completo, target_subcategory):
     plt.tight_layout()
     
     # 6. Salvamento (Atualizar o nome do arquivo)
-    save_path = os.path.join(os.pardir, 'graphics', f'{target_subcategory.lower()}_percentual_por_filial_sazonal.png'.replace(' ', '_'))
-    plt.savefig(save_path)
-    plt.show()
-    plt.close()
-
-def top_produtos(df):
-    df_faturamento_produto = df.groupby(['NOME_PRODUTO', 'CATEGORIA']).agg(
-        Faturamento_Total=('FATUR_VENDA', 'sum')
-    ).reset_index()
+    save_path = caminho or os.path.join(PATH_GRAFICOS, f'{target_subcategory.lower()}_percentual_por_filial_sazonal.png'.replace(' ', '_'))
+    return rd.finalizar_figura(plt, save_path)
 
-    # 2. Ordenar pelo Faturamento e selecionar os Top 20 produtos mais vendidos
-    df_top_produtos = df_faturamento_produto.sort_values(by='Faturamento_Total', ascending=False).head(20)
+def top_produtos(df, caminho=None):
+    # 1. e 2. Top 20 produtos por Faturamento (camada de métricas)
+    df_top_produtos = mp.top_produtos_faturamento(df, 20)
 
     # 3. Preparar a visualização
     plt.figure(figsize=(14, 8))
@@ -600,19 +479,12 @@ def top_produtos(df):
     plt.legend(title='Categoria', bbox_to_anchor=(1.05, 1), loc='upper left')
 
     # 7. Ajustar o layout e salvar o gráfico
-    PATH_GRAFICOS = os.path.join(os.pardir, 'graphics')
-    save_path = os.path.join(PATH_GRAFICOS, 'top_produtos.png')
-    plt.savefig(save_path)
-    plt.show()
-    plt.close()
-
-def top_produtos_volume(df):
-    df_volume_produto = df.groupby(['NOME_PRODUTO', 'CATEGORIA']).agg(
-        Volume_Total=('QTD_VENDA', 'sum')
-    ).reset_index()
+    save_path = caminho or os.path.join(PATH_GRAFICOS, 'top_produtos.png')
+    return rd.finalizar_figura(plt, save_path)
 
-    # 2. Ordenar pelo Faturamento e selecionar os Top 20 produtos mais vendidos
-    df_top_produtos = df_volume_produto.sort_values(by='Volume_Total', ascending=False).head(20)
+def top_produtos_volume(df, caminho=None):
+    # 1. e 2. Top 20 produtos por Volume (camada de métricas)
+    df_top_produtos = mp.top_produtos_volume(df, 20)
 
     # 3. Preparar a visualização
     plt.figure(figsize=(14, 8))
@@ -642,22 +514,13 @@ def top_produtos_volume(df):
     plt.legend(title='Categoria', bbox_to_anchor=(1.05, 1), loc='upper left')
 
     # 7. Ajustar o layout e salvar o gráfico
-    PATH_GRAFICOS = os.path.join(os.pardir, 'graphics')
-    save_path = os.path.join(PATH_GRAFICOS, 'top_produtos_volume.png')
-    plt.savefig(save_path)
-    plt.show()
-    plt.close()
+    save_path = caminho or os.path.join(PATH_GRAFICOS, 'top_produtos_volume.png')
+    return rd.finalizar_figura(plt, save_path)
 
-def top_categorias_valor(df):
+def top_categorias_valor(df, caminho=None):
 
-    # 1. Agrupar os dados por CATEGORIA e somar o Faturamento
-    df_faturamento_categoria = df.groupby('CATEGORIA').agg(
-        Faturamento_Total=('FATUR_VENDA', 'sum')
-    ).reset_index()
-
-    # 2. Ordenar e selecionar as Top 10 categorias
-    df_faturamento_categoria = df_faturamento_categoria.sort_values(by='Faturamento_Total', ascending=False)
-    df_top_categorias = df_faturamento_categoria.head(10)
+    # 1. e 2. Top 10 categorias por Faturamento (camada de métricas)
+    df_top_categorias = mp.top_categorias_faturamento(df, 10)
 
     # 3. Criar o gráfico de barras (sem rótulos de porcentagem)
     plt.figure(figsize=(12, 7))
@@ -681,4 +544,7 @@ def top_categorias_valor(df):
     plt.ylabel('Faturamento Total (R$)', fontsize=12)
     plt.xticks(rotation=45, ha='right', fontsize=10)
     plt.yticks(fontsize=10)
-    plt.tight_layout()
\ No newline at end of file
+    plt.tight_layout()
+
+    save_path = caminho or os.path.join(PATH_GRAFICOS, 'top_categorias_valor.png')
+    return rd.finalizar_figura(plt, save_path)
@@ -0,0 +1,196 @@
+import argparse
+import importlib
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import pyarrow as pa
+
+# Permite rodar como script (python src/plots/render_lote.py) sem o notebook
+PATH_SRC = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for _pasta in ('plots', 'analytics', 'utils'):
+    if os.path.join(PATH_SRC, _pasta) not in sys.path:
+        sys.path.insert(0, os.path.join(PATH_SRC, _pasta))
+
+import cubo_vendas as cv
+import renderizacao as rd
+
+#Configurações Globais do Módulo
+
+# Pasta de saída padrão (graphics/ na raiz do projeto)
+PATH_GRAFICOS = os.path.join(os.path.dirname(PATH_SRC), 'graphics')
+
+# Meses sazonais dos gráficos: None = meses de pico detectados nos dados
+# (deteccao_sazonal.meses_outliers); uma lista fixa, ex. [3, 11, 12], também vale
+MESES_OUTLIERS = None
+
+# Lista declarativa dos gráficos do relatório (mesmas chamadas do 01_eda)
+GRAFICOS_RELATORIO = [
+    {'modulo': 'plot_faturamento_filial', 'funcao': 'plot_faturamento_total_filial',
+     'arquivo': 'faturamento_anual_por_filial.png'},
+    {'modulo': 'plot_faturamento_filial', 'funcao': 'plot_faturamento_mensal_filial',
+     'arquivo': 'faturamento_mensal_agrupado.png'},
+    {'modulo': 'plot_faturamento_filial', 'funcao': 'plot_faturamento_e_ticket_medio_mensal',
+     'arquivo': 'faturamento_e_ticket_medio_mensal.png'},
+    {'modulo': 'plot_faturamento_filial', 'funcao': 'plot_clientes_unicos_mensal_filial',
+     'arquivo': 'clientes_unicos_mensal_agrupado.png'},
+    {'modulo': 'plots_faturamento', 'funcao': 'plot_faturamento_mensal_linha',
+     'arquivo': 'faturamento_mensal_linha.png'},
+    {'modulo': 'plots_faturamento', 'funcao': 'faturamento_mensal',
+     'arquivo': 'faturamento_mensal.png'},
+    {'modulo': 'plots_produtos', 'funcao': 'top_categorias_vendidas',
+     'arquivo': 'top_10_categorias_volume_vendas.png'},
+    {'modulo': 'plots_produtos', 'funcao': 'top_subcategorias_vendidas',
+     'arquivo': 'top_subcategorias_vendidas.png'},
+    {'modulo': 'plots_produtos', 'funcao': 'top_categorias_valor',
+     'arquivo': 'top_categorias_valor.png'},
+    {'modulo': 'plots_produtos', 'funcao': 'top_produtos',
+     'arquivo': 'top_produtos.png'},
+    {'modulo': 'plots_produtos', 'funcao': 'top_categorias_mensal',
+     'arquivo': 'top_3_categorias_mensal.png', 'kwargs': {'n_top': 3}},
+    {'modulo': 'plots_produtos', 'funcao': 'top_categorias_sazonais',
+     'arquivo': 'top_3_categorias_sazonais.png', 'kwargs': {'n_top': 3, 'outliers': MESES_OUTLIERS}},
+    {'modulo': 'plots_produtos', 'funcao': 'top_subcategorias_sazonais',
+     'arquivo': 'top_3_subcategorias_sazonais.png', 'kwargs': {'n_top': 3, 'outliers': MESES_OUTLIERS}},
+    {'modulo': 'plots_produtos', 'funcao': 'plot_top_subcategorias_sazonais',
+     'arquivo': 'top_3_subcategorias_sazonais_percentual.png', 'kwargs': {'n_top': 3}},
+    {'modulo': 'plots_produtos', 'funcao': 'subcategoria_by_filial_sazonal',
+     'arquivo': 'bacalhau_percentual_por_filial_sazonal.png', 'kwargs': {'target_subcategory': 'Bacalhau'}},
+    {'modulo': 'plot_sazonalidade', 'funcao': 'plot_faturamento_sazonal_filial',
+     'arquivo': 'faturamento_sazonal_natal.png',
+     'kwargs': {'categorias': ['Natal'], 'nome_arquivo': 'faturamento_sazonal_natal.png',
+                'titulo_grafico': 'Faturamento Mensal da Categoria Natal por Filial'}},
+]
+
+
+#Compartilhamento do Cubo entre Processos
+
+def _publicar_frame(df):
+    """
+    Serializa o DataFrame em formato Arrow dentro de um bloco de memória
+    compartilhada. Retorna o bloco (o chamador libera) e sua descrição.
+    """
+    tabela = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, tabela.schema) as writer:
+        writer.write_table(tabela)
+    buffer = sink.getvalue()
+
+    shm = shared_memory.SharedMemory(create=True, size=max(buffer.size, 1))
+    try:
+        shm.buf[:buffer.size] = memoryview(buffer).cast('B')
+    except BaseException:
+        shm.close()
+        shm.unlink()
+        raise
+    return shm, (shm.name, buffer.size)
+
+def _ler_frame(descricao):
+    nome, tamanho = descricao
+    shm = shared_memory.SharedMemory(name=nome)
+    leitor = pa.ipc.open_stream(pa.py_buffer(shm.buf[:tamanho]))
+    df = leitor.read_all().to_pandas()
+    return shm, df
+
+
+#Processos de Renderização
+
+# Estado de cada processo (preenchido uma única vez pelo inicializador)
+_CUBO_WORKER = None
+_BLOCOS_WORKER = []
+
+def _inicializar_worker(descricao_fatos, descricao_clientes, sketches, pasta_saida, modulos):
+    global _CUBO_WORKER
+
+    # Modo headless: backend Agg e nenhum plt.show(); cada gráfico recebe o
+    # caminho do seu PNG e o salva uma única vez
+    rd.configurar_renderizacao('headless')
+
+    # A pasta criada no primeiro uso do pyplot (em cada módulo da lista
+    # pedida) passa a ser a de saída
+    os.makedirs(pasta_saida, exist_ok=True)
+    for nome in modulos:
+        importlib.import_module(nome).PATH_GRAFICOS = pasta_saida
+
+    shm_fatos, fatos = _ler_frame(descricao_fatos)
+    _BLOCOS_WORKER.append(shm_fatos)
+    clientes = None
+    if descricao_clientes is not None:
+        shm_clientes, clientes = _ler_frame(descricao_clientes)
+        _BLOCOS_WORKER.append(shm_clientes)
+    _CUBO_WORKER = cv.CuboVendas(fatos, clientes, sketches)
+
+def _renderizar(spec, pasta_saida):
+    import matplotlib.pyplot as plt
+
+    funcao = getattr(importlib.import_module(spec['modulo']), spec['funcao'])
+    try:
+        # As funções de plots retornam o caminho salvo (None se não houve gráfico)
+        return funcao(_CUBO_WORKER, caminho=os.path.join(pasta_saida, spec['arquivo']), **spec.get('kwargs', {}))
+    except Exception:
+        # Uma falha no meio do gráfico não deixa figuras abertas para a próxima tarefa
+        rd.descartar_modelos()
+        plt.close('all')
+        raise
+
+
+def renderizar_lote(df_vendas_produtos, graficos=GRAFICOS_RELATORIO, pasta_saida=PATH_GRAFICOS, processos=None):
+    """
+    Renderiza os gráficos da lista declarativa em paralelo (modo headless de
+    renderizacao.py; cada função recebe o caminho do seu PNG). O cubo de
+    vendas vai para os processos uma única vez, por memória compartilhada
+    (no modo aproximado, os sketches de clientes, pequenos, vão junto com a
+    inicialização); cada tarefa leva apenas a sua especificação.
+    Retorna {arquivo: caminho gerado ou mensagem de erro}.
+    """
+    cubo = cv.obter_cubo(df_vendas_produtos)
+    modulos = sorted({spec['modulo'] for spec in graficos})
+
+    resultados = {}
+    blocos = []
+    try:
+        shm_fatos, descricao_fatos = _publicar_frame(cubo.fatos)
+        blocos.append(shm_fatos)
+        descricao_clientes = None
+        if cubo.clientes is not None:
+            shm_clientes, descricao_clientes = _publicar_frame(cubo.clientes)
+            blocos.append(shm_clientes)
+
+        with ProcessPoolExecutor(
+            max_workers=processos,
+            initializer=_inicializar_worker,
+            initargs=(descricao_fatos, descricao_clientes, cubo.sketches, pasta_saida, modulos)
+        ) as executor:
+            futuros = {spec['arquivo']: executor.submit(_renderizar, spec, pasta_saida) for spec in graficos}
+            for arquivo, futuro in futuros.items():
+                try:
+                    resultados[arquivo] = futuro.result()
+                except Exception as erro:
+                    resultados[arquivo] = f'Erro: {erro!r}'
+    finally:
+        # Só os blocos efetivamente criados
+        for shm in blocos:
+            shm.close()
+            shm.unlink()
+
+    return resultados
+
+
+if __name__ == '__main__':
+    import carregar_dados
+    from merge_datasets import merge_datasets
+
+    parser = argparse.ArgumentParser(description='Gera os gráficos do relatório em lote.')
+    parser.add_argument('--vendas', default=None, help='caminho do vendas.csv')
+    parser.add_argument('--produtos', default=None, help='caminho do produto.csv')
+    parser.add_argument('--saida', default=PATH_GRAFICOS, help='pasta dos PNGs')
+    parser.add_argument('--processos', type=int, default=None)
+    args = parser.parse_args()
+
+    vendas = carregar_dados.carregar_vendas(args.vendas)
+    produtos = carregar_dados.carregar_produtos(args.produtos)
+    df_agg = merge_datasets(vendas, produtos, 'SKU', modo='indice')
+
+    for arquivo, resultado in renderizar_lote(df_agg, pasta_saida=args.saida, processos=args.processos).items():
+        print(f'{arquivo}: {resultado}')
@@ -0,0 +1,150 @@
+import numpy as np
+
+#Configurações Globais do Módulo
+
+# Modos de renderização: 'interativo' (figura nova a cada gráfico e
+# plt.show(), como no notebook) ou 'headless' (backend Agg, sem show, com
+# figuras-modelo reaproveitadas entre gráficos do mesmo tipo)
+MODOS_RENDER = ('interativo', 'headless')
+MODO_RENDER = 'interativo'
+
+# Figuras-modelo já criadas (chave: tipo do gráfico e sua estrutura)
+_MODELOS = {}
+
+
+#Modo de Renderização
+
+def configurar_renderizacao(modo='headless'):
+    """
+    Troca o modo de renderização dos módulos de plots. No modo 'headless' o
+    matplotlib passa para o backend Agg (sem janelas); chame antes do
+    primeiro gráfico da sessão.
+    """
+    global MODO_RENDER
+    if modo not in MODOS_RENDER:
+        raise ValueError(f"modo deve ser um de {MODOS_RENDER}, não '{modo}'.")
+    if modo == 'headless':
+        import matplotlib
+        matplotlib.use('Agg')
+    else:
+        descartar_modelos()
+    MODO_RENDER = modo
+
+def headless():
+    return MODO_RENDER == 'headless'
+
+def finalizar_figura(plt, caminho):
+    """
+    Encerra um gráfico desenhado com o pyplot: salva a figura atual em
+    'caminho' (None = não salva), mostra-a no modo interativo e a fecha.
+    Retorna o caminho salvo.
+    """
+    if caminho is not None:
+        plt.savefig(caminho)
+    if not headless():
+        plt.show()
+    plt.close()
+    return caminho
+
+def descartar_modelos():
+    """Fecha as figuras-modelo (libera a memória das figuras guardadas)."""
+    import matplotlib.pyplot as plt
+    for modelo in _MODELOS.values():
+        plt.close(modelo.fig)
+    _MODELOS.clear()
+
+
+#Figuras-Modelo
+
+class ModeloBarrasAgrupadas:
+    """
+    Gráfico de barras agrupadas (ex.: mês no eixo x, uma cor por filial)
+    criado uma única vez. Cada novo gráfico só troca as alturas das barras,
+    os textos das anotações, o título e a escala do eixo y, sem recriar os
+    artistas do matplotlib.
+
+    'plt' e 'sns' são os do módulo de plots que usa o modelo (os substitutos
+    preguiçosos de bibliotecas_graficas), para que a pasta de gráficos e o
+    estilo sejam configurados como nos demais gráficos.
+    """
+
+    def __init__(self, plt, sns, rotulos_x, grupos, paleta='Blues', figsize=(14, 7), xlabel='', ylabel='',
+                 titulo_legenda='Filial', anotar=False, fontsize_anotacao=9):
+        self.grupos = list(grupos)
+        self.fig, self.ax = plt.subplots(figsize=figsize)
+        self._layout_pronto = False
+
+        # Mesma disposição do sns.barplot com hue: 80% do espaço de cada x
+        # dividido entre os grupos
+        x = np.arange(len(rotulos_x))
+        largura = 0.8 / len(self.grupos)
+        cores = sns.color_palette(paleta, len(self.grupos))
+        self.barras = [
+            self.ax.bar(x - 0.4 + largura * (i + 0.5), np.zeros(len(x)), largura, color=cor, label=str(grupo))
+            for i, (grupo, cor) in enumerate(zip(self.grupos, cores))
+        ]
+
+        self.ax.set_xticks(x, rotulos_x)
+        self.ax.set_xlabel(xlabel, fontsize=12)
+        self.ax.set_ylabel(ylabel, fontsize=12)
+        self.ax.legend(title=titulo_legenda, loc='upper left')
+
+        self.anotacoes = []
+        if anotar:
+            self.anotacoes = [
+                [self.ax.annotate('', (barra.get_x() + barra.get_width() / 2., 0), ha='center', va='center',
+                                  xytext=(0, 9), textcoords='offset points', fontsize=fontsize_anotacao)
+                 for barra in conteiner]
+                for conteiner in self.barras
+            ]
+
+    def atualizar(self, valores, titulo, formatador_y=None, formato_anotacao='{:.0f}'):
+        """
+        'valores' é uma matriz (grupos x rótulos do eixo x); NaN = sem barra.
+        """
+        valores = np.asarray(valores, dtype=np.float64)
+        for i, conteiner in enumerate(self.barras):
+            for j, barra in enumerate(conteiner):
+                altura = valores[i, j]
+                barra.set_height(0 if np.isnan(altura) else altura)
+                if self.anotacoes:
+                    anotacao = self.anotacoes[i][j]
+                    anotacao.xy = (anotacao.xy[0], 0 if np.isnan(altura) else altura)
+                    anotacao.set_text('' if np.isnan(altura) else formato_anotacao.format(altura))
+
+        maximo = np.nanmax(valores) if np.isfinite(valores).any() else 0
+        self.ax.set_ylim(0, maximo * 1.05 if maximo > 0 else 1)
+        self.ax.set_title(titulo, fontsize=16)
+        if formatador_y is not None:
+            self.ax.yaxis.set_major_formatter(formatador_y)
+
+    def salvar(self, caminho):
+        # O layout é calculado uma vez, com os primeiros rótulos
+        if not self._layout_pronto:
+            self.fig.tight_layout()
+            self._layout_pronto = True
+        self.fig.savefig(caminho)
+
+
+def modelo_barras_agrupadas(tipo, plt, sns, rotulos_x, grupos, **kwargs):
+    """
+    Figura-modelo do tipo de gráfico 'tipo' para estes rótulos e grupos,
+    criada na primeira chamada e reaproveitada nas seguintes.
+    """
+    chave = (tipo, tuple(rotulos_x), tuple(grupos))
+    if chave not in _MODELOS:
+        _MODELOS[chave] = ModeloBarrasAgrupadas(plt, sns, rotulos_x, grupos, **kwargs)
+    return _MODELOS[chave]
+
+def matriz_grupos(df, coluna_x, ordem_x, coluna_grupo, coluna_valor):
+    """
+    Converte o resultado agregado (uma linha por x e grupo) nos grupos e na
+    matriz (grupos x ordem_x) esperados por ModeloBarrasAgrupadas.atualizar.
+    """
+    grupos = df[coluna_grupo]
+    ordem_grupos = list(grupos.cat.categories) if hasattr(grupos, 'cat') else sorted(grupos.dropna().unique())
+    matriz = (
+        df.pivot_table(index=coluna_grupo, columns=coluna_x, values=coluna_valor, aggfunc='sum', observed=True)
+        .reindex(index=ordem_grupos, columns=ordem_x)
+    )
+    return ordem_grupos, matriz.to_numpy(dtype=np.float64)
@@ -0,0 +1,164 @@
+import functools
+import hashlib
+import inspect
+import os
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+#Configurações Globais do Módulo
+
+# Linhas amostradas para a impressão digital de um DataFrame (espaçadas de
+# forma uniforme, sempre incluindo a primeira e a última)
+LINHAS_AMOSTRA = 4096
+
+# Orçamento de memória padrão dos resultados guardados (em MB)
+LIMITE_PADRAO_MB = 256
+
+
+#Impressão Digital
+
+def _atualizar_com_frame(h, df, linhas_amostra):
+    # Formato, nomes e tipos das colunas + hash das linhas amostradas
+    h.update(repr((df.shape, list(df.columns), [str(t) for t in df.dtypes])).encode())
+    if len(df) == 0:
+        return
+    posicoes = np.unique(np.linspace(0, len(df) - 1, min(len(df), linhas_amostra)).astype(np.int64))
+    hashes = pd.util.hash_pandas_object(df.iloc[posicoes], index=True).to_numpy()
+    h.update(hashes.tobytes())
+
+def impressao_digital(dados, linhas_amostra=LINHAS_AMOSTRA):
+    """
+    Hash barato do conteúdo de um DataFrame, CuboVendas ou CatalogoProdutos:
+    formato, colunas, tipos e um hash de linhas amostradas (FonteArquivos usa
+    caminhos, tamanhos e mtimes). Edições in-place em linhas fora da amostra
+    não mudam a impressão; nesses casos, use limpar_cache().
+    """
+    h = hashlib.blake2b(digest_size=16)
+    if isinstance(dados, pd.DataFrame):
+        _atualizar_com_frame(h, dados, linhas_amostra)
+    elif hasattr(dados, 'assinatura'):
+        # motor_consultas.FonteArquivos: caminhos, tamanhos e mtimes dos arquivos
+        h.update(dados.assinatura().encode())
+    elif hasattr(dados, 'produtos'):
+        # CatalogoProdutos: o catálogo normalizado
+        _atualizar_com_frame(h, dados.produtos, linhas_amostra)
+    else:
+        # CuboVendas: fatos + clientes distintos (ou os sketches HyperLogLog)
+        _atualizar_com_frame(h, dados.fatos, linhas_amostra)
+        if dados.clientes is not None:
+            _atualizar_com_frame(h, dados.clientes, linhas_amostra)
+        if dados.sketches is not None:
+            _atualizar_com_frame(h, dados.sketches.chaves, linhas_amostra)
+            h.update(dados.sketches.registros.tobytes())
+    return h.hexdigest()
+
+
+#Cache LRU com Orçamento de Memória
+
+class CacheAgregacoes:
+    """
+    Resultados de agregações (DataFrames pequenos) indexados por chave, com
+    descarte LRU quando o total passa de 'limite_mb'. Com 'pasta_spill', os
+    resultados descartados vão para Parquet e são relidos em vez de recalculados.
+    """
+
+    def __init__(self, limite_mb=LIMITE_PADRAO_MB, pasta_spill=None):
+        self.limite_bytes = int(limite_mb * 1024 ** 2)
+        self.pasta_spill = pasta_spill
+        self._itens = OrderedDict()
+        self.bytes_usados = 0
+        self.acertos = 0
+        self.falhas = 0
+
+    def _caminho_spill(self, chave):
+        return os.path.join(self.pasta_spill, f'{chave}.parquet')
+
+    def obter(self, chave):
+        if chave in self._itens:
+            self._itens.move_to_end(chave)
+            self.acertos += 1
+            return self._itens[chave][0]
+
+        if self.pasta_spill and os.path.exists(self._caminho_spill(chave)):
+            self.acertos += 1
+            resultado = pd.read_parquet(self._caminho_spill(chave))
+            self.guardar(chave, resultado)
+            return resultado
+
+        self.falhas += 1
+        return None
+
+    def guardar(self, chave, resultado):
+        tamanho = int(resultado.memory_usage(index=True, deep=True).sum())
+        if chave in self._itens:
+            self.bytes_usados -= self._itens.pop(chave)[1]
+        self._itens[chave] = (resultado, tamanho)
+        self.bytes_usados += tamanho
+
+        # Descarta os menos usados recentemente (nunca o recém-guardado)
+        while self.bytes_usados > self.limite_bytes and len(self._itens) > 1:
+            chave_antiga, (antigo, tamanho_antigo) = self._itens.popitem(last=False)
+            self.bytes_usados -= tamanho_antigo
+            if self.pasta_spill:
+                os.makedirs(self.pasta_spill, exist_ok=True)
+                antigo.to_parquet(self._caminho_spill(chave_antiga))
+
+    def limpar(self):
+        self._itens.clear()
+        self.bytes_usados = 0
+        if self.pasta_spill and os.path.isdir(self.pasta_spill):
+            for arquivo in os.listdir(self.pasta_spill):
+                if arquivo.endswith('.parquet'):
+                    os.remove(os.path.join(self.pasta_spill, arquivo))
+
+
+# Cache compartilhado pelas funções decoradas com @memorizar
+CACHE_PADRAO = CacheAgregacoes()
+
+def configurar_cache(limite_mb=LIMITE_PADRAO_MB, pasta_spill=None):
+    """Troca o cache compartilhado (ex.: orçamento maior ou spill em disco)."""
+    global CACHE_PADRAO
+    CACHE_PADRAO = CacheAgregacoes(limite_mb, pasta_spill)
+    return CACHE_PADRAO
+
+def limpar_cache():
+    CACHE_PADRAO.limpar()
+
+
+#Decorador
+
+def _normalizar(valor):
+    # Arrays e Series entram na chave pelos valores (o repr do numpy abrevia)
+    return valor.tolist() if hasattr(valor, 'tolist') else valor
+
+def memorizar(funcao):
+    """
+    Guarda o resultado de uma agregação f(df, ...) no cache compartilhado. A
+    chave combina a função, a impressão digital de 'df' e os demais
+    argumentos (com os valores padrão preenchidos), então chamadas repetidas
+    ou re-parametrizadas sobre os mesmos dados não recalculam nada.
+    """
+    assinatura = inspect.signature(funcao)
+
+    @functools.wraps(funcao)
+    def memorizada(dados, *args, **kwargs):
+        argumentos = assinatura.bind(dados, *args, **kwargs)
+        argumentos.apply_defaults()
+        parametros = [(nome, _normalizar(v)) for nome, v in list(argumentos.arguments.items())[1:]]
+
+        h = hashlib.blake2b(digest_size=16)
+        h.update(f'{funcao.__module__}.{funcao.__qualname__}'.encode())
+        h.update(impressao_digital(dados).encode())
+        h.update(repr(parametros).encode())
+        chave = h.hexdigest()
+
+        resultado = CACHE_PADRAO.obter(chave)
+        if resultado is None:
+            resultado = funcao(dados, *args, **kwargs)
+            CACHE_PADRAO.guardar(chave, resultado)
+        # Cópia rasa (Copy-on-Write): colunas novas no chamador não alteram o cache
+        return resultado.copy(deep=False)
+
+    return memorizada
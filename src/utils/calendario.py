@@ -0,0 +1,129 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from periodos import CODIGO_NULO, codigos_periodo
+
+#Configurações Globais do Módulo
+
+# Nomes dos dias (os mesmos de dt.day_name()), na ordem do código 0..6
+DIAS_SEMANA = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+# Feriados nacionais de data fixa (mês, dia)
+FERIADOS_FIXOS = {
+    (1, 1): 'Confraternização Universal',
+    (4, 21): 'Tiradentes',
+    (5, 1): 'Dia do Trabalho',
+    (9, 7): 'Independência',
+    (10, 12): 'Nossa Senhora Aparecida',
+    (11, 2): 'Finados',
+    (11, 15): 'Proclamação da República',
+    (11, 20): 'Consciência Negra',
+    (12, 25): 'Natal',
+}
+
+# Datas comemorativas do varejo de data fixa (mês, dia)
+DATAS_VAREJO_FIXAS = {
+    (6, 12): 'Dia dos Namorados',
+    (12, 24): 'Véspera de Natal',
+    (12, 31): 'Véspera de Ano Novo',
+}
+
+# Nome usado nos dias sem feriado nem data comemorativa
+DIA_COMUM = 'Dia comum'
+
+
+#Datas Móveis
+
+def _pascoa(ano):
+    # Algoritmo de Meeus/Jones/Butcher (calendário gregoriano)
+    a, b, c = ano % 19, ano // 100, ano % 100
+    d, e = b // 4, b % 4
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    mes = (h + l - 7 * m + 114) // 31
+    dia = (h + l - 7 * m + 114) % 31 + 1
+    return datetime.date(ano, mes, dia)
+
+def _n_esimo_dia_semana(ano, mes, dia_semana, n):
+    # n-ésima ocorrência do dia da semana (0 = segunda) no mês
+    primeiro = datetime.date(ano, mes, 1)
+    return primeiro + datetime.timedelta(days=(dia_semana - primeiro.weekday()) % 7 + 7 * (n - 1))
+
+def datas_especiais(ano):
+    """
+    Feriados nacionais e datas comemorativas do varejo do 'ano':
+    {data: (nome, é feriado nacional)}.
+    """
+    pascoa = _pascoa(ano)
+    dias = datetime.timedelta
+    datas = {datetime.date(ano, m, d): (nome, True) for (m, d), nome in FERIADOS_FIXOS.items()}
+    datas.update({datetime.date(ano, m, d): (nome, False) for (m, d), nome in DATAS_VAREJO_FIXAS.items()})
+    moveis = {
+        pascoa - dias(48): ('Carnaval (segunda)', False),
+        pascoa - dias(47): ('Carnaval', False),
+        pascoa - dias(2): ('Sexta-feira Santa', True),
+        pascoa: ('Páscoa', False),
+        pascoa + dias(60): ('Corpus Christi', False),
+        _n_esimo_dia_semana(ano, 5, 6, 2): ('Dia das Mães', False),
+        _n_esimo_dia_semana(ano, 8, 6, 2): ('Dia dos Pais', False),
+        _n_esimo_dia_semana(ano, 11, 3, 4) + dias(1): ('Black Friday', False),
+    }
+    # Quando duas datas coincidem (ex.: Páscoa em 21/04), o feriado prevalece
+    for data, (nome, feriado) in moveis.items():
+        if data not in datas or feriado or not datas[data][1]:
+            datas[data] = (nome, feriado)
+    return datas
+
+
+#Dimensão Calendário
+
+def construir_calendario(codigos_dia):
+    """
+    Tabela calendário de cada código de dia (dias desde 1970-01-01, como em
+    periodos.codigos_periodo(..., 'dia')): COD_DIA, DATA, ANO, MES_NUM,
+    DIA_SEMANA_NUM (0 = segunda), DIA_SEMANA, ANO_ISO, SEMANA_ISO,
+    FIM_DE_SEMANA, FERIADO, DATA_VAREJO e NOME_DATA. Uma linha por código
+    distinto, em ordem; o código nulo fica de fora.
+    """
+    codigos = np.unique(np.asarray(codigos_dia, dtype=np.int64))
+    codigos = codigos[codigos != CODIGO_NULO]
+    datas = pd.DatetimeIndex(codigos.astype('datetime64[D]'))
+
+    # Dia da semana pela aritmética do código (1970-01-01 foi uma quinta)
+    dia_semana = ((codigos + 3) % 7).astype(np.int8)
+    iso = datas.isocalendar()
+
+    especiais = {}
+    for ano in np.unique(datas.year):
+        especiais.update(datas_especiais(int(ano)))
+    nomes = [especiais.get(d.date(), (DIA_COMUM, False)) for d in datas]
+
+    return pd.DataFrame({
+        'COD_DIA': codigos,
+        'DATA': datas,
+        'ANO': datas.year.astype(np.int16),
+        'MES_NUM': datas.month.astype(np.int8),
+        'DIA_SEMANA_NUM': dia_semana,
+        'DIA_SEMANA': pd.Categorical.from_codes(dia_semana, DIAS_SEMANA, ordered=True),
+        'ANO_ISO': iso['year'].to_numpy(dtype=np.int16),
+        'SEMANA_ISO': iso['week'].to_numpy(dtype=np.int8),
+        'FIM_DE_SEMANA': dia_semana >= 5,
+        'FERIADO': np.array([feriado for _, feriado in nomes], dtype=bool),
+        'DATA_VAREJO': np.array([nome != DIA_COMUM and not feriado for nome, feriado in nomes], dtype=bool),
+        'NOME_DATA': pd.Categorical([nome for nome, _ in nomes]),
+    })
+
+def calendario_vendas(datas):
+    """
+    Códigos de dia de cada linha (int64) e o calendário dos dias distintos.
+    As análises por dia da semana ou feriado agregam primeiro por COD_DIA e
+    só depois juntam o calendário (centenas de datas, não milhões de linhas).
+    """
+    codigos = codigos_periodo(datas, 'dia')
+    return codigos, construir_calendario(codigos)
@@ -0,0 +1,182 @@
+import hashlib
+import json
+import os
+import shutil
+
+import pandas as pd
+
+from catalogo_produtos import normalizar_produtos
+from compactacao import compactar_vendas
+
+#Configurações Globais do Módulo
+
+# Caminhos padrão (relativos à pasta notebooks/, como no restante do projeto)
+PATH_DADOS = os.path.join(os.pardir, 'data', 'raw')
+PATH_CACHE = os.path.join(os.pardir, 'data', 'cache')
+
+# Tipos explícitos de cada coluna (evita inferência e colunas 'object')
+DTYPES_VENDAS = {
+    'SKU': 'int64',
+    'COD_FILIAL': 'category',
+    'FILIAL': 'category',
+    'QTD_VENDA': 'float32',
+    'FATUR_VENDA': 'float32',
+}
+DTYPES_PRODUTOS = {
+    'SKU': 'str',
+    'NOME_PRODUTO': 'str',
+    'CATEGORIA': 'category',
+    'SUBCATEGORIA': 'category',
+}
+
+# Versão do tratamento do catálogo (2: categorias sem espaços)
+VERSAO_TRATAMENTO_PRODUTOS = 2
+
+# Frames já carregados nesta sessão (compartilhados entre os módulos de plots)
+_FRAMES_CARREGADOS = {}
+
+
+#Funções Auxiliares do Cache
+
+def _hash_arquivo(caminho, tamanho_bloco=1 << 20):
+    h = hashlib.blake2b(digest_size=16)
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(tamanho_bloco), b''):
+            h.update(bloco)
+    return h.hexdigest()
+
+def _chave_cache(caminho, pasta_cache):
+    """
+    Retorna a chave (hash do conteúdo) do arquivo fonte. O hash só é
+    recalculado quando o mtime ou o tamanho mudam em relação ao manifesto.
+    """
+    stat = os.stat(caminho)
+    manifesto_path = os.path.join(pasta_cache, 'manifesto.json')
+
+    manifesto = {}
+    if os.path.exists(manifesto_path):
+        with open(manifesto_path) as f:
+            manifesto = json.load(f)
+
+    if manifesto.get('mtime') == stat.st_mtime and manifesto.get('tamanho') == stat.st_size:
+        return manifesto['hash']
+
+    chave = _hash_arquivo(caminho)
+    os.makedirs(pasta_cache, exist_ok=True)
+    with open(manifesto_path, 'w') as f:
+        json.dump({'mtime': stat.st_mtime, 'tamanho': stat.st_size, 'hash': chave}, f)
+    return chave
+
+def _concatenar_particoes(partes):
+    # Restaura a ordem original das linhas (o índice é o do CSV)
+    df = pd.concat(partes).sort_index()
+    # Partições com categorias diferentes voltam como 'object' no concat
+    for col, dtype in DTYPES_VENDAS.items():
+        if dtype == 'category' and df[col].dtype != 'category':
+            df[col] = df[col].astype('category')
+    return df
+
+def _particao_vazia(arquivo):
+    # Mesmas colunas e tipos da partição, sem linhas (lê só o esquema)
+    import pyarrow.parquet as pq
+    return pq.read_schema(arquivo).empty_table().to_pandas()
+
+def _gravar_particoes(vendas, pasta_particoes):
+    # Partições por ano (0 = data ausente) gravadas em uma pasta temporária,
+    # renomeada só no fim: uma escrita interrompida nunca deixa uma pasta
+    # incompleta que seria lida depois como cache válido
+    temporaria = f'{pasta_particoes}.tmp-{os.getpid()}'
+    shutil.rmtree(temporaria, ignore_errors=True)
+    os.makedirs(temporaria)
+    ano_particao = vendas['DATA_ATEND'].dt.year.fillna(0).astype(int)
+    for ano, parte in vendas.groupby(ano_particao):
+        parte.to_parquet(os.path.join(temporaria, f'{ano}.parquet'))
+
+    if os.path.isdir(pasta_particoes) and not os.listdir(pasta_particoes):
+        os.rmdir(pasta_particoes)
+    try:
+        os.replace(temporaria, pasta_particoes)
+    except OSError:
+        # Outro processo gravou as mesmas partições antes: fica a dele
+        shutil.rmtree(temporaria, ignore_errors=True)
+
+
+#Funções de Carregamento
+
+def carregar_produtos(caminho=None, usar_cache=True):
+    """
+    Lê o produto.csv com tipos explícitos e aplica o tratamento do 01_eda
+    (categorias nulas, produtos sem nome, SKU inteiro e nomes e categorias
+    sem espaços), via catalogo_produtos.normalizar_produtos.
+    """
+    caminho = caminho or os.path.join(PATH_DADOS, 'produto.csv')
+    pasta_cache = os.path.join(PATH_CACHE, 'produto')
+
+    chave = _chave_cache(caminho, pasta_cache) if usar_cache else None
+    if chave is not None and chave in _FRAMES_CARREGADOS:
+        return _FRAMES_CARREGADOS[chave]
+
+    # A versão do tratamento entra no nome: mudanças nele invalidam o cache
+    arquivo_cache = os.path.join(pasta_cache, f'{chave}-v{VERSAO_TRATAMENTO_PRODUTOS}.parquet')
+    if chave is not None and os.path.exists(arquivo_cache):
+        produtos = pd.read_parquet(arquivo_cache)
+    else:
+        # 1. Leitura com tipos explícitos
+        produtos = pd.read_csv(caminho, dtype=DTYPES_PRODUTOS)
+
+        # 2. Nulos, SKU inteiro ("000003   " -> 3) e nomes/categorias sem espaços
+        produtos = normalizar_produtos(produtos)
+
+        if chave is not None:
+            produtos.to_parquet(arquivo_cache + '.tmp')
+            os.replace(arquivo_cache + '.tmp', arquivo_cache)
+
+    if chave is not None:
+        _FRAMES_CARREGADOS[chave] = produtos
+    return produtos
+
+def carregar_vendas(caminho=None, usar_cache=True, anos=None, compactar=False):
+    """
+    Lê o vendas.csv com tipos explícitos. O cache em Parquet é particionado
+    por ano de DATA_ATEND; 'anos' permite carregar apenas algumas partições
+    (anos sem vendas resultam em um DataFrame vazio, com as mesmas colunas).
+    Com compactar=True, retorna a versão compacta (compactacao.compactar_vendas).
+    """
+    caminho = caminho or os.path.join(PATH_DADOS, 'vendas.csv')
+    pasta_cache = os.path.join(PATH_CACHE, 'vendas')
+
+    chave = _chave_cache(caminho, pasta_cache) if usar_cache else None
+    chave_sessao = (chave, tuple(sorted(anos)) if anos else None, compactar)
+    if chave is not None and chave_sessao in _FRAMES_CARREGADOS:
+        return _FRAMES_CARREGADOS[chave_sessao]
+
+    pasta_particoes = os.path.join(pasta_cache, chave or '')
+    if chave is not None and os.path.isdir(pasta_particoes) and os.listdir(pasta_particoes):
+        # 1. Leitura das partições (apenas os anos pedidos)
+        todos = sorted(os.listdir(pasta_particoes))
+        arquivos = [a for a in todos if int(a.split('.')[0]) in anos] if anos else todos
+        if arquivos:
+            vendas = _concatenar_particoes([pd.read_parquet(os.path.join(pasta_particoes, a)) for a in arquivos])
+        else:
+            vendas = _particao_vazia(os.path.join(pasta_particoes, todos[0]))
+    else:
+        # 1. Leitura do CSV com tipos explícitos
+        vendas = pd.read_csv(
+            caminho,
+            index_col=0,
+            dtype=DTYPES_VENDAS,
+            parse_dates=['DATA_ATEND']
+        )
+
+        # 2. Escrita do cache particionado por ano
+        if chave is not None:
+            _gravar_particoes(vendas, pasta_particoes)
+
+    if anos:
+        vendas = vendas.loc[vendas['DATA_ATEND'].dt.year.isin(anos)]
+    if compactar:
+        vendas = compactar_vendas(vendas)
+
+    if chave is not None:
+        _FRAMES_CARREGADOS[chave_sessao] = vendas
+    return vendas
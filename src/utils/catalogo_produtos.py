@@ -0,0 +1,156 @@
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from cache_agregacoes import impressao_digital
+
+#Configurações Globais do Módulo
+
+# Colunas categóricas do catálogo e o valor usado para os nulos
+COLUNAS_CATEGORICAS = {'CATEGORIA': 'Sem categoria', 'SUBCATEGORIA': 'Sem subcategoria'}
+
+# Catálogos já indexados nesta sessão (chave: id do DataFrame de produtos;
+# valor: impressão digital do DataFrame e catálogo)
+_CATALOGOS = {}
+
+
+#Normalização
+
+def _categorias_sem_espacos(serie):
+    # O strip é feito nas categorias distintas (não nas linhas); categorias
+    # que ficam iguais após o strip ('Natal ' e 'Natal') são unidas
+    serie = serie if isinstance(serie.dtype, pd.CategoricalDtype) else serie.astype('category')
+    limpas = serie.cat.categories.astype(str).str.strip()
+    novas = pd.Index(limpas.unique())
+    mapa = np.append(novas.get_indexer(limpas), -1)
+    return pd.Series(pd.Categorical.from_codes(mapa[serie.cat.codes.to_numpy()], novas),
+                     index=serie.index, name=serie.name)
+
+def normalizar_produtos(df_produtos):
+    """
+    Aplica o tratamento do 01_eda uma única vez: categorias nulas viram
+    'Sem categoria'/'Sem subcategoria', produtos sem nome são removidos, o SKU
+    ("000003   ") vira inteiro e índice, e nomes e categorias perdem os
+    espaços. Aceita o produto.csv lido do disco ou um catálogo já indexado.
+    """
+    produtos = df_produtos.copy()
+
+    # 1. Tratamento de nulos (mesmo critério do notebook)
+    for col, padrao in COLUNAS_CATEGORICAS.items():
+        if col in produtos.columns:
+            serie = _categorias_sem_espacos(produtos[col])
+            if padrao not in serie.cat.categories:
+                serie = serie.cat.add_categories([padrao])
+            produtos[col] = serie.fillna(padrao)
+    produtos = produtos.dropna()
+
+    # 2. SKU inteiro como índice
+    if 'SKU' in produtos.columns:
+        produtos = produtos.set_index('SKU')
+    if not pd.api.types.is_integer_dtype(produtos.index):
+        produtos.index = pd.to_numeric(produtos.index.astype(str).str.strip())
+    produtos.index = produtos.index.astype('int64').rename('SKU')
+
+    # 3. Nomes sem espaços
+    if 'NOME_PRODUTO' in produtos.columns:
+        produtos['NOME_PRODUTO'] = produtos['NOME_PRODUTO'].str.strip()
+    return produtos
+
+
+#Catálogo Indexado
+
+class CatalogoProdutos:
+    """
+    Catálogo normalizado com índices de consulta: SKU -> linha e
+    categoria/subcategoria -> conjunto de SKUs. Filtros por categoria sobre
+    milhões de vendas viram buscas em uma tabela de inteiros (pelo SKU),
+    sem operações de texto nas linhas de venda.
+    """
+
+    def __init__(self, produtos):
+        self.produtos = produtos
+        self.skus = produtos.index.to_numpy(dtype=np.int64)
+        self._skus_por_coluna = {}
+
+        # Tabela densa SKU -> linha (-1 para SKUs fora do catálogo)
+        self._tabela = np.full(self.skus.max() + 1 if len(self.skus) else 0, -1, dtype=np.intp)
+        self._tabela[self.skus] = np.arange(len(self.skus), dtype=np.intp)
+
+    @classmethod
+    def de_dataframe(cls, df_produtos):
+        return cls(normalizar_produtos(df_produtos))
+
+    def posicoes(self, skus):
+        """Linha do catálogo de cada SKU (-1 quando o SKU não existe)."""
+        skus = np.asarray(skus, dtype=np.int64)
+        dentro = (skus >= 0) & (skus < len(self._tabela))
+        return np.where(dentro, self._tabela[np.where(dentro, skus, 0)], -1)
+
+    def skus_por(self, coluna):
+        """Dicionário {valor de 'coluna' (ex.: CATEGORIA): array de SKUs}, construído uma vez."""
+        if coluna not in self._skus_por_coluna:
+            codigos = self.produtos[coluna].cat.codes.to_numpy()
+            ordem = np.argsort(codigos, kind='stable')
+            limites = np.searchsorted(codigos[ordem], np.arange(len(self.produtos[coluna].cat.categories) + 1))
+            self._skus_por_coluna[coluna] = {
+                categoria: self.skus[ordem[limites[i]:limites[i + 1]]]
+                for i, categoria in enumerate(self.produtos[coluna].cat.categories)
+            }
+        return self._skus_por_coluna[coluna]
+
+    def skus_da_categoria(self, categorias):
+        return self._unir(self.skus_por('CATEGORIA'), categorias)
+
+    def skus_da_subcategoria(self, subcategorias):
+        return self._unir(self.skus_por('SUBCATEGORIA'), subcategorias)
+
+    def _unir(self, skus_por_valor, valores):
+        partes = [skus_por_valor[v] for v in valores if v in skus_por_valor]
+        return np.concatenate(partes) if partes else np.empty(0, dtype=np.int64)
+
+    def mascara_vendas(self, skus_vendas, categorias=None, subcategorias=None):
+        """
+        Máscara booleana das vendas cujo SKU pertence às 'categorias' e às
+        'subcategorias' pedidas (None = sem filtro naquela coluna).
+        """
+        aceitos = np.ones(len(self._tabela), dtype=bool)
+        for skus in (
+            None if categorias is None else self.skus_da_categoria(categorias),
+            None if subcategorias is None else self.skus_da_subcategoria(subcategorias),
+        ):
+            if skus is not None:
+                filtro = np.zeros(len(self._tabela), dtype=bool)
+                filtro[skus] = True
+                aceitos &= filtro
+        aceitos[self._tabela < 0] = False
+
+        skus_vendas = np.asarray(skus_vendas, dtype=np.int64)
+        dentro = (skus_vendas >= 0) & (skus_vendas < len(aceitos))
+        return dentro & aceitos[np.where(dentro, skus_vendas, 0)]
+
+    def filtrar_vendas(self, df_vendas, categorias=None, subcategorias=None, coluna='SKU'):
+        """Vendas (sem precisar do merge com o catálogo) das categorias/subcategorias pedidas."""
+        return df_vendas.loc[self.mascara_vendas(df_vendas[coluna].to_numpy(), categorias, subcategorias)]
+
+
+def obter_catalogo(df_produtos):
+    """
+    Retorna o catálogo indexado do DataFrame de produtos, normalizando-o
+    apenas na primeira chamada (as seguintes reutilizam os índices). Se o
+    DataFrame foi alterado (impressão digital de cache_agregacoes), o
+    catálogo é refeito.
+    """
+    if isinstance(df_produtos, CatalogoProdutos):
+        return df_produtos
+
+    impressao = impressao_digital(df_produtos)
+    cache = _CATALOGOS.get(id(df_produtos))
+    if cache is not None and cache[0] == impressao:
+        return cache[1]
+
+    catalogo = CatalogoProdutos.de_dataframe(df_produtos)
+    if cache is None:
+        weakref.finalize(df_produtos, _CATALOGOS.pop, id(df_produtos), None)
+    _CATALOGOS[id(df_produtos)] = (impressao, catalogo)
+    return catalogo
@@ -0,0 +1,133 @@
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from cache_agregacoes import impressao_digital
+from cubo_vendas import CuboVendas
+from periodos import CODIGO_NULO, codigos_periodo
+
+#Configurações Globais do Módulo
+
+# Colunas que identificam um atendimento (cesta): cliente, loja e dia
+CHAVES_CESTA = ['CLI_CPF', 'COD_FILIAL', 'DATA_ATEND']
+
+# Índices de cestas já construídos nesta sessão (chave: id do DataFrame de
+# vendas; valor: impressão digital das colunas das cestas e índice)
+_CESTAS = {}
+
+
+#Índice de Cestas
+
+class CestasVendas:
+    """
+    Agrupamento das linhas de venda em cestas (atendimentos): cada cesta
+    reúne as vendas do mesmo CLI_CPF, na mesma filial e no mesmo dia.
+
+    'ids' é o ID inteiro da cesta de cada linha (-1 para vendas sem CPF,
+    filial ou data); 'ordem' lista as linhas agrupadas por cesta e
+    'offsets' marca onde cada cesta começa em 'ordem' (a cesta i ocupa
+    ordem[offsets[i]:offsets[i + 1]]). Somas por cesta são uma única
+    redução vetorizada (np.add.reduceat) sobre esse índice.
+    """
+
+    def __init__(self, ids, ordem, offsets):
+        self.ids = ids
+        self.ordem = ordem
+        self.offsets = offsets
+
+    @property
+    def n_cestas(self):
+        return len(self.offsets) - 1
+
+    def linhas_da_cesta(self, id_cesta):
+        """Posições (iloc) das linhas de venda da cesta."""
+        return self.ordem[self.offsets[id_cesta]:self.offsets[id_cesta + 1]]
+
+    def linhas_por_cesta(self):
+        return np.diff(self.offsets)
+
+    def somar(self, valores):
+        """Soma de 'valores' (um por linha de venda) em cada cesta."""
+        valores = np.asarray(valores, dtype=np.float64)
+        if self.n_cestas == 0:
+            return np.zeros(0, dtype=np.float64)
+        return np.add.reduceat(valores[self.ordem], self.offsets[:-1])
+
+    def resumo(self, df_vendas):
+        """
+        Uma linha por cesta: ID_CESTA, CLI_CPF, COD_FILIAL, FILIAL,
+        DATA_ATEND (da primeira linha da cesta), N_LINHAS, ITENS (soma de
+        QTD_VENDA) e VALOR (soma de FATUR_VENDA).
+        """
+        primeiras = self.ordem[self.offsets[:-1]]
+        colunas = [c for c in CHAVES_CESTA + ['FILIAL'] if c in df_vendas.columns]
+        df_cestas = df_vendas[colunas].iloc[primeiras].reset_index(drop=True)
+        df_cestas.insert(0, 'ID_CESTA', np.arange(self.n_cestas, dtype=np.int32))
+        df_cestas['N_LINHAS'] = self.linhas_por_cesta()
+        df_cestas['ITENS'] = self.somar(df_vendas['QTD_VENDA'].fillna(0))
+        df_cestas['VALOR'] = self.somar(df_vendas['FATUR_VENDA'].fillna(0))
+        return df_cestas
+
+
+def _codigos(serie):
+    # Códigos inteiros densos (-1 para nulos), sem comparar textos
+    return pd.factorize(serie)[0].astype(np.int64)
+
+def reconstruir_cestas(df_vendas, coluna_filial='COD_FILIAL'):
+    """
+    Agrupa as vendas em cestas por (CLI_CPF, filial, dia de DATA_ATEND) em
+    uma passada de ordenação: as três chaves viram um único inteiro, a
+    ordenação estável põe as linhas de cada cesta lado a lado e as trocas
+    de chave definem os IDs (0..n_cestas-1, em ordem de cliente, filial e dia).
+    """
+    cpf = _codigos(df_vendas['CLI_CPF'])
+    filial = _codigos(df_vendas[coluna_filial])
+    dia = codigos_periodo(df_vendas['DATA_ATEND'], 'dia')
+
+    linhas = np.flatnonzero((cpf >= 0) & (filial >= 0) & (dia != CODIGO_NULO))
+    ids = np.full(len(df_vendas), -1, dtype=np.int32)
+    if len(linhas) == 0:
+        return CestasVendas(ids, linhas, np.zeros(1, dtype=np.int64))
+
+    cpf, filial, dia = cpf[linhas], filial[linhas], dia[linhas]
+    dia = dia - dia.min()
+    n_filiais, n_dias = int(filial.max()) + 1, int(dia.max()) + 1
+
+    # 1. Chave única (cliente, filial, dia) e ordenação estável
+    if (int(cpf.max()) + 1) * n_filiais * n_dias < 2 ** 62:
+        chave = (cpf * n_filiais + filial) * n_dias + dia
+        ordem_local = np.argsort(chave, kind='stable')
+        chave = chave[ordem_local]
+        inicio = np.r_[True, chave[1:] != chave[:-1]]
+    else:
+        ordem_local = np.lexsort((dia, filial, cpf))
+        chaves = np.column_stack([cpf, filial, dia])[ordem_local]
+        inicio = np.r_[True, (chaves[1:] != chaves[:-1]).any(axis=1)]
+
+    # 2. IDs pelas trocas de chave e offsets de cada cesta
+    ordem = linhas[ordem_local]
+    ids[ordem] = np.cumsum(inicio) - 1
+    offsets = np.r_[np.flatnonzero(inicio), len(ordem)].astype(np.int64)
+    return CestasVendas(ids, ordem, offsets)
+
+def obter_cestas(df_vendas):
+    """
+    Retorna o índice de cestas do DataFrame, construindo-o apenas na
+    primeira chamada (as métricas por atendimento compartilham o índice).
+    Se CLI_CPF, COD_FILIAL ou DATA_ATEND mudaram (impressão digital de
+    cache_agregacoes), o índice é reconstruído.
+    """
+    if isinstance(df_vendas, CuboVendas):
+        raise ValueError('As cestas exigem as linhas de venda (CLI_CPF, COD_FILIAL, DATA_ATEND), não o cubo.')
+
+    impressao = impressao_digital(df_vendas[CHAVES_CESTA])
+    cache = _CESTAS.get(id(df_vendas))
+    if cache is not None and cache[0] == impressao:
+        return cache[1]
+
+    cestas = reconstruir_cestas(df_vendas)
+    if cache is None:
+        weakref.finalize(df_vendas, _CESTAS.pop, id(df_vendas), None)
+    _CESTAS[id(df_vendas)] = (impressao, cestas)
+    return cestas
@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+
+#Configurações Globais do Módulo
+
+# Colunas de texto com poucos valores distintos viram categóricas
+# (SKU e CLI_CPF têm tratamento próprio)
+COLUNAS_CATEGORICAS = ['COD_FILIAL', 'FILIAL', 'CATEGORIA', 'SUBCATEGORIA', 'NOME_PRODUTO']
+
+# Medidas guardadas em float32 (valores em reais e quantidades)
+COLUNAS_FLOAT32 = ['QTD_VENDA', 'FATUR_VENDA']
+
+# Outras colunas de texto viram categóricas quando os distintos são no
+# máximo esta fração das linhas
+FRACAO_MAXIMA_DISTINTOS = 0.5
+
+
+#Compactação
+
+def _sku_inteiro(serie):
+    # SKU em texto ("000003   ") ou inteiro -> menor inteiro que comporta os valores
+    if not pd.api.types.is_numeric_dtype(serie.dtype):
+        serie = pd.to_numeric(serie.astype(str).str.strip(), errors='coerce')
+    if serie.isna().any():
+        return serie.astype('float32') if serie.max() < 2 ** 24 else serie
+    return pd.to_numeric(serie, downcast='integer')
+
+def _cpf_codificado(serie):
+    # Códigos inteiros (int32) + dicionário dos CPFs distintos (as categorias,
+    # no tipo original da coluna: no vendas.csv são hashes hexadecimais em
+    # texto). CPF ausente fica com código -1 e continua nulo (dropna e
+    # nunique se comportam como na coluna original)
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie
+    codigos, dicionario = pd.factorize(serie, sort=True)
+    dicionario = pd.Index(dicionario, name=serie.name)
+    return pd.Series(pd.Categorical.from_codes(codigos.astype(np.int32), dicionario),
+                     index=serie.index, name=serie.name)
+
+def compactar_vendas(df_vendas, mostrar_relatorio=False):
+    """
+    Versão compacta das vendas (com ou sem as colunas do catálogo): SKU no
+    menor inteiro possível, filiais e textos repetidos como categóricas,
+    medidas em float32 e CLI_CPF como códigos inteiros com dicionário (uma
+    categórica cujas categorias são os CPFs distintos). As colunas mantêm
+    nome e significado, então as funções de métricas e de plots recebem o
+    frame compacto no lugar do original. Não altera 'df_vendas'.
+    """
+    compacto = df_vendas.copy(deep=False)
+
+    for col in compacto.columns:
+        serie = compacto[col]
+        if col == 'SKU':
+            compacto[col] = _sku_inteiro(serie)
+        elif col == 'CLI_CPF':
+            compacto[col] = _cpf_codificado(serie)
+        elif col in COLUNAS_FLOAT32 and pd.api.types.is_float_dtype(serie.dtype):
+            compacto[col] = serie.astype('float32')
+        elif isinstance(serie.dtype, pd.CategoricalDtype) or pd.api.types.is_datetime64_any_dtype(serie.dtype):
+            continue
+        elif pd.api.types.is_integer_dtype(serie.dtype):
+            compacto[col] = pd.to_numeric(serie, downcast='integer')
+        elif col in COLUNAS_CATEGORICAS or serie.nunique() <= FRACAO_MAXIMA_DISTINTOS * len(serie):
+            compacto[col] = serie.astype('category')
+
+    if mostrar_relatorio:
+        print(relatorio_memoria(df_vendas, compacto).to_string())
+    return compacto
+
+def dicionario_cpf(df_vendas):
+    """Códigos inteiros (int32, -1 = sem CPF) e dicionário código -> CPF de um frame compacto."""
+    serie = df_vendas['CLI_CPF']
+    return serie.cat.codes.to_numpy(), serie.cat.categories
+
+
+#Relatório de Memória
+
+def relatorio_memoria(df_antes, df_depois):
+    """
+    Memória (MB) e tipo de cada coluna antes e depois da compactação, com a
+    redução percentual e uma linha TOTAL (inclui o índice).
+    """
+    antes = df_antes.memory_usage(index=True, deep=True) / 1024 ** 2
+    depois = df_depois.memory_usage(index=True, deep=True) / 1024 ** 2
+    relatorio = pd.DataFrame({
+        'TIPO_ANTES': df_antes.dtypes.astype(str),
+        'TIPO_DEPOIS': df_depois.dtypes.astype(str),
+        'MB_ANTES': antes,
+        'MB_DEPOIS': depois,
+    })
+    relatorio.loc['TOTAL', ['MB_ANTES', 'MB_DEPOIS']] = [antes.sum(), depois.sum()]
+    relatorio['REDUCAO_%'] = (1 - relatorio['MB_DEPOIS'] / relatorio['MB_ANTES']) * 100
+    return relatorio.round(2)
@@ -0,0 +1,116 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from cubo_vendas import DIMENSOES_CUBO, CuboVendas, construir_cubo
+from hyperloglog import ERRO_PADRAO, SketchesHLL
+
+#Configurações Globais do Módulo
+
+# Meses de cada faixa de tempo: as vendas são divididas por FILIAL e por
+# faixas de 'MESES_POR_PARTICAO' meses consecutivos
+MESES_POR_PARTICAO = 3
+
+# Abaixo deste número de linhas o cubo é construído no próprio processo
+# (o custo de iniciar os processos supera o ganho)
+LINHAS_MINIMAS_PARALELO = 200_000
+
+# Vendas herdadas pelos processos (fork): as tarefas levam só as posições
+# das linhas de cada partição, sem serializar o DataFrame
+_VENDAS_WORKER = None
+
+
+#Partições
+
+def _faixas_de_tempo(df_vendas, meses_por_particao):
+    # Código de mês contínuo (meses desde 1970) dividido em faixas; sem
+    # DATA_ATEND, o próprio MES_NUM define a faixa
+    if 'DATA_ATEND' in df_vendas.columns:
+        meses = pd.to_datetime(df_vendas['DATA_ATEND']).to_numpy(dtype='datetime64[M]')
+        codigos = np.where(np.isnat(meses), -1, meses.astype(np.int64) // meses_por_particao)
+    elif 'MES_NUM' in df_vendas.columns:
+        codigos = df_vendas['MES_NUM'].fillna(0).to_numpy(dtype=np.int64) // meses_por_particao
+    else:
+        codigos = np.zeros(len(df_vendas), dtype=np.int64)
+    return pd.factorize(codigos)[0]
+
+def particoes_vendas(df_vendas, meses_por_particao=MESES_POR_PARTICAO):
+    """
+    Posições das linhas de cada partição (FILIAL x faixa de meses). As
+    partições não compartilham nenhuma chave do cubo (ano, mês, filial),
+    então os cubos parciais se juntam sem reagrupar as somas.
+    """
+    filiais = pd.factorize(df_vendas['FILIAL'], use_na_sentinel=False)[0]
+    faixas = _faixas_de_tempo(df_vendas, meses_por_particao)
+    chaves = filiais.astype(np.int64) * (faixas.max() + 1 if len(faixas) else 1) + faixas
+
+    ordem = np.argsort(chaves, kind='stable')
+    limites = np.flatnonzero(np.diff(chaves[ordem])) + 1
+    return np.split(ordem, limites) if len(ordem) else []
+
+
+#Construção em Paralelo
+
+def _construir_parte(parte, modo_clientes, erro_clientes):
+    # 'parte' são posições no DataFrame herdado (fork) ou a própria partição
+    if isinstance(parte, np.ndarray):
+        parte = _VENDAS_WORKER.iloc[parte]
+    return construir_cubo(parte, modo_clientes, erro_clientes)
+
+def juntar_cubos(cubos):
+    """
+    Junta cubos de partições disjuntas: concatena as somas e os clientes
+    distintos (ou os sketches HyperLogLog). A ordem das linhas é a mesma de
+    construir_cubo sobre todas as vendas.
+    """
+    fatos = pd.concat([c.fatos for c in cubos], ignore_index=True)
+    dimensoes = [d for d in DIMENSOES_CUBO if d in fatos.columns]
+    fatos = fatos.sort_values(dimensoes, kind='stable', ignore_index=True)
+
+    if cubos[0].clientes is None:
+        sketches = SketchesHLL(
+            pd.concat([c.sketches.chaves for c in cubos], ignore_index=True),
+            np.concatenate([c.sketches.registros for c in cubos]),
+            cubos[0].sketches.precisao,
+        )
+        return CuboVendas(fatos, None, sketches)
+
+    clientes = pd.concat([c.clientes for c in cubos], ignore_index=True)
+    return CuboVendas(fatos, clientes)
+
+def construir_cubo_particionado(df_vendas, modo_clientes='exato', erro_clientes=ERRO_PADRAO,
+                                processos=None, meses_por_particao=MESES_POR_PARTICAO):
+    """
+    Constrói o mesmo cubo de construir_cubo dividindo as vendas por FILIAL e
+    faixa de meses: cada partição gera suas somas e seus clientes distintos
+    (pares exatos ou sketches HyperLogLog) em um pool de processos, e os
+    resultados parciais são juntados no fim. 'processos' = None usa todos os
+    núcleos.
+    """
+    processos = processos or os.cpu_count() or 1
+    particoes = particoes_vendas(df_vendas, meses_por_particao)
+    if processos == 1 or len(particoes) < 2 or len(df_vendas) < LINHAS_MINIMAS_PARALELO:
+        return construir_cubo(df_vendas, modo_clientes, erro_clientes)
+
+    # Com fork, os processos herdam as vendas; nos demais sistemas cada
+    # tarefa leva a sua partição serializada
+    global _VENDAS_WORKER
+    usar_fork = 'fork' in multiprocessing.get_all_start_methods()
+    if usar_fork:
+        _VENDAS_WORKER = df_vendas
+        contexto = multiprocessing.get_context('fork')
+    else:
+        particoes = [df_vendas.iloc[p] for p in particoes]
+        contexto = None
+
+    try:
+        with ProcessPoolExecutor(max_workers=min(processos, len(particoes)), mp_context=contexto) as executor:
+            cubos = list(executor.map(_construir_parte, particoes,
+                                      [modo_clientes] * len(particoes), [erro_clientes] * len(particoes)))
+    finally:
+        _VENDAS_WORKER = None
+
+    return juntar_cubos(cubos)
@@ -0,0 +1,153 @@
+import weakref
+
+import pandas as pd
+
+from cache_agregacoes import impressao_digital
+from hyperloglog import ERRO_PADRAO, SketchesHLL
+
+#Configurações Globais do Módulo
+
+# Dimensões e medidas guardadas no cubo (as ausentes no DataFrame são ignoradas).
+# ANO separa o histórico de vários anos; os gráficos mensais somam por cima dele
+DIMENSOES_CUBO = ['ANO', 'MES_NUM', 'FILIAL', 'CATEGORIA', 'SUBCATEGORIA', 'SKU', 'NOME_PRODUTO']
+MEDIDAS_CUBO = ['FATUR_VENDA', 'QTD_VENDA']
+
+# Dimensões da estrutura de clientes distintos
+DIMENSOES_CLIENTES = ['ANO', 'MES_NUM', 'FILIAL']
+
+# Modos de contagem de clientes distintos: pares exatos ou sketches HyperLogLog
+MODOS_CLIENTES = ('exato', 'aproximado')
+
+# Processos usados por obter_cubo quando a chamada não informa: 1 constrói
+# o cubo no processo atual; mais de 1 (ex.: os.cpu_count()) usa a construção
+# particionada de cubo_particionado.py
+PROCESSOS_CUBO = 1
+
+# Cubos já construídos nesta sessão (chave: id do DataFrame de vendas e modo;
+# valor: impressão digital do DataFrame e cubo)
+_CUBOS = {}
+
+
+class CuboVendas:
+    """
+    Somas de FATUR_VENDA/QTD_VENDA por (mês, filial, categoria, subcategoria,
+    SKU) e os pares distintos (mês, filial, CLI_CPF). Os gráficos consultam o
+    cubo em vez de reagrupar as linhas de venda.
+
+    No modo aproximado, 'clientes' é None e os clientes distintos ficam em
+    'sketches' (HyperLogLog por mês e filial).
+    """
+
+    def __init__(self, fatos, clientes, sketches=None):
+        self.fatos = fatos
+        self.clientes = clientes
+        self.sketches = sketches
+
+    def _filtrar(self, df, filtros):
+        if not filtros:
+            return df
+        mascara = pd.Series(True, index=df.index)
+        for col, valores in filtros.items():
+            mascara &= df[col].isin(valores)
+        return df.loc[mascara]
+
+    def filtros_ano(self, ano=None, filtros=None):
+        """
+        Acrescenta {'ANO': [ano]} aos filtros. Sem 'ano', avisa quando o cubo
+        tem mais de um ano: as agregações por MES_NUM somariam, por exemplo,
+        março/2023 e março/2024 no mesmo mês.
+        """
+        filtros = dict(filtros or {})
+        if ano is not None:
+            filtros['ANO'] = [ano]
+        elif 'ANO' in self.fatos.columns:
+            anos = sorted(int(a) for a in self.fatos['ANO'].dropna().unique())
+            if len(anos) > 1:
+                print(f"Aviso: as vendas cobrem os anos {anos}; os meses de anos diferentes serão somados. "
+                      "Informe 'ano' ou use periodos.agregar_por_periodo.")
+        return filtros or None
+
+    def agregar(self, dimensoes, filtros=None, medidas=MEDIDAS_CUBO):
+        """
+        Soma as medidas pelas 'dimensoes' pedidas. 'filtros' é um dicionário
+        {coluna: valores aceitos}, aplicado antes da agregação.
+        """
+        fatos = self._filtrar(self.fatos, filtros)
+        return fatos.groupby(dimensoes, observed=True)[list(medidas)].sum().reset_index()
+
+    def clientes_unicos(self, dimensoes=('MES_NUM', 'FILIAL'), filtros=None):
+        # Equivalente a groupby(dimensoes)['CLI_CPF'].nunique() nas vendas
+        if self.clientes is None:
+            return self.sketches.agrupar(list(dimensoes), filtros).estimar('CLI_CPF')
+        clientes = self._filtrar(self.clientes, filtros)
+        return clientes.groupby(list(dimensoes), observed=True)['CLI_CPF'].nunique().reset_index()
+
+
+def construir_cubo(df_vendas, modo_clientes='exato', erro_clientes=ERRO_PADRAO):
+    """
+    Constrói o cubo em uma única passada sobre as vendas (com ou sem as
+    colunas do catálogo de produtos). Com modo_clientes='aproximado', os
+    clientes distintos são contados por HyperLogLog com erro 'erro_clientes'.
+    """
+    if modo_clientes not in MODOS_CLIENTES:
+        raise ValueError(f"modo_clientes deve ser um de {MODOS_CLIENTES}, não '{modo_clientes}'.")
+
+    # 1. Ano e mês de atendimento (reaproveita MES_NUM se já existir)
+    tempo = {}
+    if 'DATA_ATEND' in df_vendas.columns:
+        datas = pd.to_datetime(df_vendas['DATA_ATEND'])
+        tempo['ANO'] = datas.dt.year.rename('ANO')
+        tempo['MES_NUM'] = datas.dt.month.rename('MES_NUM')
+    if 'MES_NUM' in df_vendas.columns:
+        tempo['MES_NUM'] = df_vendas['MES_NUM']
+
+    # 2. Somas por todas as dimensões disponíveis
+    chaves = list(tempo.values()) + [df_vendas[d] for d in DIMENSOES_CUBO[2:] if d in df_vendas.columns]
+    fatos = df_vendas.groupby(chaves, observed=True, dropna=False)[MEDIDAS_CUBO].sum().reset_index()
+
+    # 3. Clientes distintos por ano, mês e filial
+    clientes = pd.DataFrame({
+        **tempo,
+        'FILIAL': df_vendas['FILIAL'],
+        'CLI_CPF': df_vendas['CLI_CPF']
+    })
+    if modo_clientes == 'aproximado':
+        dimensoes = [d for d in DIMENSOES_CLIENTES if d in clientes.columns]
+        sketches = SketchesHLL.de_dataframe(clientes, dimensoes, erro=erro_clientes)
+        return CuboVendas(fatos, None, sketches)
+
+    clientes = clientes.dropna(subset=['CLI_CPF']).drop_duplicates()
+    return CuboVendas(fatos, clientes.reset_index(drop=True))
+
+def _descartar_cubos(id_df):
+    for chave in [c for c in _CUBOS if c[0] == id_df]:
+        del _CUBOS[chave]
+
+def obter_cubo(df_vendas, modo_clientes='exato', erro_clientes=ERRO_PADRAO, processos=None):
+    """
+    Retorna o cubo do DataFrame, construindo-o apenas na primeira chamada.
+    Várias funções de plotagem sobre o mesmo DataFrame compartilham o cubo;
+    se o DataFrame foi alterado (a impressão digital de cache_agregacoes
+    mudou, ex.: v['FATUR_VENDA'] *= 2), o cubo é reconstruído.
+    Com 'processos' (padrão: PROCESSOS_CUBO) maior que 1, a construção é
+    particionada por filial e faixa de meses (ver cubo_particionado.py).
+    """
+    if isinstance(df_vendas, CuboVendas):
+        return df_vendas
+
+    chave = (id(df_vendas), modo_clientes, erro_clientes)
+    impressao = impressao_digital(df_vendas)
+    cache = _CUBOS.get(chave)
+    if cache is not None and cache[0] == impressao:
+        return cache[1]
+
+    processos = PROCESSOS_CUBO if processos is None else processos
+    if processos <= 1:
+        cubo = construir_cubo(df_vendas, modo_clientes, erro_clientes)
+    else:
+        from cubo_particionado import construir_cubo_particionado
+        cubo = construir_cubo_particionado(df_vendas, modo_clientes, erro_clientes, processos)
+    if not any(c[0] == chave[0] for c in _CUBOS):
+        weakref.finalize(df_vendas, _descartar_cubos, chave[0])
+    _CUBOS[chave] = (impressao, cubo)
+    return cubo
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+
+#Configurações Globais do Módulo
+
+# Filiais do projeto (COD_FILIAL -> FILIAL)
+FILIAIS = {1: 'RUA', 2: 'SHOPPING'}
+
+# Categorias e subcategorias de exemplo, no formato do produto.csv
+CATEGORIAS = {
+    'Doceria': ['Confeitaria', 'Chocolates em pó'],
+    'Grãos': ['Arroz', 'Feijões', 'Leguminosas'],
+    'Castanhas & Oleaginosas': ['Castanhas de Caju', 'Castanhas do Pará', 'Nozes'],
+    'Bacalhau & Pescados': ['Bacalhau', 'Pescados'],
+    'Natal': ['Panetones', 'Frutas Secas'],
+    'Vinhos & Espumantes': ['Vinhos Tintos', 'Espumantes'],
+    'Farinhas': ['Farinhas diversas', 'Tapiocas'],
+    'Sem categoria': ['Sem subcategoria'],
+}
+
+
+#Geradores
+
+def gerar_produtos(n_skus=6500, semente=0):
+    """Catálogo sintético indexado por SKU (inteiro), como o carregar_produtos."""
+    rng = np.random.default_rng(semente)
+    pares = [(c, s) for c, subs in CATEGORIAS.items() for s in subs]
+    escolha = rng.integers(0, len(pares), n_skus)
+
+    produtos = pd.DataFrame({
+        'SKU': np.arange(3, n_skus + 3),
+        'NOME_PRODUTO': [f'PRODUTO {i:06d}' for i in range(n_skus)],
+        'CATEGORIA': pd.Categorical([pares[i][0] for i in escolha]),
+        'SUBCATEGORIA': pd.Categorical([pares[i][1] for i in escolha]),
+    })
+    return produtos.set_index('SKU')
+
+def gerar_vendas(n_linhas, produtos=None, n_clientes=None, inicio='2024-01-01', dias=366, semente=0):
+    """
+    Vendas sintéticas com o esquema do vendas.csv (SKU, COD_FILIAL, FILIAL,
+    DATA_ATEND, QTD_VENDA, FATUR_VENDA, CLI_CPF) e os tipos do carregar_vendas.
+    Os picos de março, novembro e dezembro seguem o padrão observado no EDA.
+    """
+    rng = np.random.default_rng(semente)
+    produtos = gerar_produtos(semente=semente) if produtos is None else produtos
+    n_clientes = n_clientes or max(n_linhas // 20, 100)
+
+    # 1. Datas com peso maior nos meses sazonais
+    datas = pd.date_range(inicio, periods=dias, freq='D')
+    peso = np.where(datas.month.isin([3, 11, 12]), 1.6, 1.0)
+    idx_datas = rng.choice(dias, n_linhas, p=peso / peso.sum())
+
+    # 2. SKUs com popularidade desigual (poucos produtos concentram o volume)
+    skus = produtos.index.to_numpy()
+    popularidade = rng.permutation(1.0 / np.arange(1, len(skus) + 1) ** 0.8)
+    idx_skus = rng.choice(len(skus), n_linhas, p=popularidade / popularidade.sum())
+    preco = rng.gamma(2.0, 15.0, len(skus)).astype(np.float32)
+
+    # 3. Filial, quantidade e cliente. Como no vendas.csv, o CLI_CPF é um
+    #    hash hexadecimal de 12 caracteres (texto), sem valores ausentes
+    cod_filial = rng.integers(1, 3, n_linhas)
+    qtd = rng.integers(1, 6, n_linhas).astype(np.float32)
+    hashes = rng.choice(16 ** 12, n_clientes, replace=False)
+    clientes = np.array([format(h, '012x') for h in hashes.tolist()], dtype=object)
+    cpf = pd.array(clientes[rng.integers(0, n_clientes, n_linhas)], dtype='str')
+
+    vendas = pd.DataFrame({
+        'SKU': skus[idx_skus],
+        'COD_FILIAL': pd.Categorical.from_codes(cod_filial - 1, [str(c) for c in FILIAIS]),
+        'FILIAL': pd.Categorical.from_codes(cod_filial - 1, list(FILIAIS.values())),
+        'DATA_ATEND': datas[idx_datas],
+        'QTD_VENDA': qtd,
+        'FATUR_VENDA': qtd * preco[idx_skus],
+        'CLI_CPF': cpf,
+    })
+    return vendas
@@ -0,0 +1,101 @@
+import os
+
+import pandas as pd
+
+import lotes_parquet as lp
+from cubo_vendas import MEDIDAS_CUBO, CuboVendas, construir_cubo
+
+#Configurações Globais do Módulo
+
+# Pasta do estado persistido (relativa à pasta notebooks/, como no restante do projeto)
+PATH_ESTADO = os.path.join(os.pardir, 'data', 'estado')
+
+
+#Funções Auxiliares
+
+def _nome_particao(ano, mes):
+    # Uma partição por (ano, mês); '0000-00' guarda as vendas sem data
+    ano = 0 if pd.isna(ano) else int(ano)
+    mes = 0 if pd.isna(mes) else int(mes)
+    return f'{ano:04d}-{mes:02d}.parquet'
+
+def _particoes(df):
+    return df.groupby([df['ANO'].fillna(0), df['MES_NUM'].fillna(0)], sort=False)
+
+def _ler_pasta(pasta, manifesto, subpasta):
+    # Versão atual de todas as partições de 'fatos' ou 'clientes'
+    nomes = lp.arquivos_pasta(manifesto, subpasta)
+    if not nomes:
+        return None
+    return pd.concat([lp.ler_arquivo(pasta, manifesto, nome) for nome in nomes], ignore_index=True)
+
+def _sem_categorias(df):
+    # Categorias diferentes entre lotes viram texto para o concat ser estável
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype(object)
+    return df
+
+
+#Funções do Estado Incremental
+
+def carregar_estado(pasta=PATH_ESTADO):
+    """
+    Lê o cubo de vendas persistido (somas e clientes distintos por ano, mês,
+    filial, categoria, ...). Retorna None se nenhum lote foi acrescentado.
+    """
+    manifesto = lp.ler_manifesto(pasta)
+    fatos = _ler_pasta(pasta, manifesto, 'fatos')
+    if fatos is None:
+        return None
+    clientes = _ler_pasta(pasta, manifesto, 'clientes')
+    if clientes is None:
+        clientes = pd.DataFrame(columns=['ANO', 'MES_NUM', 'FILIAL', 'CLI_CPF'])
+    return CuboVendas(fatos, clientes)
+
+def acrescentar_vendas(df_novas, pasta=PATH_ESTADO):
+    """
+    Incorpora um lote de vendas novas (ex.: o arquivo do dia, já unido ao
+    catálogo) ao estado persistido. Apenas as partições (ano, mês) presentes
+    no lote são lidas e regravadas, então o custo depende do tamanho do lote
+    e não do histórico. As partições regravadas vão para uma geração nova,
+    que só passa a valer quando o manifesto é substituído (ver
+    lotes_parquet.confirmar_lote): se a gravação falha no meio, o estado
+    continua o anterior e o mesmo lote pode ser reenviado. Retorna o cubo
+    das partições tocadas pelo lote (None se o lote já tinha sido
+    incorporado); o histórico completo vem de carregar_estado.
+    """
+    manifesto = lp.ler_manifesto(pasta)
+    lote = lp.identificar_lote(df_novas)
+    if lote in manifesto['lotes']:
+        print(f"Aviso: o lote {lote} já foi incorporado ao estado. Nada a fazer.")
+        return None
+
+    # 1. Cubo apenas das vendas novas
+    novo = construir_cubo(df_novas)
+
+    # 2. Soma o cubo novo às partições afetadas dos fatos
+    fatos = {}
+    for (ano, mes), parte in _particoes(_sem_categorias(novo.fatos)):
+        nome = f'fatos/{_nome_particao(ano, mes)}'
+        anterior = lp.ler_arquivo(pasta, manifesto, nome)
+        if anterior is not None:
+            parte = pd.concat([anterior, parte], ignore_index=True)
+        dimensoes = [c for c in parte.columns if c not in MEDIDAS_CUBO]
+        fatos[nome] = parte.groupby(dimensoes, dropna=False)[MEDIDAS_CUBO].sum().reset_index()
+
+    # 3. Une os clientes distintos das partições afetadas
+    clientes = {}
+    for (ano, mes), parte in _particoes(_sem_categorias(novo.clientes)):
+        nome = f'clientes/{_nome_particao(ano, mes)}'
+        anterior = lp.ler_arquivo(pasta, manifesto, nome)
+        if anterior is not None:
+            parte = pd.concat([anterior, parte], ignore_index=True).drop_duplicates()
+        clientes[nome] = parte
+
+    # 4. Grava as partições em uma geração nova e registra o lote (atômico)
+    lp.confirmar_lote(pasta, manifesto, lote, {**fatos, **clientes})
+
+    df_clientes = (pd.concat(clientes.values(), ignore_index=True) if clientes
+                   else pd.DataFrame(columns=['ANO', 'MES_NUM', 'FILIAL', 'CLI_CPF']))
+    return CuboVendas(pd.concat(fatos.values(), ignore_index=True), df_clientes)
@@ -0,0 +1,132 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+#Configurações Globais do Módulo
+
+# Erro relativo padrão da contagem aproximada (1% -> 2^14 registros por grupo)
+ERRO_PADRAO = 0.01
+
+# Limites de precisão aceitos (número de bits do hash usados para o registro)
+PRECISAO_MINIMA = 4
+PRECISAO_MAXIMA = 18
+
+
+#Funções Auxiliares
+
+def precisao_para_erro(erro):
+    """Menor precisão p cujo erro padrão (1.04 / sqrt(2^p)) fica abaixo de 'erro'."""
+    p = math.ceil(math.log2((1.04 / erro) ** 2))
+    return min(max(p, PRECISAO_MINIMA), PRECISAO_MAXIMA)
+
+def _tamanho_em_bits(valores):
+    # Número de bits significativos de cada uint64 (busca binária vetorizada)
+    x = valores.copy()
+    n = np.zeros(len(x), dtype=np.uint8)
+    for s in (32, 16, 8, 4, 2, 1):
+        maior = x >= np.uint64(1 << s)
+        n[maior] += s
+        x[maior] >>= np.uint64(s)
+    return n + (x > 0)
+
+def _estimar_registros(registros):
+    # Estimador HyperLogLog com correção de linear counting para cardinalidades baixas
+    m = registros.shape[1]
+    alpha = 0.7213 / (1 + 1.079 / m)
+    bruto = alpha * m * m / np.sum(np.exp2(-registros.astype(np.float64)), axis=1)
+    zeros = np.count_nonzero(registros == 0, axis=1)
+    with np.errstate(divide='ignore'):
+        linear = m * np.log(m / np.where(zeros > 0, zeros, 1))
+    return np.where((bruto <= 2.5 * m) & (zeros > 0), linear, bruto)
+
+def _maximo_por_grupo(registros, codigos, n_grupos):
+    # Une (máximo elemento a elemento) os registros que caem no mesmo grupo
+    ordem = np.argsort(codigos, kind='stable')
+    codigos_ordenados = codigos[ordem]
+    inicios = np.flatnonzero(np.r_[True, codigos_ordenados[1:] != codigos_ordenados[:-1]])
+    unidos = np.zeros((n_grupos, registros.shape[1]), dtype=np.uint8)
+    if len(ordem):
+        unidos[codigos_ordenados[inicios]] = np.maximum.reduceat(registros[ordem], inicios, axis=0)
+    return unidos
+
+
+def _hashes_canonicos(serie):
+    # Hash de 64 bits de cada valor na forma de texto: o mesmo CPF gera o
+    # mesmo hash seja a coluna texto, int64, float64 (inteiros com NaN) ou
+    # categórica, e sketches de fontes diferentes podem ser unidos sem contar
+    # o cliente duas vezes. Categóricas têm o hash calculado por categoria
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return _hashes_canonicos(pd.Series(serie.cat.categories))[serie.cat.codes.to_numpy()]
+    if pd.api.types.is_float_dtype(serie.dtype) and np.all(np.mod(serie.to_numpy(), 1) == 0):
+        serie = serie.astype(np.int64)
+    return pd.util.hash_array(serie.astype(str).to_numpy(dtype=object))
+
+
+class SketchesHLL:
+    """
+    Registros HyperLogLog por grupo (ex.: mês x filial) para contar valores
+    distintos de uma coluna sem guardar os valores. Sketches construídos em
+    chunks, partições ou dias diferentes são combinados com 'unir'.
+    """
+
+    def __init__(self, chaves, registros, precisao):
+        self.chaves = chaves.reset_index(drop=True)
+        self.registros = registros
+        self.precisao = precisao
+
+    @classmethod
+    def de_dataframe(cls, df, dimensoes, coluna='CLI_CPF', erro=ERRO_PADRAO):
+        precisao = precisao_para_erro(erro)
+        df = df[dimensoes + [coluna]].dropna()
+
+        # 1. Hash de 64 bits: os p primeiros bits escolhem o registro e o
+        #    restante define a posição do primeiro bit 1 (rho)
+        hashes = _hashes_canonicos(df[coluna])
+        bits_resto = 64 - precisao
+        registro = (hashes >> np.uint64(bits_resto)).astype(np.int64)
+        resto = hashes & np.uint64((1 << bits_resto) - 1)
+        rho = (bits_resto - _tamanho_em_bits(resto) + 1).astype(np.uint8)
+
+        # 2. Máximo de rho por (grupo, registro)
+        codigos, chaves = pd.MultiIndex.from_frame(df[dimensoes]).factorize()
+        m = 1 << precisao
+        maximos = pd.Series(rho).groupby(codigos.astype(np.int64) * m + registro).max()
+
+        registros = np.zeros((len(chaves), m), dtype=np.uint8)
+        registros.reshape(-1)[maximos.index.to_numpy()] = maximos.to_numpy()
+        return cls(chaves.to_frame(index=False, name=dimensoes), registros, precisao)
+
+    def unir(self, outro):
+        if outro.precisao != self.precisao:
+            raise ValueError('Só é possível unir sketches com a mesma precisão.')
+        chaves = pd.concat([self.chaves, outro.chaves], ignore_index=True)
+        registros = np.concatenate([self.registros, outro.registros])
+        return self._reagrupar(chaves, registros, list(self.chaves.columns))
+
+    def agrupar(self, dimensoes, filtros=None):
+        """Combina os sketches em grupos maiores (ex.: mês x filial -> mês)."""
+        chaves, registros = self.chaves, self.registros
+        if filtros:
+            mascara = np.ones(len(chaves), dtype=bool)
+            for col, valores in filtros.items():
+                mascara &= chaves[col].isin(valores).to_numpy()
+            chaves, registros = chaves.loc[mascara], registros[mascara]
+        return self._reagrupar(chaves, registros, dimensoes)
+
+    def _reagrupar(self, chaves, registros, dimensoes):
+        if dimensoes:
+            codigos, novas_chaves = pd.MultiIndex.from_frame(chaves[dimensoes]).factorize()
+            novas_chaves = novas_chaves.to_frame(index=False, name=dimensoes)
+        else:
+            codigos, novas_chaves = np.zeros(len(chaves), dtype=np.int64), pd.DataFrame(index=[0])
+        unidos = _maximo_por_grupo(registros, np.asarray(codigos), len(novas_chaves))
+        return SketchesHLL(novas_chaves, unidos, self.precisao)
+
+    def estimar(self, coluna='CLI_CPF'):
+        """DataFrame com as chaves de cada grupo e a contagem estimada de distintos."""
+        df = self.chaves.copy()
+        df[coluna] = np.rint(_estimar_registros(self.registros)).astype(np.int64)
+        if len(self.chaves.columns):
+            df = df.sort_values(list(self.chaves.columns))
+        return df.reset_index(drop=True)
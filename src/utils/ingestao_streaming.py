@@ -0,0 +1,124 @@
+import os
+
+import pandas as pd
+
+from carregar_dados import DTYPES_VENDAS, PATH_DADOS
+from catalogo_produtos import obter_catalogo
+from hyperloglog import ERRO_PADRAO, SketchesHLL
+from merge_datasets import merge_datasets
+
+#Configurações Globais do Módulo
+
+# Quantidade padrão de linhas lidas por vez do vendas.csv
+TAMANHO_CHUNK = 500_000
+
+# Mapeamento de meses (constante global)
+MES_MAP = {
+    1: 'Jan', 2: 'Fev', 3: 'Mar', 4: 'Abr',
+    5: 'Mai', 6: 'Jun', 7: 'Jul', 8: 'Ago',
+    9: 'Set', 10: 'Out', 11: 'Nov', 12: 'Dez'
+}
+
+
+#Leitura em Chunks
+
+def ler_vendas_em_chunks(df_produtos, caminho=None, tamanho_chunk=TAMANHO_CHUNK):
+    """
+    Lê o vendas.csv em pedaços de 'tamanho_chunk' linhas, aplica a limpeza
+    do 01_eda (SKU/COD_FILIAL normalizados, DATA_ATEND como data) e devolve
+    cada pedaço já unido ao catálogo de produtos.
+    """
+    caminho = caminho or os.path.join(PATH_DADOS, 'vendas.csv')
+    # Catálogo normalizado uma única vez (SKU inteiro, mesma chave dos chunks)
+    produtos = obter_catalogo(df_produtos).produtos
+
+    leitor = pd.read_csv(
+        caminho,
+        index_col=0,
+        dtype=DTYPES_VENDAS,
+        parse_dates=['DATA_ATEND'],
+        chunksize=tamanho_chunk
+    )
+    with leitor:
+        for chunk in leitor:
+            chunk['MES_NUM'] = chunk['DATA_ATEND'].dt.month
+            yield merge_datasets(chunk, produtos, 'SKU', modo='indice')
+
+
+#Agregadores Incrementais
+
+class FaturamentoMensalFilial:
+    """Soma de FATUR_VENDA por mês e filial (plot_faturamento_mensal_filial)."""
+
+    def __init__(self):
+        self.parcial = None
+
+    def atualizar(self, chunk):
+        soma = chunk.groupby(['MES_NUM', 'FILIAL'], observed=True)['FATUR_VENDA'].sum().astype('float64')
+        self.parcial = soma if self.parcial is None else self.parcial.add(soma, fill_value=0)
+
+    def resultado(self):
+        df = self.parcial.reset_index()
+        df['MES_NOME'] = df['MES_NUM'].map(MES_MAP)
+        return df.groupby(['MES_NOME', 'FILIAL'], observed=True)['FATUR_VENDA'].sum().reset_index()
+
+
+class VolumePorCategoria:
+    """Soma de QTD_VENDA por CATEGORIA ou SUBCATEGORIA (top_*_vendidas)."""
+
+    def __init__(self, coluna='CATEGORIA'):
+        self.coluna = coluna
+        self.parcial = None
+
+    def atualizar(self, chunk):
+        soma = chunk.groupby(self.coluna, observed=True)['QTD_VENDA'].sum().astype('float64')
+        self.parcial = soma if self.parcial is None else self.parcial.add(soma, fill_value=0)
+
+    def resultado(self):
+        return self.parcial.sort_index().reset_index()
+
+
+class ClientesUnicosMensalFilial:
+    """
+    Clientes distintos (CLI_CPF) por mês e filial. O estado guarda apenas o
+    conjunto de CPFs distintos de cada (mês, filial), nunca as linhas de
+    venda; cada chunk custa o seu tamanho, não o do estado acumulado. Com
+    modo='aproximado' guarda sketches HyperLogLog de tamanho fixo por grupo.
+    """
+
+    def __init__(self, modo='exato', erro=ERRO_PADRAO):
+        self.modo = modo
+        self.erro = erro
+        self.clientes = {}
+        self.sketches = None
+
+    def atualizar(self, chunk):
+        if self.modo == 'aproximado':
+            sketches = SketchesHLL.de_dataframe(chunk, ['MES_NUM', 'FILIAL'], erro=self.erro)
+            self.sketches = sketches if self.sketches is None else self.sketches.unir(sketches)
+            return
+
+        pares = chunk[['MES_NUM', 'FILIAL', 'CLI_CPF']].dropna().drop_duplicates()
+        pares['FILIAL'] = pares['FILIAL'].astype(str)
+        for (mes, filial), cpfs in pares.groupby(['MES_NUM', 'FILIAL'])['CLI_CPF']:
+            self.clientes.setdefault((mes, filial), set()).update(cpfs.tolist())
+
+    def resultado(self):
+        if self.modo == 'aproximado':
+            df = self.sketches.estimar()
+        else:
+            df = pd.DataFrame([(mes, filial, len(cpfs)) for (mes, filial), cpfs in sorted(self.clientes.items())],
+                              columns=['MES_NUM', 'FILIAL', 'CLI_CPF'])
+        df['FILIAL'] = df['FILIAL'].astype(str)
+        df['MES_NOME'] = df['MES_NUM'].map(MES_MAP)
+        return df.groupby(['MES_NOME', 'FILIAL'])['CLI_CPF'].sum().reset_index()
+
+def processar_vendas_em_chunks(df_produtos, agregadores, caminho=None, tamanho_chunk=TAMANHO_CHUNK):
+    """
+    Alimenta cada agregador com todos os chunks do vendas.csv. A memória
+    máxima depende do tamanho do chunk e do número de grupos, não de linhas.
+    """
+    for chunk in ler_vendas_em_chunks(df_produtos, caminho, tamanho_chunk):
+        for agregador in agregadores:
+            agregador.atualizar(chunk)
+    return agregadores
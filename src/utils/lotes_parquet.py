@@ -0,0 +1,126 @@
+import json
+import os
+import shutil
+
+import pandas as pd
+
+#Configurações Globais do Módulo
+
+# Manifesto de um repositório em Parquet (estado_incremental,
+# repositorio_atributos): os lotes incorporados, a geração atual e, para
+# cada arquivo lógico (ex.: 'fatos/2024-05.parquet'), o arquivo físico que
+# o guarda (ex.: 'g000007/fatos/2024-05.parquet')
+MANIFESTO = 'manifesto.json'
+
+
+#Funções Auxiliares
+
+def _caminho_temporario(caminho):
+    # Arquivo oculto ao lado do destino
+    return os.path.join(os.path.dirname(caminho), f'.{os.path.basename(caminho)}.tmp')
+
+def _pasta_geracao(geracao):
+    return f'g{geracao:06d}'
+
+def _nome_relativo(caminho, pasta):
+    return os.path.relpath(caminho, pasta).replace(os.sep, '/')
+
+def _arquivos_legados(pasta):
+    # Repositórios gravados antes das gerações: cada Parquet da pasta é o
+    # próprio arquivo lógico
+    arquivos = {}
+    for raiz, _, nomes in os.walk(pasta):
+        for nome in nomes:
+            if nome.endswith('.parquet'):
+                relativo = _nome_relativo(os.path.join(raiz, nome), pasta)
+                arquivos[relativo] = relativo
+    return arquivos
+
+def _remover_obsoletos(pasta, manifesto):
+    # Apaga os arquivos que o manifesto não referencia mais (versões
+    # substituídas e gerações órfãs de gravações interrompidas)
+    referenciados = set(manifesto['arquivos'].values())
+    for raiz, _, nomes in os.walk(pasta, topdown=False):
+        for nome in nomes:
+            caminho = os.path.join(raiz, nome)
+            if nome.endswith(('.parquet', '.tmp')) and _nome_relativo(caminho, pasta) not in referenciados:
+                os.remove(caminho)
+        if raiz != pasta and not os.listdir(raiz):
+            os.rmdir(raiz)
+
+
+#Manifesto e Leitura
+
+def ler_manifesto(pasta):
+    """
+    Manifesto do repositório: {'lotes': [...], 'geracao': n, 'arquivos':
+    {arquivo lógico: arquivo físico}}. Um repositório vazio tem geração 0.
+    """
+    caminho = os.path.join(pasta, MANIFESTO)
+    if not os.path.exists(caminho):
+        return {'lotes': [], 'geracao': 0, 'arquivos': {}}
+    with open(caminho) as f:
+        manifesto = json.load(f)
+    if 'arquivos' not in manifesto:
+        manifesto.update(geracao=0, arquivos=_arquivos_legados(pasta))
+    return manifesto
+
+def identificar_lote(df_novas):
+    """
+    Impressão digital de um lote de vendas (evita incorporar o mesmo
+    arquivo diário duas vezes).
+    """
+    return format(int(pd.util.hash_pandas_object(df_novas, index=False).sum()) & (2 ** 64 - 1), '016x')
+
+def arquivos_pasta(manifesto, pasta_logica):
+    """
+    Arquivos lógicos de uma pasta do repositório (ex.: 'fatos'), em ordem.
+    """
+    prefixo = pasta_logica.rstrip('/') + '/'
+    return sorted(nome for nome in manifesto['arquivos'] if nome.startswith(prefixo))
+
+def ler_arquivo(pasta, manifesto, nome, colunas=None):
+    """
+    Lê a versão atual de um arquivo lógico ('colunas' lê só as colunas
+    pedidas). Retorna None se o arquivo não existe no repositório.
+    """
+    fisico = manifesto['arquivos'].get(nome)
+    if fisico is None:
+        return None
+    return pd.read_parquet(os.path.join(pasta, fisico), columns=colunas)
+
+
+#Gravação de um Lote
+
+def confirmar_lote(pasta, manifesto, lote, tabelas):
+    """
+    Incorpora um lote ao repositório: grava 'tabelas' ({arquivo lógico:
+    DataFrame}) em uma pasta de geração nova e só então substitui o
+    manifesto (um único os.replace), que passa a apontar para os arquivos
+    novos e a listar o lote. Até essa troca, os leitores e uma nova
+    tentativa veem o estado anterior por inteiro: uma falha no meio deixa
+    apenas uma geração órfã, descartada na gravação seguinte, e o lote
+    pode ser reenviado sem ser contado duas vezes. Retorna o manifesto novo.
+    """
+    geracao = manifesto['geracao'] + 1
+    pasta_geracao = _pasta_geracao(geracao)
+    os.makedirs(pasta, exist_ok=True)
+    # Restos de uma tentativa interrompida com a mesma geração
+    shutil.rmtree(os.path.join(pasta, pasta_geracao), ignore_errors=True)
+
+    arquivos = dict(manifesto['arquivos'])
+    for nome, df in tabelas.items():
+        fisico = f'{pasta_geracao}/{nome}'
+        caminho = os.path.join(pasta, fisico)
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        df.to_parquet(caminho, index=False)
+        arquivos[nome] = fisico
+
+    novo = {'lotes': manifesto['lotes'] + [lote], 'geracao': geracao, 'arquivos': arquivos}
+    caminho_manifesto = os.path.join(pasta, MANIFESTO)
+    with open(_caminho_temporario(caminho_manifesto), 'w') as f:
+        json.dump(novo, f)
+    os.replace(_caminho_temporario(caminho_manifesto), caminho_manifesto)
+
+    _remover_obsoletos(pasta, novo)
+    return novo
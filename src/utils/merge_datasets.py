@@ -1,14 +1,85 @@
+import weakref
+
+import numpy as np
 import pandas
 
-def merge_datasets(df1, df2, key):
-    df1_copy = df1.copy()
-    df2_copy = df2.copy()
+# Índices SKU -> linha já construídos para cada catálogo (chave: id do DataFrame)
+_INDICES_CHAVE = {}
+
+
+def _construir_indice(indice):
+    # Chaves inteiras não negativas viram uma tabela densa (lookup por posição)
+    if pandas.api.types.is_integer_dtype(indice) and len(indice) and indice.min() >= 0 \
+            and indice.max() <= 10 * len(indice) + 1_000_000:
+        tabela = np.full(indice.max() + 1, -1, dtype=np.intp)
+        tabela[indice.to_numpy()] = np.arange(len(indice), dtype=np.intp)
+        return tabela
+    return None
+
+def _indice_chave(df2):
+    """
+    Retorna a tabela densa chave -> linha de df2, construída uma única vez
+    por catálogo e descartada quando o DataFrame deixa de existir.
+    """
+    cache = _INDICES_CHAVE.get(id(df2))
+    if cache is not None and cache[0] is df2.index:
+        return cache[1]
+
+    tabela = _construir_indice(df2.index)
+    if cache is None:
+        weakref.finalize(df2, _INDICES_CHAVE.pop, id(df2), None)
+    _INDICES_CHAVE[id(df2)] = (df2.index, tabela)
+    return tabela
+
+def _posicoes(chaves, df2):
+    # Posição em df2 de cada linha de df1 (-1 quando o SKU não existe no catálogo)
+    tabela = _indice_chave(df2)
+    if tabela is not None and pandas.api.types.is_integer_dtype(chaves):
+        valores = chaves.to_numpy()
+        dentro = (valores >= 0) & (valores < len(tabela))
+        return np.where(dentro, tabela[np.where(dentro, valores, 0)], -1)
+
+    # Demais tipos: resolve cada chave distinta uma vez e expande pelos códigos
+    codigos, distintos = pandas.factorize(chaves)
+    # (código -1, chave nula, cai no -1 acrescentado ao final)
+    pos_distintos = np.append(df2.index.get_indexer(distintos), -1)
+    return pos_distintos[codigos]
 
-    df_agg = df1_copy.merge(
-        df2_copy, 
-        left_on=key, 
-        right_index=True, 
+def _suporta_indice(df1, df2, key):
+    # Casos em que o merge do pandas tem outro comportamento (duplicatas,
+    # colunas repetidas, tipos incompatíveis, chave categórica convertida
+    # pelo merge) continuam no caminho padrão
+    numerico_esq = pandas.api.types.is_numeric_dtype(df1[key].dtype)
+    numerico_dir = pandas.api.types.is_numeric_dtype(df2.index.dtype)
+    return (
+        df2.index.is_unique
+        and numerico_esq == numerico_dir
+        and not isinstance(df1[key].dtype, pandas.CategoricalDtype)
+        and not df1.columns.intersection(df2.columns).size
+    )
+
+def merge_datasets(df1, df2, key, modo='merge'):
+    """
+    Une df1 (vendas) ao catálogo df2 (indexado pela chave) com um left join.
+
+    modo='merge' usa o pandas.merge; modo='indice' usa um índice chave -> linha
+    do catálogo, construído uma vez e reutilizado, e anexa as colunas de df2
+    com 'take' vetorizado. O resultado é idêntico nos dois modos.
+    """
+    if modo == 'indice' and _suporta_indice(df1, df2, key):
+        posicoes = _posicoes(df1[key], df2)
+
+        # Cópia rasa: as colunas de df1 não são duplicadas
+        df_agg = df1.copy(deep=False)
+        for col in df2.columns:
+            df_agg[col] = df2[col].array.take(posicoes, allow_fill=True)
+        return df_agg
+
+    df_agg = df1.merge(
+        df2,
+        left_on=key,
+        right_index=True,
         how='left'
     )
-    
-    return df_agg
\ No newline at end of file
+
+    return df_agg
@@ -0,0 +1,169 @@
+import numpy as np
+import pandas as pd
+
+from cubo_vendas import DIMENSOES_CUBO, MEDIDAS_CUBO, CuboVendas, obter_cubo
+
+#Configurações Globais do Módulo
+
+# Granularidades aceitas -> frequência de período do pandas. Os códigos
+# inteiros são os mesmos ordinais do pandas (PeriodIndex.asi8), contados a
+# partir de 1970: dias, semanas (segunda a domingo), meses, trimestres, anos
+GRANULARIDADES = {
+    'dia': 'D',
+    'semana': 'W-SUN',
+    'mes': 'M',
+    'trimestre': 'Q',
+    'ano': 'Y',
+}
+
+# Granularidades que o cubo de vendas (ANO, MES_NUM) consegue responder sem
+# voltar às linhas de venda
+GRANULARIDADES_CUBO = ('mes', 'trimestre', 'ano')
+
+# Código das vendas sem data (mesmo valor do NaT em datetime64)
+CODIGO_NULO = np.iinfo(np.int64).min
+
+
+#Códigos de Período
+
+def _validar(granularidade):
+    if granularidade not in GRANULARIDADES:
+        raise ValueError(f"granularidade deve ser uma de {tuple(GRANULARIDADES)}, não '{granularidade}'.")
+
+def codigos_periodo(datas, granularidade='mes'):
+    """
+    Converte datas (datetime64) em códigos inteiros de período, em uma única
+    operação vetorizada. Datas de anos diferentes nunca caem no mesmo código
+    (ex.: mar/2023 e mar/2024 são 638 e 650). Datas nulas viram CODIGO_NULO.
+    """
+    _validar(granularidade)
+    valores = pd.to_datetime(pd.Series(datas)).to_numpy(dtype='datetime64[ns]')
+    nulos = np.isnat(valores)
+
+    if granularidade == 'dia':
+        codigos = valores.astype('datetime64[D]').astype(np.int64)
+    elif granularidade == 'semana':
+        # 1970-01-01 foi uma quinta: +3 alinha as semanas na segunda-feira
+        codigos = (valores.astype('datetime64[D]').astype(np.int64) + 3) // 7 + 1
+    elif granularidade == 'ano':
+        codigos = valores.astype('datetime64[Y]').astype(np.int64)
+    else:
+        codigos = valores.astype('datetime64[M]').astype(np.int64)
+        if granularidade == 'trimestre':
+            codigos = codigos // 3
+
+    codigos[nulos] = CODIGO_NULO
+    return codigos
+
+def codigos_de_ano_mes(anos, meses, granularidade='mes'):
+    """Mesmos códigos de codigos_periodo, a partir de colunas ANO e MES_NUM (ex.: do cubo)."""
+    _validar(granularidade)
+    if granularidade not in GRANULARIDADES_CUBO:
+        raise ValueError(f"Com ANO e MES_NUM só é possível agrupar por {GRANULARIDADES_CUBO}.")
+
+    anos = pd.to_numeric(pd.Series(anos), errors='coerce').to_numpy(dtype=np.float64)
+    meses = pd.to_numeric(pd.Series(meses), errors='coerce').to_numpy(dtype=np.float64)
+    nulos = np.isnan(anos) | np.isnan(meses)
+
+    codigos = np.where(nulos, 0, (anos - 1970) * 12 + meses - 1).astype(np.int64)
+    if granularidade == 'trimestre':
+        codigos = codigos // 3
+    elif granularidade == 'ano':
+        codigos = codigos // 12
+
+    codigos[nulos] = CODIGO_NULO
+    return codigos
+
+def periodos(codigos, granularidade='mes'):
+    """PeriodIndex dos códigos (para rótulos e datas de início/fim); nulos viram NaT."""
+    _validar(granularidade)
+    codigos = np.asarray(codigos, dtype=np.int64)
+    return pd.PeriodIndex.from_ordinals(
+        np.where(codigos == CODIGO_NULO, pd.NaT.value, codigos), freq=GRANULARIDADES[granularidade]
+    )
+
+def ano_e_posicao(codigos, granularidade='mes'):
+    """
+    Ano e posição dentro do ano de cada código (mês e dia como MMDD, semana
+    ISO, mês, trimestre ou 1 para 'ano'), usados no alinhamento ano a ano.
+    Os dias usam o mês e o dia, não o dia do ano: assim 24/12 se alinha com
+    24/12 mesmo depois de um 29 de fevereiro (o dia do ano desloca tudo a
+    partir de março nos anos bissextos). O 29/02 não tem par no ano anterior.
+    """
+    indice = periodos(codigos, granularidade)
+    if granularidade == 'semana':
+        iso = indice.start_time.isocalendar()
+        return iso['year'].to_numpy(dtype=np.float64), iso['week'].to_numpy(dtype=np.float64)
+
+    anos = np.asarray(indice.year, dtype=np.float64)
+    posicoes = {
+        'dia': indice.month * 100 + indice.day,
+        'mes': indice.month,
+        'trimestre': indice.quarter,
+        'ano': np.where(np.isnan(anos), np.nan, 1),
+    }[granularidade]
+    return anos, np.asarray(posicoes, dtype=np.float64)
+
+
+#Agregação por Período
+
+def _filtrar(df, filtros):
+    if not filtros:
+        return df
+    mascara = np.ones(len(df), dtype=bool)
+    for col, valores in filtros.items():
+        mascara &= df[col].isin(valores).to_numpy()
+    return df.loc[mascara]
+
+def agregar_por_periodo(dados, granularidade='mes', dimensoes=(), medidas=MEDIDAS_CUBO,
+                        filtros=None, coluna_data='DATA_ATEND'):
+    """
+    Soma as 'medidas' por período (coluna PERIODO, código inteiro) e pelas
+    'dimensoes', em uma única passada. Mês, trimestre e ano saem do cubo de
+    vendas (ANO, MES_NUM) quando as dimensões estão no cubo; dia e semana
+    usam as linhas de venda e a coluna 'coluna_data'.
+    """
+    _validar(granularidade)
+    dimensoes = list(dimensoes)
+
+    if granularidade in GRANULARIDADES_CUBO and set(dimensoes) <= set(DIMENSOES_CUBO):
+        fatos = _filtrar(obter_cubo(dados).fatos, filtros)
+        if 'ANO' not in fatos.columns:
+            raise ValueError("O cubo não tem a dimensão ANO (vendas sem DATA_ATEND).")
+        codigos = codigos_de_ano_mes(fatos['ANO'], fatos['MES_NUM'], granularidade)
+    elif isinstance(dados, CuboVendas):
+        raise ValueError(f"Agrupar por '{granularidade}' ou por {dimensoes} exige as linhas de venda, não o cubo.")
+    else:
+        fatos = _filtrar(dados, filtros)
+        codigos = codigos_periodo(fatos[coluna_data], granularidade)
+
+    chaves = [pd.Series(codigos, index=fatos.index, name='PERIODO')] + [fatos[d] for d in dimensoes]
+    df_agregado = fatos.groupby(chaves, observed=True)[list(medidas)].sum().reset_index()
+    return df_agregado.loc[df_agregado['PERIODO'] != CODIGO_NULO].reset_index(drop=True)
+
+def rotular_periodos(df_agregado, granularidade='mes', coluna='PERIODO'):
+    """
+    Acrescenta INICIO_PERIODO (Timestamp) e ROTULO_PERIODO (ex.: '2024-03',
+    '2024Q1', '2024-03-04/2024-03-10') ao resultado, para eixos e tabelas.
+    """
+    indice = periodos(df_agregado[coluna], granularidade)
+    return df_agregado.assign(INICIO_PERIODO=indice.start_time, ROTULO_PERIODO=indice.astype(str))
+
+def comparar_ano_a_ano(df_agregado, granularidade, medida, dimensoes=(), coluna='PERIODO'):
+    """
+    Alinha cada período com o mesmo período do ano anterior (mesmo mês e
+    dia, semana ISO, mês ou trimestre) e calcula a variação percentual.
+    Acrescenta ANO, POSICAO, <medida>_ANO_ANTERIOR e VARIACAO_ANO_A_ANO.
+    Um 29 de fevereiro fica sem ano anterior (variação NaN) e não serve de
+    ano anterior para nenhum dia.
+    """
+    dimensoes = list(dimensoes)
+    anos, posicoes = ano_e_posicao(df_agregado[coluna], granularidade)
+    df = df_agregado.assign(ANO=anos, POSICAO=posicoes)
+
+    anterior = df[['ANO', 'POSICAO'] + dimensoes + [medida]].assign(ANO=df['ANO'] + 1)
+    anterior = anterior.rename(columns={medida: f'{medida}_ANO_ANTERIOR'})
+    df = df.merge(anterior, on=['ANO', 'POSICAO'] + dimensoes, how='left')
+
+    df['VARIACAO_ANO_A_ANO'] = (df[medida] / df[f'{medida}_ANO_ANTERIOR'] - 1) * 100
+    return df
@@ -0,0 +1,28 @@
+import contextlib
+
+import pytest
+
+
+@pytest.fixture
+def falhar_na_chamada():
+    """
+    Contexto em que objeto.atributo levanta OSError na n-ésima chamada,
+    simulando uma falha no meio de uma gravação; a falha é absorvida ao
+    sair do contexto, e o atributo original é restaurado.
+    """
+    @contextlib.contextmanager
+    def contexto(objeto, atributo, chamada):
+        original = getattr(objeto, atributo)
+        chamadas = []
+        def substituta(*args, **kwargs):
+            chamadas.append(1)
+            if len(chamadas) == chamada:
+                raise OSError('falha simulada')
+            return original(*args, **kwargs)
+        with pytest.MonkeyPatch.context() as m:
+            m.setattr(objeto, atributo, substituta)
+            try:
+                yield
+            except OSError:
+                pass
+    return contexto
@@ -0,0 +1,42 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+# Módulos do projeto (mesmo esquema de sys.path usado nos notebooks)
+PATH_RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for _pasta in ('utils', 'analytics'):
+    if os.path.join(PATH_RAIZ, 'src', _pasta) not in sys.path:
+        sys.path.insert(0, os.path.join(PATH_RAIZ, 'src', _pasta))
+
+pytest.importorskip('pyarrow')
+
+import estado_incremental as ei
+from cubo_vendas import construir_cubo
+from dados_sinteticos import gerar_produtos, gerar_vendas
+from merge_datasets import merge_datasets
+
+
+@pytest.fixture(scope='module')
+def vendas():
+    produtos = gerar_produtos(n_skus=200)
+    return merge_datasets(gerar_vendas(10_000, produtos, dias=120), produtos, 'SKU')
+
+@pytest.mark.parametrize('objeto, atributo, chamada', [
+    (pd.DataFrame, 'to_parquet', 2), (os, 'replace', 1), (os, 'replace', 2),
+])
+def test_lote_reenviado_apos_falha_nao_conta_duas_vezes(tmp_path, falhar_na_chamada, vendas, objeto, atributo, chamada):
+    pasta = str(tmp_path)
+    metade = len(vendas) // 2
+    ei.acrescentar_vendas(vendas.iloc[:metade], pasta)
+
+    # Falha no meio da gravação do segundo lote, que é reenviado em seguida
+    with falhar_na_chamada(objeto, atributo, chamada):
+        ei.acrescentar_vendas(vendas.iloc[metade:], pasta)
+    ei.acrescentar_vendas(vendas.iloc[metade:], pasta)
+
+    esperado = construir_cubo(vendas)
+    estado = ei.carregar_estado(pasta)
+    assert estado.fatos['FATUR_VENDA'].sum() == pytest.approx(esperado.fatos['FATUR_VENDA'].sum())
+    assert len(estado.clientes) == len(esperado.clientes)
@@ -0,0 +1,31 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Módulos do projeto (mesmo esquema de sys.path usado nos notebooks)
+PATH_RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for _pasta in ('utils', 'analytics'):
+    if os.path.join(PATH_RAIZ, 'src', _pasta) not in sys.path:
+        sys.path.insert(0, os.path.join(PATH_RAIZ, 'src', _pasta))
+
+pytest.importorskip('sklearn')
+
+import previsao_demanda as pv
+from dados_sinteticos import gerar_produtos, gerar_vendas
+from merge_datasets import merge_datasets
+
+
+@pytest.fixture(scope='module')
+def vendas_um_ano():
+    # Um ano de histórico: menos de um ciclo sazonal antes das origens do backtest
+    produtos = gerar_produtos(n_skus=200)
+    vendas = gerar_vendas(20_000, produtos, dias=366)
+    return merge_datasets(vendas, produtos, 'SKU')
+
+@pytest.mark.parametrize('granularidade, horizonte', [('semana', 4), ('mes', 2)])
+def test_backtest_com_um_ano_de_historico(vendas_um_ano, granularidade, horizonte):
+    df_backtest = pv.backtest_demanda(vendas_um_ano, horizonte=horizonte, janelas=1, granularidade=granularidade)
+    assert set(df_backtest['MODELO']) == set(pv.MODELOS)
+    assert np.isfinite(df_backtest['MAE']).all()
@@ -0,0 +1,44 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+# Módulos do projeto (mesmo esquema de sys.path usado nos notebooks)
+PATH_RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for _pasta in ('utils', 'analytics'):
+    if os.path.join(PATH_RAIZ, 'src', _pasta) not in sys.path:
+        sys.path.insert(0, os.path.join(PATH_RAIZ, 'src', _pasta))
+
+pytest.importorskip('pyarrow')
+
+import repositorio_atributos as ra
+from dados_sinteticos import gerar_produtos, gerar_vendas
+from merge_datasets import merge_datasets
+
+
+@pytest.fixture(scope='module')
+def vendas():
+    produtos = gerar_produtos(n_skus=200)
+    vendas = merge_datasets(gerar_vendas(10_000, produtos, dias=120), produtos, 'SKU')
+    return vendas.sort_values('DATA_ATEND', ignore_index=True)
+
+@pytest.mark.parametrize('objeto, atributo, chamada', [
+    (pd.DataFrame, 'to_parquet', 3), (os, 'replace', 1), (os, 'replace', 2),
+])
+def test_lote_reenviado_apos_falha_nao_conta_duas_vezes(tmp_path, falhar_na_chamada, vendas, objeto, atributo, chamada):
+    pasta = str(tmp_path)
+    # Lotes com dias completos (um atendimento não pode ficar dividido)
+    corte = vendas['DATA_ATEND'] < vendas['DATA_ATEND'].iloc[len(vendas) // 2].normalize()
+    ra.atualizar_atributos(vendas[corte], pasta)
+
+    # Falha no meio da gravação do segundo lote, que é reenviado em seguida
+    with falhar_na_chamada(objeto, atributo, chamada):
+        ra.atualizar_atributos(vendas[~corte], pasta)
+    ra.atualizar_atributos(vendas[~corte], pasta)
+
+    esperado = ra.construir_atributos(vendas)
+    for tabela, medida in (('clientes', 'MONETARIO'), ('skus', 'QTD_TOTAL')):
+        atributos = ra.ler_atributos(tabela, pasta)
+        assert len(atributos) == len(esperado[tabela])
+        assert atributos[medida].sum() == pytest.approx(esperado[tabela][medida].sum())